@@ -58,7 +58,7 @@ class azurestorageaccount(azureclass):
     def create_container_client(self, sas_token = None):
         """create azure storage account container client"""
         if sas_token != None: # use sas token for auth
-            storage_account_obj.set_azure_storage_acct_sas_token_override(sas_token)
+            self.set_azure_storage_acct_sas_token_override(sas_token)
             return self.create_blob_service_client_sas().get_container_client(self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
         else: return self.create_blob_service_client().get_container_client(self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
 
@@ -0,0 +1,186 @@
+# Databricks notebook source
+# DBTITLE 1,Azure Storage Async Class
+# library imports
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient, BlobClient as AsyncBlobClient, ContainerClient as AsyncContainerClient
+
+
+# azure storage account async class functions (same method names as azurestorageaccount)
+# client methods are coroutines, await them in a notebook cell or wrap them with run_async()
+class azurestorageaccountasync(azurestorageaccount):
+
+    # class constructor
+    def __init__(self, config, max_concurrency = 64):
+        # get all configuration variables
+        super().__init__(config)
+        # maximum number of storage requests in flight on the event loop at once
+        self.max_concurrency = max_concurrency
+
+
+    def create_blob_service_client(self):
+        """create azure storage async blob service client"""
+        return AsyncBlobServiceClient.from_connection_string(self.config["AZURE_STORAGE_ACCOUNT_CONN"])
+
+
+    def create_blob_service_client_sas(self):
+        """create azure storage async blob service client using shared access signature token"""
+        return AsyncBlobServiceClient(f"https://{self.config['AZURE_STORAGE_ACCOUNT_NAME']}.blob.core.windows.net/", credential = self.config["AZURE_STORAGE_ACCOUNT_SAS_TOKEN"])
+
+
+    def create_container_client(self, sas_token = None):
+        """
+        create azure storage account async container client
+        the client owns its connection pool so 'async with' closes it when the work is done
+        """
+        if sas_token != None: # use sas token for auth
+            self.set_azure_storage_acct_sas_token_override(sas_token)
+            return AsyncContainerClient(f"https://{self.config['AZURE_STORAGE_ACCOUNT_NAME']}.blob.core.windows.net/", self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"], credential = self.config["AZURE_STORAGE_ACCOUNT_SAS_TOKEN"])
+        else: return AsyncContainerClient.from_connection_string(self.config["AZURE_STORAGE_ACCOUNT_CONN"], self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
+
+
+    def create_blob_client(self):
+        """create azure storage account async blob client"""
+        return AsyncBlobClient.from_connection_string(
+            self.config["AZURE_STORAGE_ACCOUNT_CONN"],
+            container_name = self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"],
+            blob_name = check_str_for_substr_and_replace(self.get_blob_file_path(), "//")
+        )
+
+
+    async def create_container(self, containername = None):
+        """create azure storage account container"""
+        async with self.create_blob_service_client() as blob_service_client:
+            await blob_service_client.create_container(containername)
+        print(f"azure storage account container created successfully: {containername}\n")
+
+
+    async def delete_container(self, containername = None):
+        """delete azure storage account container"""
+        try:
+            async with self.create_blob_service_client() as blob_service_client:
+                await blob_service_client.delete_container(containername)
+            print(f"azure storage account container and all files deleted successfully: {containername}\n")
+        except: print(f"delete azure storage account container and all files failed: container {containername} does not exist...\n")
+
+
+    async def get_blob_list(self, sas_token = None, name_starts_with = None):
+        """get list of blobs (name, size, etag, ...) in azure storage account container"""
+        async with self.create_container_client(sas_token) as container_client:
+            return [blob async for blob in container_client.list_blobs(name_starts_with = name_starts_with)]
+
+
+    async def upload_blob(self, localfilepath, blobfilepath, overwrite = False):
+        """upload a blob to an azure storage account container"""
+        with open(localfilepath, "rb") as data:
+            async with self.create_container_client() as container_client:
+                await container_client.upload_blob(name = blobfilepath, data = data, overwrite = overwrite)
+
+
+    async def delete_blob(self):
+        """delete blob from azure storage account"""
+        async with self.create_blob_client() as blob_client:
+            await blob_client.delete_blob()
+
+
+    async def download_blob(self):
+        """download a blob from azure storage account container and return its bytes"""
+        async with self.create_blob_client() as blob_client:
+            stream = await blob_client.download_blob()
+            return await stream.readall()
+
+
+    async def listblobfiles(self, storageacctname = None, container = None, folderpath = None, sas_token = None):
+        """list specific blob files in an azure storage account container"""
+        self.set_azure_storage_acct_name_override(storageacctname)
+        self.set_azure_storage_acct_container_name_override(container)
+        # name_starts_with filters on the service side instead of listing the whole container
+        files = await self.get_blob_list(sas_token, folderpath)
+        return [file.name for file in files]
+
+
+    async def get_blob_properties(self, blobnames = None, sas_token = None):
+        """
+        get the blob properties of many blobs in an azure storage account container concurrently
+        return type is a dictionary keyed by blob name (value is the exception if the call failed)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.create_container_client(sas_token) as container_client:
+            async def get_properties(blobname):
+                async with semaphore:
+                    return await container_client.get_blob_client(blobname).get_blob_properties()
+            results = await asyncio.gather(*[get_properties(blobname) for blobname in blobnames], return_exceptions = True)
+        return dict(zip(blobnames, results))
+
+
+    async def download_blobs(self, blobnames = None, sas_token = None, localpath = None):
+        """
+        download many blobs from an azure storage account container concurrently
+        blobs are written under localpath (keeping the blob folder structure) when it is set
+        return type is a dictionary keyed by blob name with the bytes or local file path
+        (value is the exception if the download failed)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.create_container_client(sas_token) as container_client:
+            async def download(blobname):
+                async with semaphore:
+                    stream = await container_client.get_blob_client(blobname).download_blob()
+                    data = await stream.readall()
+                if localpath == None: return data
+                localfilepath = f"{localpath.rstrip('/')}/{blobname}"
+                os.makedirs(os.path.dirname(localfilepath), exist_ok = True)
+                with open(localfilepath, "wb") as localfile:
+                    localfile.write(data)
+                return localfilepath
+            results = await asyncio.gather(*[download(blobname) for blobname in blobnames], return_exceptions = True)
+        return dict(zip(blobnames, results))
+
+
+    async def download_blob_write_locally(self, storageacctname = None, container = None, folderpath = None, subfolderpath = None, filename = None, data_sas = None):
+        """
+        download azure storage container blob and maintain blob folder structure locally
+        return local file path each time this function is called
+        """
+        self.set_azure_storage_acct_name_override(storageacctname)
+        self.set_azure_storage_acct_container_name_override(container)
+        self.set_azure_storage_acct_folder_path_override(folderpath)
+        self.set_azure_storage_acct_subfolder_path_override(subfolderpath)
+        self.set_azure_storage_acct_file_name_override(filename)
+        localpath = check_str_for_substr_and_replace(f'./{self.config["LOCAL_DATA_FOLDER"]}/azurestorage/{storageacctname}/{container}/{folderpath}', "//")
+        print(f"bloblocalpath: {localpath}")
+        if not os.path.exists(localpath): os.makedirs(localpath)
+        localfilepath = f"{localpath}/{filename}"
+        if data_sas == None: data_sas = await self.download_blob()
+        with open(localfilepath, "wb") as my_blob:
+            my_blob.write(data_sas)
+        print(f"{localfilepath} written locally successfully....\n")
+        return localfilepath
+
+
+    async def upload_blob_from_local(self, storageacctname = None, container = None, localfilepath = None, blobfilepath = None, overwrite = False):
+        """upload local file to azure storage account container and maintain local folder structure"""
+
+        if len(container) < 3: container = container + "-addedchars" # added chars
+        if len(container) > 24: container = container[:24] # take first 24 characters
+        # remove invalid characters and fix case on the az container (e.g. no capital letters, no commas, no periods)
+        # lowercase = True, uppercase = False, removenumbers = False, removespaces = True, removepunctuation = True, singledashes = True
+        container = remove_invalid_chars(container, True, False, False, True, True, True)
+
+        self.set_azure_storage_acct_name_override(storageacctname)
+        self.set_azure_storage_acct_container_name_override(container)
+        # ensure the container exists in the azure storage account
+        await self.create_container(container)
+        await self.upload_blob(localfilepath, blobfilepath, overwrite)
+        print(f"{localfilepath} uploaded to azure storage account {storageacctname}/{container}: {blobfilepath} successfully....\n")
+
+
+def run_async(coroutine):
+    """
+    run an azurestorageaccountasync coroutine from synchronous code
+    (notebook cells can 'await' the coroutine directly instead)
+    """
+    try: asyncio.get_running_loop()
+    except RuntimeError: return asyncio.run(coroutine)
+    # an event loop is already running in this thread so run the coroutine on its own loop
+    with ThreadPoolExecutor(max_workers = 1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -0,0 +1,143 @@
+# Databricks notebook source
+# DBTITLE 1,Azure Storage Inventory Class
+# azure blob inventory report backed listing (for containers with hundreds of millions of blobs)
+# inventory reports are written by the storage account blob inventory policy using the layout
+# <inventory path>/<YYYY>/<MM>/<DD>/<HH-MM-SS>/<rule name>/<rule name>_<n>.parquet
+class azurestorageinventory(azurestorageaccount):
+
+    # class constructor
+    def __init__(self, config):
+        # get all configuration variables
+        super().__init__(config)
+
+
+    def set_azure_storage_inventory_path_override(self, az_storage_inventory_path = None):
+        """set a new azure storage account blob inventory report base path"""
+        self.config["AZURE_STORAGE_INVENTORY_PATH"] = az_storage_inventory_path
+
+
+    def create_container_client(self, sas_token = None):
+        """
+        create azure storage account container client
+        the sas token is set on this object's own config (not the shared storage_account_obj)
+        """
+        if sas_token != None: # use sas token for auth
+            self.set_azure_storage_acct_sas_token_override(sas_token)
+            return self.create_blob_service_client_sas().get_container_client(self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
+        else: return self.create_blob_service_client().get_container_client(self.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
+
+
+    def get_latest_inventory_report_path(self, rule_name = None):
+        """get the folder of the most recent blob inventory report under the inventory base path"""
+        reportpath = self.config["AZURE_STORAGE_INVENTORY_PATH"].rstrip("/")
+        # walk the <YYYY>/<MM>/<DD>/<HH-MM-SS> folders taking the latest one at each level
+        for level in range(4):
+            folders = sorted([f.name.rstrip("/") for f in dbutils.fs.ls(reportpath) if f.name.endswith("/")])
+            if not folders: raise Exception(f"no blob inventory reports found under {reportpath}")
+            reportpath = f"{reportpath}/{folders[-1]}"
+        if rule_name != None: reportpath = f"{reportpath}/{rule_name}"
+        print(f"inventoryreportpath: {reportpath}")
+        return reportpath
+
+
+    def get_inventory_report_time(self, reportpath = None):
+        """get the time a blob inventory report was generated from its <YYYY>/<MM>/<DD>/<HH-MM-SS> folder path"""
+        match = re.search(r"(\d{4})/(\d{2})/(\d{2})/(\d{2})-(\d{2})-(\d{2})", reportpath)
+        if match == None: return None
+        return datetime(*[int(part) for part in match.groups()])
+
+
+    def read_inventory_report(self, reportpath = None):
+        """
+        read a blob inventory parquet report into a spark dataframe
+        return type is a spark dataframe with name, size, etag and last_modified columns
+        """
+        return (spark.read.parquet(reportpath)
+            .select(
+                F.col("Name").alias("name"),
+                F.col("`Content-Length`").cast("long").alias("size"),
+                F.col("Etag").alias("etag"),
+                F.col("`Last-Modified`").alias("last_modified")
+            )
+        )
+
+
+    def listblobfiles_df(self, container = None, folderpath = None, reportpath = None):
+        """
+        list specific blob files in an azure storage account container from a blob inventory report
+        return type is a spark dataframe so the listing never has to be collected on the driver
+        """
+        if reportpath == None: reportpath = self.get_latest_inventory_report_path()
+        self.set_azure_storage_acct_container_name_override(container)
+        df = self.read_inventory_report(reportpath)
+        # inventory blob names are prefixed with the container name
+        containerprefix = f"{container}/"
+        df = (df.filter(F.col("name").startswith(containerprefix))
+            .withColumn("name", F.expr(f"substring(name, {len(containerprefix) + 1})")))
+        if folderpath != None: df = df.filter(F.col("name").startswith(folderpath))
+        return df
+
+
+    def list_live_blob_names_df(self, prefix = None, sas_token = None):
+        """
+        live listing of the blob names under one prefix (recently written prefixes only, so the listing stays small)
+        return type is a spark dataframe with a name column
+        """
+        if sas_token != None: # use sas token for auth
+            blobs = self.create_container_client(sas_token).list_blobs(name_starts_with = prefix)
+        else: blobs = self.create_container_client().list_blobs(name_starts_with = prefix)
+        return spark.createDataFrame([(blob.name,) for blob in blobs], "name string")
+
+
+    def check_inventory_consistency(self, inventory_df = None, recent_prefixes = None, sas_token = None, consistency_window_hours = 24, reportpath = None):
+        """
+        compare the inventory report against a live listing of recently written prefixes
+        blobs written after the report was generated are only visible in the live listing
+        the differences are spark anti-joins, so no inventory names are collected on the driver
+        return type is a dictionary keyed by prefix with the live listing and the difference dataframes
+        """
+        if reportpath != None:
+            reporttime = self.get_inventory_report_time(reportpath)
+            if reporttime != None and (datetime.now() - reporttime).total_seconds() > consistency_window_hours * 3600:
+                print(f"inventory report {reportpath} is older than the {consistency_window_hours} hour consistency window....")
+        results = {}
+        for prefix in recent_prefixes or []:
+            inventoryfiles_df = inventory_df.filter(F.col("name").startswith(prefix)).select("name")
+            livefiles_df = self.list_live_blob_names_df(prefix, sas_token).cache()
+            results[prefix] = {
+                "live_files": livefiles_df,
+                "missing_from_inventory": livefiles_df.join(inventoryfiles_df, "name", "left_anti"),
+                "missing_from_live": inventoryfiles_df.join(livefiles_df, "name", "left_anti")
+            }
+            print(f"inventory consistency for prefix '{prefix}': {results[prefix]['missing_from_inventory'].count()} new, {results[prefix]['missing_from_live'].count()} deleted")
+        return results
+
+
+    def listblobfiles_reconciled_df(self, storageacctname = None, container = None, folderpath = None, sas_token = None, reportpath = None, recent_prefixes = None, consistency_window_hours = 24):
+        """
+        list specific blob files from a blob inventory report, recent_prefixes are listed live
+        and replace the inventory entries under them so blobs written after the report are included
+        return type is a spark dataframe with a name column
+        """
+        self.set_azure_storage_acct_name_override(storageacctname)
+        if reportpath == None: reportpath = self.get_latest_inventory_report_path()
+        df = self.listblobfiles_df(container, folderpath, reportpath)
+        recent_prefixes = [prefix for prefix in recent_prefixes or [] if folderpath == None or prefix.startswith(folderpath)]
+        consistency = self.check_inventory_consistency(df, recent_prefixes, sas_token, consistency_window_hours, reportpath)
+        df = df.select("name")
+        for prefix in recent_prefixes:
+            df = df.filter(~F.col("name").startswith(prefix))
+        for prefix, result in consistency.items():
+            df = df.unionByName(result["live_files"])
+        return df
+
+
+    def listblobfiles(self, storageacctname = None, container = None, folderpath = None, sas_token = None, reportpath = None, recent_prefixes = None, consistency_window_hours = 24):
+        """
+        list specific blob files in an azure storage account container from a blob inventory report
+        same arguments as azurestorageaccount.listblobfiles, the names are streamed from the reconciled dataframe
+        (toLocalIterator) instead of collected, use listblobfiles_reconciled_df to keep the listing in spark
+        return type is an iterator of blob names
+        """
+        df = self.listblobfiles_reconciled_df(storageacctname, container, folderpath, sas_token, reportpath, recent_prefixes, consistency_window_hours)
+        return (row["name"] for row in df.toLocalIterator())
@@ -5,3 +5,11 @@
 # COMMAND ----------
 
 # MAGIC %run "./azure_storage"
+
+# COMMAND ----------
+
+# MAGIC %run "./azure_storage_inventory"
+
+# COMMAND ----------
+
+# MAGIC %run "./azure_storage_async"
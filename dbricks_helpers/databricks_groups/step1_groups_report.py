@@ -12,12 +12,12 @@ group_instructions = get_groups_report(databricks_instance, databricks_pat, grou
 
 # DBTITLE 1,Write Groups Instructions to DBFS (Local) and Azure Storage Account (External)
 # set override variables (user defined)
-storage_account_obj.set_azure_storage_acct_container_name_override("dbricks-groups")
-storage_account_obj.set_azure_storage_acct_subfolder_path_override("groups")
-storage_account_obj.set_azure_storage_acct_file_name_override("groups.json")
+get_storage_account_obj().set_azure_storage_acct_container_name_override("dbricks-groups")
+get_storage_account_obj().set_azure_storage_acct_subfolder_path_override("groups")
+get_storage_account_obj().set_azure_storage_acct_file_name_override("groups.json")
 
 # write out groups to azure storage account
-upload_to_dbfs_and_azure_storage(storage_account_obj, group_instructions)
+upload_to_dbfs_and_azure_storage(get_storage_account_obj(), group_instructions)
 
 # COMMAND ----------
 
@@ -12,9 +12,9 @@ secret_scope_instructions = get_secret_scope_report(databricks_instance, databri
 
 # DBTITLE 1,Write Secret Scope Instructions to DBFS (Local) and Azure Storage Account (External)
 # user defined parameters
-storage_account_obj.set_azure_storage_acct_container_name_override("dbricks-secret-scope")
-storage_account_obj.set_azure_storage_acct_subfolder_path_override("secret_scope")
-storage_account_obj.set_azure_storage_acct_file_name_override("secret_scope.json")
+get_storage_account_obj().set_azure_storage_acct_container_name_override("dbricks-secret-scope")
+get_storage_account_obj().set_azure_storage_acct_subfolder_path_override("secret_scope")
+get_storage_account_obj().set_azure_storage_acct_file_name_override("secret_scope.json")
 
 # write out groups to azure storage account
-upload_to_dbfs_and_azure_storage(storage_account_obj, secret_scope_instructions)
+upload_to_dbfs_and_azure_storage(get_storage_account_obj(), secret_scope_instructions)
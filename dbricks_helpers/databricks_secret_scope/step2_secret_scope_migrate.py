@@ -22,16 +22,16 @@ if len(recreate_secret_scopes_list) > 0: recreate_all_secret_scopes = False
 
 # DBTITLE 1,Get Deploy Secret Scopes Instructions From Old Workspace
 # user defined parameters
-storage_account_obj.set_azure_storage_acct_container_name_override("dbricks-secret-scope")
-storage_account_obj.set_azure_storage_acct_subfolder_path_override("secret_scope")
-storage_account_obj.set_azure_storage_acct_file_name_override("secret_scope.json")
+get_storage_account_obj().set_azure_storage_acct_container_name_override("dbricks-secret-scope")
+get_storage_account_obj().set_azure_storage_acct_subfolder_path_override("secret_scope")
+get_storage_account_obj().set_azure_storage_acct_file_name_override("secret_scope.json")
 
 # download secret scope json report locally in new workspace
-dbfsfilepath = storage_account_obj.download_blob_write_locally(
-    storageacctname = storage_account_obj.config["AZURE_STORAGE_ACCOUNT_NAME"],
-    container = storage_account_obj.config["AZURE_STORAGE_ACCOUNT_CONTAINER"],
-    folderpath = storage_account_obj.config["AZURE_STORAGE_ACCOUNT_FOLDER_PATH"],
-    filename = storage_account_obj.config["AZURE_STORAGE_ACCOUNT_FILE_NAME"]
+dbfsfilepath = get_storage_account_obj().download_blob_write_locally(
+    storageacctname = get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_NAME"],
+    container = get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_CONTAINER"],
+    folderpath = get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_FOLDER_PATH"],
+    filename = get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_FILE_NAME"]
 )
 
 # get secret scope deploy instructions for new workspace
@@ -43,13 +43,13 @@ if deploy_instructions != None:
 
 if delete_ss_report_from_dbfs == True:
   # remove local copied secret scope folder in dbfs
-  shutil.rmtree(f'./{storage_account_obj.config["LOCAL_DATA_FOLDER"]}', ignore_errors = True)
-  print(f'./{storage_account_obj.config["LOCAL_DATA_FOLDER"]} removed successfully from dbfs....')
+  shutil.rmtree(f'./{get_storage_account_obj().config["LOCAL_DATA_FOLDER"]}', ignore_errors = True)
+  print(f'./{get_storage_account_obj().config["LOCAL_DATA_FOLDER"]} removed successfully from dbfs....')
 
 if delete_ss_report_from_azsa == True:
   # remove secret scope storage account container
-  storage_account_obj.delete_container(storage_account_obj.config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
-  print(f'{storage_account_obj.config["AZURE_STORAGE_ACCOUNT_CONTAINER"]} container removed successfully....')
+  get_storage_account_obj().delete_container(get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_CONTAINER"])
+  print(f'{get_storage_account_obj().config["AZURE_STORAGE_ACCOUNT_CONTAINER"]} container removed successfully....')
 
 # COMMAND ----------
 
@@ -1,15 +1,141 @@
 # Databricks notebook source
-# DBTITLE 1,Create a Copy of an Azure Container
+# DBTITLE 1,Library Imports
+import os, json, time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
 
+# COMMAND ----------
+
+# DBTITLE 1,Copy Manifest (Checkpoint) Functions
+def load_copy_manifest(manifest_path = None):
+    """
+    load the copy manifest written by previous runs of copy_container
+    returns a dictionary keyed by blob name with the source etag that was copied
+    """
+    completed = {}
+    if manifest_path == None or not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line: continue
+            try: record = json.loads(line)
+            except ValueError: continue # partially written last line from an interrupted run
+            if record["status"] in ["success", "skipped"]:
+                completed[record["name"]] = record["etag"]
+            else: completed.pop(record["name"], None)
+    return completed
+
+
+def append_copy_manifest(manifest_path = None, records = None):
+    """append a batch of copy results to the copy manifest (one json record per line)"""
+    if manifest_path == None or not records:
+        return None
+    manifest_folder = os.path.dirname(manifest_path)
+    if manifest_folder and not os.path.exists(manifest_folder): os.makedirs(manifest_folder)
+    with open(manifest_path, "a") as manifest:
+        for record in records:
+            manifest.write(json.dumps(record) + "\n")
+        manifest.flush()
+
+# COMMAND ----------
+
+# DBTITLE 1,Server-Side Copy and Copy Status Poller Functions
+def get_destination_blob_lookup(destination_container_client):
+    """
+    return a lookup function for destination blobs by name that walks the destination listing once
+    alongside the source listing (both are listed in lexicographic name order), so only the current
+    listing page is held in memory instead of an index of the whole destination container
+    the lookup returns (size, source etag stamped on the copy, last modified) or None when the blob is not found
+    names must be looked up in increasing order, an out of order name returns None (the blob is copied again)
+    """
+    blobs = iter(destination_container_client.list_blobs(include = ["metadata"]))
+    state = {"blob": next(blobs, None)}
+    def lookup(name):
+        blob = state["blob"]
+        while blob != None and blob.name < name:
+            blob = next(blobs, None)
+        state["blob"] = blob
+        if blob == None or blob.name != name: return None
+        return (blob.size, (blob.metadata or {}).get("source_etag"), blob.last_modified)
+    return lookup
+
+
+def is_blob_copied(blob, destination = None):
+    """
+    check whether a source blob is already in the destination with the same content
+    the size has to match and the source etag stamped on the copy has to match the source etag, for copies
+    without the stamp (other copy tools) a destination modified after the source is taken as the same content
+    """
+    if destination == None: return False
+    size, source_etag, last_modified = destination
+    if size != blob.size: return False
+    if source_etag != None: return source_etag == blob.etag.strip('"')
+    return last_modified != None and blob.last_modified != None and last_modified >= blob.last_modified
+
+
+def start_blob_copy(source_container_client, destination_container_client, blob, source_sas_token = None):
+    """start a server-side copy for a single blob and return the initial copy status"""
+    source_url = source_container_client.get_blob_client(blob.name).url
+    if source_sas_token != None: source_url = f"{source_url}?{source_sas_token.lstrip('?')}"
+    destination_blob = destination_container_client.get_blob_client(blob.name)
+    try:
+        # the source etag is stamped on the destination blob so later runs can skip it
+        copy = destination_blob.start_copy_from_url(source_url, metadata = {"source_etag": blob.etag.strip('"')})
+        return destination_blob, copy["copy_status"], None
+    except Exception as e:
+        return destination_blob, "failed", str(e)[:200]
 
+
+def get_blob_copy_status(destination_blob):
+    """get the current server-side copy status of a destination blob"""
+    try:
+        copy = destination_blob.get_blob_properties().copy
+        return copy.status, copy.status_description
+    except Exception as e:
+        return "failed", str(e)[:200]
+
+
+def poll_pending_copies(executor, pending = None, poll_interval = 5):
+    """
+    poll the destination blobs of pending server-side copies until each one succeeds or fails
+    returns a dictionary keyed by blob name with (status, error) once nothing is pending
+    """
+    finished = {}
+    while pending:
+        time.sleep(poll_interval)
+        names = list(pending.keys())
+        statuses = executor.map(get_blob_copy_status, [pending[name] for name in names])
+        for name, (status, error) in zip(names, statuses):
+            if status == "pending": continue
+            finished[name] = (status, error)
+            del pending[name]
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] copies still pending: {len(pending)}")
+    return finished
+
+# COMMAND ----------
+
+# DBTITLE 1,Create a Copy of an Azure Container
 def copy_container(
-    source_connection_string = None, 
-    source_container_name = None, 
-    destination_connection_string = None, 
+    source_connection_string = None,
+    source_container_name = None,
+    destination_connection_string = None,
     destination_container_name = None,
-    copy_files_filter = None
-):  
+    copy_files_filter = None,
+    source_sas_token = None,
+    manifest_path = None,
+    max_concurrency = 32,
+    batch_size = 1000,
+    poll_interval = 5
+):
+    """
+    copy all blobs in a source container to a destination container using server-side copies
+    copies are started in parallel (max_concurrency threads) one batch at a time, pending
+    copies are polled until they finish, and every batch is checkpointed to the manifest
+    so an interrupted copy can be restarted and will resume where it stopped.
+    blobs already in the manifest or already in the destination (see is_blob_copied) are skipped.
+    """
     # create BlobServiceClient instances for the source and destination containers
     source_blob_service_client = BlobServiceClient.from_connection_string(source_connection_string)
     destination_blob_service_client = BlobServiceClient.from_connection_string(destination_connection_string)
@@ -22,38 +148,79 @@ def copy_container(
     try: destination_container_client.create_container()
     except: print("container already exists....")
 
-    # list blobs in the source container
+    # previous progress from the manifest and what already exists in the destination
+    completed = load_copy_manifest(manifest_path)
+    destination_lookup = get_destination_blob_lookup(destination_container_client)
+    print(f"blobs in manifest: {len(completed)}")
+
+    totals = {"success": 0, "skipped": 0, "failed": 0}
+
+    def process_batch(executor, batch):
+        """start copies for a batch of blobs, poll the pending ones and checkpoint the results"""
+        started = list(executor.map(lambda blob: start_blob_copy(source_container_client, destination_container_client, blob, source_sas_token), batch))
+        results, pending = {}, {}
+        for blob, (destination_blob, status, error) in zip(batch, started):
+            if status == "pending": pending[blob.name] = destination_blob
+            else: results[blob.name] = (status, error)
+        results.update(poll_pending_copies(executor, pending, poll_interval))
+        records = []
+        for blob in batch:
+            status, error = results[blob.name]
+            status = "success" if status == "success" else "failed"
+            totals[status] += 1
+            records.append({"name": blob.name, "etag": blob.etag.strip('"'), "size": blob.size, "status": status, "error": error})
+            if error != None: print(f"copy failed for {blob.name}: {error}")
+        append_copy_manifest(manifest_path, records)
+
+    # list blobs in the source container (the listing already includes the size and etag)
     blobs = source_container_client.list_blobs()
 
-    for blob in blobs:
-    
-        source_blob = source_container_client.get_blob_client(blob.name)
+    batch, skipped = [], []
+    with ThreadPoolExecutor(max_workers = max_concurrency) as executor:
+        for blob in blobs:
+            if blob.size == 0: continue
+            if copy_files_filter != None and copy_files_filter not in blob.name: continue
+            etag = blob.etag.strip('"')
+            if completed.get(blob.name) == etag:
+                totals["skipped"] += 1
+                continue
+            if is_blob_copied(blob, destination_lookup(blob.name)):
+                # already copied but not yet recorded in the manifest
+                skipped.append({"name": blob.name, "etag": etag, "size": blob.size, "status": "skipped", "error": None})
+                totals["skipped"] += 1
+                continue
+            batch.append(blob)
+            if len(batch) >= batch_size:
+                process_batch(executor, batch)
+                append_copy_manifest(manifest_path, skipped)
+                batch, skipped = [], []
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] progress: {totals}")
+        if batch: process_batch(executor, batch)
+        append_copy_manifest(manifest_path, skipped)
 
-        if source_blob.get_blob_properties().size > 0:
-            if copy_files_filter != None and copy_files_filter in source_blob.url:
-                print(source_blob.url)
-                destination_blob = destination_container_client.get_blob_client(blob.name)
-                # copy the blob to the destination container
-                destination_blob.start_copy_from_url(source_blob.url)
-            else:
-                print(source_blob.url)
-                destination_blob = destination_container_client.get_blob_client(blob.name)
-                # copy the blob to the destination container
-                destination_blob.start_copy_from_url(source_blob.url)
+    print(f"Container '{source_container_name}' copied to '{destination_container_name}': {totals}")
+    return totals
 
-    print(f"Container '{source_container_name}' copied to '{destination_container_name}' successfully.")
+# COMMAND ----------
 
+# DBTITLE 1,Copy Container
 # storage account settings
 src_conn_str = ""
 src_container_name = ""
+src_sas_token = None # needed when the source container is not publicly readable by the destination account
 dest_conn_str = ""
 dest_container_name = ""
+# copy manifest (checkpoint) path - rerun with the same path to resume an interrupted copy
+copy_manifest_path = f"/dbfs/tmp/copy_container/{src_container_name}_to_{dest_container_name}.jsonl"
 
 # copy container
 copy_container(
-    source_connection_string = src_conn_str, 
-    source_container_name = src_container_name, 
-    destination_connection_string = dest_conn_str, 
-    destination_container_name = dest_container_name, 
-    copy_files_filter = None # "archive/General-Accounting"
+    source_connection_string = src_conn_str,
+    source_container_name = src_container_name,
+    destination_connection_string = dest_conn_str,
+    destination_container_name = dest_container_name,
+    copy_files_filter = None, # "archive/General-Accounting"
+    source_sas_token = src_sas_token,
+    manifest_path = copy_manifest_path,
+    max_concurrency = 32
 )
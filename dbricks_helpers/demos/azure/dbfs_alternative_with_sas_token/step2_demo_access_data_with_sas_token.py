@@ -72,7 +72,7 @@ base_sas_url_images_autnav = f"https://{storage_account_name}.blob.core.windows.
 base_sas_url_matlab_autnav = f"https://{storage_account_name}.blob.core.windows.net/{az_container_autnav}/{az_fldr_path_matlab_autnav}" # use with sas token
 
 # set the storage account name override
-storage_account_obj.set_azure_storage_acct_name_override(storage_account_name)
+get_storage_account_obj().set_azure_storage_acct_name_override(storage_account_name)
 
 # COMMAND ----------
 
@@ -117,21 +117,138 @@ def download_blob_files(blobfileslist = None, storaceaccount = None, container =
             blob_url = f"{sas_base_url}/{filename}{sas_token}"
             response = requests.get(blob_url)
             data_by_sas = response.content
-            storage_account_obj.download_blob_write_locally(storaceaccount, container, foldername, subfoldername, filename, data_by_sas)
-        else: storage_account_obj.download_blob_write_locally(storaceaccount, container, foldername, subfoldername, filename)
+            get_storage_account_obj().download_blob_write_locally(storaceaccount, container, foldername, subfoldername, filename, data_by_sas)
+        else: get_storage_account_obj().download_blob_write_locally(storaceaccount, container, foldername, subfoldername, filename)
         print(f"downloaded '{file.split('/')[1]}' to local repo 'data' folder\n")
 
 # COMMAND ----------
 
+# DBTITLE 1,Download Blob Files in Parallel Using SAS Token (Ranged Reads)
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+
+def get_blob_local_file_path(file = None, storaceaccount = None, container = None, localbasepath = None):
+    """get the local file path for a blob file (same folder structure as download_blob_write_locally)"""
+    foldername = file.split("/", 1)[0]
+    filename = file.rsplit("/", 1)[1]
+    if localbasepath == None: localbasepath = f'./{get_storage_account_obj().config["LOCAL_DATA_FOLDER"]}'
+    localpath = check_str_for_substr_and_replace(f'{localbasepath}/azurestorage/{storaceaccount}/{container}/{foldername}', "//")
+    if not os.path.exists(localpath): os.makedirs(localpath, exist_ok = True)
+    return f"{localpath}/{filename}"
+
+
+def download_blob_range(blob_url = None, localfilepath = None, start = 0, end = 0, max_retries = 3):
+    """download one byte range of a blob with a sas token url and write it at its offset in the local file"""
+    for attempt in range(1, max_retries + 1):
+        try:
+            response = requests.get(blob_url, headers = {"x-ms-range": f"bytes={start}-{end}"}, timeout = 300)
+            response.raise_for_status()
+            with open(localfilepath, "r+b") as localfile:
+                localfile.seek(start)
+                localfile.write(response.content)
+            return len(response.content)
+        except Exception as e:
+            if attempt == max_retries: raise
+            print(f"retrying range {start}-{end} of {localfilepath} (attempt {attempt}): {str(e)[:100]}")
+            time.sleep(2 ** attempt)
+
+
+def download_blob_files_parallel(
+    blobfileslist = None, 
+    storaceaccount = None, 
+    container = None, 
+    sas_base_url = None, 
+    sas_token = None,
+    localbasepath = None,
+    max_file_workers = 8,
+    max_range_workers = 16,
+    range_size_mb = 16,
+    max_retries = 3
+):
+    """
+    download all files in blob folder in parallel using a sas token
+    files are downloaded max_file_workers at a time, files larger than range_size_mb are split
+    into byte ranges that are downloaded in parallel (each range is retried on its own)
+    each file is written to a '.part' file that is renamed when complete and removed when the download fails
+    progress and throughput are printed as each file finishes
+    without a sas base url and sas token the files are downloaded one at a time with the storage account key
+    (download_blob_write_locally overrides the shared storage account object's config, so it is not run in parallel)
+    return type is a tuple of (local file paths, blob files that failed to download)
+    """
+    if sas_base_url == None or sas_token == None:
+        localfilepaths, failed = [], []
+        for file in blobfileslist:
+            foldername = file.split("/", 1)[0]
+            filename = file.rsplit("/", 1)[1]
+            subfoldername = file.split(foldername)[1].split(filename)[0].replace('/', '')
+            try: localfilepaths.append(get_storage_account_obj().download_blob_write_locally(storaceaccount, container, foldername, subfoldername, filename))
+            except Exception as e:
+                failed.append(file)
+                print(f"failed to download '{file}': {str(e)[:100]}")
+        return localfilepaths, failed
+
+    range_size = range_size_mb * 1024 * 1024
+    progress = {"files": 0, "bytes": 0}
+    progress_lock = threading.Lock()
+    start_time = time.time()
+
+    def download_file(file, range_executor):
+        filename = file.rsplit("/", 1)[1]
+        blob_url = f"{sas_base_url}/{filename}{sas_token}"
+        localfilepath = get_blob_local_file_path(file, storaceaccount, container, localbasepath)
+        response = requests.head(blob_url, timeout = 60)
+        response.raise_for_status()
+        blob_size = int(response.headers["Content-Length"])
+        # pre-size a temporary file so every range can be written at its own offset
+        partfilepath = f"{localfilepath}.part"
+        with open(partfilepath, "wb") as localfile:
+            localfile.truncate(blob_size)
+        try:
+            ranges = [(start, min(start + range_size, blob_size) - 1) for start in range(0, blob_size, range_size)]
+            if len(ranges) > 1:
+                futures = [range_executor.submit(download_blob_range, blob_url, partfilepath, start, end, max_retries) for start, end in ranges]
+                wait(futures) # let every range finish before the file is renamed or removed
+                downloaded = sum([future.result() for future in futures])
+            elif ranges: downloaded = download_blob_range(blob_url, partfilepath, ranges[0][0], ranges[0][1], max_retries)
+            else: downloaded = 0
+            if downloaded != blob_size: raise Exception(f"downloaded {downloaded} of {blob_size} bytes")
+            os.replace(partfilepath, localfilepath)
+        except:
+            # never leave a partial zero-filled file behind
+            if os.path.exists(partfilepath): os.remove(partfilepath)
+            raise
+        with progress_lock:
+            progress["files"] += 1
+            progress["bytes"] += downloaded
+            elapsed = max(time.time() - start_time, 0.001)
+            print(f"[{progress['files']}/{len(blobfileslist)}] downloaded '{file}' ({downloaded / 1048576:.1f} MB) - total {progress['bytes'] / 1048576:.1f} MB at {progress['bytes'] / 1048576 / elapsed:.1f} MB/s")
+        return localfilepath
+
+    localfilepaths, failed = [], []
+    with ThreadPoolExecutor(max_workers = max_range_workers) as range_executor:
+        with ThreadPoolExecutor(max_workers = max_file_workers) as file_executor:
+            futures = {file_executor.submit(download_file, file, range_executor): file for file in blobfileslist}
+            for future in as_completed(futures):
+                try: localfilepaths.append(future.result())
+                except Exception as e:
+                    failed.append(futures[future])
+                    print(f"failed to download '{futures[future]}': {str(e)[:100]}")
+    elapsed = max(time.time() - start_time, 0.001)
+    print(f"downloaded {progress['files']} files ({progress['bytes'] / 1048576:.1f} MB) in {elapsed:.1f} seconds ({progress['bytes'] / 1048576 / elapsed:.1f} MB/s); failed: {len(failed)}\n")
+    return localfilepaths, failed
+
+# COMMAND ----------
+
 # DBTITLE 1,Read Flight Tech Data From Azure Storage Account Container
 try:# get flight tech pdf file paths
-    fileslistpdf = storage_account_obj.listblobfiles(
+    fileslistpdf = get_storage_account_obj().listblobfiles(
         storageacctname = storage_account_name, 
         container = az_container_ft, 
         folderpath = f"{az_storage_acct_fldr_path_pdfs_ft}/", 
         sas_token = sas_token_ft_lf
     )
-    download_blob_files(fileslistpdf, storage_account_name, az_container_ft, base_sas_url_pdfs_ft, sas_token_ft_rf_pdf) # uses sas token to get data
+    localfilespdf, failedfilespdf = download_blob_files_parallel(fileslistpdf, storage_account_name, az_container_ft, base_sas_url_pdfs_ft, sas_token_ft_rf_pdf) # uses sas token to get data
 except: print("user does not have access....")
 
 # COMMAND ----------
@@ -139,24 +256,24 @@ except: print("user does not have access....")
 # DBTITLE 1,Read Autonomy and Navigation Data From Azure Storage Account Container
 try:
     # get autonomy and navigation image file paths
-    fileslistimg = storage_account_obj.listblobfiles(
+    fileslistimg = get_storage_account_obj().listblobfiles(
         storageacctname = storage_account_name,
         container = az_container_autnav,
         folderpath = f"{az_fldr_path_images_autnav}/",
         sas_token = sas_token_autnav_lf
     )
-    download_blob_files(fileslistimg, storage_account_name, az_container_autnav, base_sas_url_images_autnav, sas_token_autnav_rf_imgs) # uses sas token to get data
+    localfilesimg, failedfilesimg = download_blob_files_parallel(fileslistimg, storage_account_name, az_container_autnav, base_sas_url_images_autnav, sas_token_autnav_rf_imgs) # uses sas token to get data
 except: print("user does not have access....")
 
 try:
     # get autonomy and navigation matlab file paths
-    filelistmat = storage_account_obj.listblobfiles(
+    filelistmat = get_storage_account_obj().listblobfiles(
         storageacctname = storage_account_name, 
         container = az_container_autnav, 
         folderpath = f"{az_fldr_path_matlab_autnav}/", 
         sas_token = sas_token_autnav_lf
     )
-    download_blob_files(filelistmat, storage_account_name, az_container_autnav, base_sas_url_matlab_autnav, sas_token_autnav_rf_matlab) # uses sas token to get data
+    localfilesmat, failedfilesmat = download_blob_files_parallel(filelistmat, storage_account_name, az_container_autnav, base_sas_url_matlab_autnav, sas_token_autnav_rf_matlab) # uses sas token to get data
 except: print("user does not have access....")
 
 # COMMAND ----------
@@ -19,6 +19,7 @@ import requests
 import json
 import os
 import re
+import tempfile
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -28,7 +29,18 @@ from utils import (
     ColumnDescriptionImporter,
     TableDescriptionGenerator,
     TableDescriptionImporter,
-    TagProcessor
+    TagProcessor,
+    DescriptionCache,
+    MetadataPrefetcher,
+    TableSampler,
+    DescriptionResultsStore,
+    AdaptiveConcurrencyController,
+    OverrideIndex,
+    ProgressLedger,
+    PromptMetrics,
+    DescriptionSimilarityCache,
+    ModelRouter,
+    HedgedRequestExecutor
 )
 
 # COMMAND ----------
@@ -45,11 +57,53 @@ dbutils.widgets.text("base_volume_path", "/Volumes/dna_dev/raltmil/blobs", "Volu
 dbutils.widgets.dropdown("model_endpoint", "databricks-claude-sonnet-4-5", 
                         ["databricks-meta-llama-3-3-70b-instruct", "databricks-claude-sonnet-4-5", "databricks-gemini-2-5-pro"], 
                         "AI Model Endpoint")
+dbutils.widgets.text("fast_model_endpoint", "", "Fast Model Endpoint for Easy Descriptions (optional)")
+dbutils.widgets.dropdown("hedge_requests", "false", ["true", "false"], "Hedge Slow Model Calls")
+dbutils.widgets.text("hedge_endpoint", "", "Hedge Endpoint (optional, default: same endpoint)")
+dbutils.widgets.text("description_cache_table", "", "Description Cache Table (optional)")
+dbutils.widgets.text("results_table", "", "Description Results Table (optional)")
+dbutils.widgets.text("token_budget", "", "Model Token Budget per Run (optional)")
+dbutils.widgets.text("progress_ledger_table", "", "Progress Ledger Table (optional, enables resume)")
+dbutils.widgets.dropdown("batch_ai_query", "false", ["true", "false"], "Set-Based ai_query for Column Descriptions")
+dbutils.widgets.dropdown("column_prompt_mode", "single_column", ["single_column", "multi_column"], "Column Prompt Mode")
+dbutils.widgets.text("column_prompt_token_budget", "", "Column Prompt Token Budget (optional)")
+dbutils.widgets.text("table_prompt_token_budget", "", "Table Prompt Token Budget (optional)")
+dbutils.widgets.text("shard_index", "0", "Shard Index")
+dbutils.widgets.text("shard_count", "1", "Shard Count")
 
 # Get parameters
 file_path = dbutils.widgets.get("file_path")
 base_volume_path = dbutils.widgets.get("base_volume_path")
 model_endpoint = dbutils.widgets.get("model_endpoint")
+fast_model_endpoint = dbutils.widgets.get("fast_model_endpoint").strip()
+hedge_requests = dbutils.widgets.get("hedge_requests") == "true"
+hedge_endpoint = dbutils.widgets.get("hedge_endpoint").strip()
+description_cache_table = dbutils.widgets.get("description_cache_table").strip()
+results_table = dbutils.widgets.get("results_table").strip()
+token_budget = dbutils.widgets.get("token_budget").strip()
+progress_ledger_table = dbutils.widgets.get("progress_ledger_table").strip()
+batch_ai_query = dbutils.widgets.get("batch_ai_query") == "true"
+column_prompt_mode = dbutils.widgets.get("column_prompt_mode")
+column_prompt_token_budget = dbutils.widgets.get("column_prompt_token_budget").strip()
+table_prompt_token_budget = dbutils.widgets.get("table_prompt_token_budget").strip()
+shard_index = int(dbutils.widgets.get("shard_index"))
+shard_count = int(dbutils.widgets.get("shard_count"))
+
+# Content-addressed cache of generated descriptions (only new or changed columns/tables call the model)
+description_cache = None
+if description_cache_table:
+    description_cache = DescriptionCache(spark, description_cache_table)
+    description_cache.ensure_table()
+
+# Delta results table for generated descriptions (replaces the per-table JSON folders under bulk_comments)
+results_store = None
+if results_table:
+    results_store = DescriptionResultsStore(spark, results_table)
+    results_store.ensure_table()
+
+# Progress ledger of table/stage status: reruns skip finished tables, shards split the Excel rows without overlap
+progress_ledger = ProgressLedger(spark, progress_ledger_table or None, shard_index=shard_index, shard_count=shard_count)
+progress_ledger.ensure_table()
 
 # Get workspace info
 workspace_url = spark.conf.get("spark.databricks.workspaceUrl")
@@ -61,10 +115,41 @@ try:
 except: 
     default_parallelism = (4 * os.cpu_count()) - 1
 
+# Model serving concurrency adapts to the endpoint (AIMD): starts at default_parallelism, grows while
+# latency stays flat and backs off on 429s / latency spikes; generation thread pools are sized to its maximum
+model_concurrency = AdaptiveConcurrencyController(
+    initial_concurrency=int(default_parallelism),
+    max_concurrency=max(4, int(default_parallelism) * 2),
+    token_budget=int(token_budget) if token_budget else None
+)
+
+# Latency-tiered routing: easy descriptions (short prompts, simple types, low-entropy samples) go to the fast
+# endpoint, the rest to model_endpoint; per-tier latency and failure rate are printed in the execution summary
+model_router = ModelRouter(fast_endpoint=fast_model_endpoint, large_endpoint=model_endpoint) if fast_model_endpoint else None
+
+# Hedged requests: a model call slower than the p95 of earlier calls is duplicated (to hedge_endpoint when set)
+# and the first response wins; at most 10% of calls are hedged
+hedged_executor = None
+if hedge_requests:
+    hedged_executor = HedgedRequestExecutor(
+        hedge_percentile=0.95,
+        max_hedge_ratio=0.1,
+        secondary_endpoint=hedge_endpoint or None,
+        max_workers=model_concurrency.max_concurrency * 2
+    )
+
 print(f"Number of executors: {int(default_parallelism)}")
+print(f"Model concurrency: {model_concurrency.limit} (max {model_concurrency.max_concurrency}), token budget: {model_concurrency.token_budget or 'unlimited'}")
 print(f"File path: {file_path}")
 print(f"Volume path: {base_volume_path}")
 print(f"AI Model Endpoint: {model_endpoint}")
+print(f"Fast Model Endpoint: {fast_model_endpoint or 'disabled (all requests use the AI Model Endpoint)'}")
+print(f"Hedged requests: {'enabled (' + (hedge_endpoint or 'same endpoint') + ')' if hedged_executor else 'disabled'}")
+print(f"Description cache: {description_cache_table or 'disabled'}")
+print(f"Results table: {results_table + ' (run ' + results_store.run_id + ')' if results_store else 'disabled (JSON files)'}")
+print(f"Progress ledger: {progress_ledger_table or 'disabled'}, shard {shard_index + 1}/{shard_count}")
+print(f"Column prompts: {column_prompt_mode}{' (set-based ai_query)' if batch_ai_query else ''}, token budget: {column_prompt_token_budget or 'unlimited'}")
+print(f"Table prompts: token budget: {table_prompt_token_budget or 'unlimited'}")
 print(f"\nWorkspace: {workspace_url}")
 
 # COMMAND ----------
@@ -140,52 +225,34 @@ print(df_pandas[['table_catalog', 'table_schema', 'table_name']].head())
 # COMMAND ----------
 
 # MAGIC %md
-# MAGIC ## Helper Functions for Override JSON
+# MAGIC ## Override JSON Index
 
 # COMMAND ----------
 
-def parse_override_json(json_string, table_name):
-    """
-    Parse and validate override JSON.
-    Returns None if JSON is empty.
-    Raises exception if JSON is invalid.
-    """
-    if pd.isna(json_string) or str(json_string).strip() == '':
-        return None
-    
-    try:
-        override_data = json.loads(json_string)
-        return override_data
-    except Exception as e:
-        raise ValueError(f"❌ INVALID JSON for table {table_name}: {str(e)}")
-
-def get_table_override_json(df_pandas, catalog, schema, table):
-    """
-    Get override JSON for a specific table from the Excel data.
-    Returns None if override is disabled or not applicable.
-    """
-    # Find the row for this table
-    mask = (
-        (df_pandas['table_catalog'] == catalog) &
-        (df_pandas['table_schema'] == schema) &
-        (df_pandas['table_name'] == table)
-    )
-    
-    matching_rows = df_pandas[mask]
-    if matching_rows.empty:
-        return None
-    
-    row = matching_rows.iloc[0]
-    
-    # Check if override is enabled
-    override_desc = row.get('override_desc')
-    if pd.isna(override_desc) or str(override_desc).strip().upper() != 'Y':
-        return None
-    
-    # Parse and return JSON
-    override_json_str = row.get('override_json')
-    full_table_name = f"{catalog}.{schema}.{table}"
-    return parse_override_json(override_json_str, full_table_name)
+# DBTITLE 1,Build Override Index
+# Parse and validate every override JSON once; generators look their table up by catalog.schema.table
+override_index = OverrideIndex.from_pandas(df_pandas)
+
+print(f"Tables with override JSON: {len(override_index.overrides)}")
+if override_index.errors:
+    print(f"⚠️  Tables with INVALID override JSON (their descriptions will fail): {len(override_index.errors)}")
+    for error in override_index.errors.values():
+        print(f"   {error}")
+
+# COMMAND ----------
+
+# DBTITLE 1,Shard and Resume
+# Keep only the Excel rows owned by this shard (stable hash of catalog.schema.table)
+df_pandas["table_full_name"] = (df_pandas["table_catalog"].astype(str) + "." +
+                                df_pandas["table_schema"].astype(str) + "." +
+                                df_pandas["table_name"].astype(str))
+shard_table_names = set(ProgressLedger.shard_tables(df_pandas["table_full_name"].tolist(), shard_index, shard_count))
+df_pandas = df_pandas[df_pandas["table_full_name"].isin(shard_table_names)].reset_index(drop=True)
+
+# Tables already tagged successfully in a previous run are skipped
+tables_pending_tags = set(progress_ledger.pending_tables("tags", df_pandas["table_full_name"].tolist()))
+print(f"Tables in shard {shard_index + 1}/{shard_count}: {len(df_pandas)}")
+print(f"Tables pending tags: {len(tables_pending_tags)} (skipping {len(df_pandas) - len(tables_pending_tags)} finished)")
 
 # COMMAND ----------
 
@@ -208,7 +275,11 @@ tag_processor = TagProcessor(
 )
 
 # Execute with multithreading
-tag_results = tag_processor.execute(df_pandas, max_workers=int(default_parallelism))
+tag_results = tag_processor.execute(df_pandas[df_pandas["table_full_name"].isin(tables_pending_tags)], max_workers=int(default_parallelism))
+for r in tag_results:
+    progress_ledger.record(r["table"], "tags", "success" if r["status"] == "success" else "error",
+                           r.get("seconds"), "; ".join(r.get("errors", [])))
+progress_ledger.checkpoint()
 
 print("\n" + "=" * 80)
 print(f"TAGS APPLICATION COMPLETE: {len(tag_results)} tables processed")
@@ -219,12 +290,16 @@ if tag_results:
     successful = sum(1 for r in tag_results if r['status'] in ['success', 'partial'])
     failed = sum(1 for r in tag_results if r['status'] == 'error')
     partial = sum(1 for r in tag_results if r['status'] == 'partial')
+    tags_set = sum(r.get('success_count', 0) for r in tag_results)
+    tags_unchanged = sum(r.get('unchanged_count', 0) for r in tag_results)
     
     print("\nSummary:")
     print(f"  Total: {len(tag_results)}")
     print(f"  Successful: {successful - partial}")
     print(f"  Partial: {partial}")
     print(f"  Failed: {failed}")
+    print(f"  Tags set: {tags_set}")
+    print(f"  Tags unchanged (skipped): {tags_unchanged}")
     
     # Show partial failure details
     if partial > 0:
@@ -270,6 +345,14 @@ for idx, row in df_pandas.iterrows():
         if full_table_name not in tables_needing_any_desc:
             tables_needing_any_desc.append(full_table_name)
 
+# Tables whose descriptions were imported in a previous run are skipped (failed or unfinished ones are redone)
+finished_column_desc = len(tables_needing_column_desc)
+finished_table_desc = len(tables_needing_table_desc)
+tables_needing_column_desc = progress_ledger.pending_tables("column_import", tables_needing_column_desc)
+tables_needing_table_desc = progress_ledger.pending_tables("table_import", tables_needing_table_desc)
+finished_column_desc -= len(tables_needing_column_desc)
+finished_table_desc -= len(tables_needing_table_desc)
+
 print("\n" + "=" * 80)
 print("DESCRIPTION PROCESSING SUMMARY")
 print("=" * 80)
@@ -277,11 +360,13 @@ print(f"Total tables in Excel: {len(df_pandas)}")
 print(f"Tables with tags applied: {len(tag_results)}")
 print(f"Tables needing TABLE descriptions: {len(tables_needing_table_desc)}")
 print(f"Tables needing COLUMN descriptions: {len(tables_needing_column_desc)}")
+print(f"Tables skipped (finished in a previous run): table={finished_table_desc}, column={finished_column_desc}")
 print(f"Total tables needing any descriptions: {len(tables_needing_any_desc)}")
 print("=" * 80)
 
-# Clean up old description files for fresh run
-if tables_needing_column_desc or tables_needing_table_desc:
+# Clean up old description files for fresh run (the results table keeps runs apart by run_id instead;
+# resumed or sharded runs keep the files of other tables since imports only read the tables they generated)
+if results_store is None and not progress_ledger_table and shard_count == 1 and (tables_needing_column_desc or tables_needing_table_desc):
     print("\nCleaning old description files...")
     try:
         if tables_needing_column_desc:
@@ -299,6 +384,29 @@ if tables_needing_column_desc or tables_needing_table_desc:
 
 # COMMAND ----------
 
+# DBTITLE 1,Prefetch Table and Column Metadata
+# One set-based information_schema query each for all targeted tables; workers get their slice
+metadata_prefetcher = MetadataPrefetcher(spark)
+prefetched_column_metadata = metadata_prefetcher.prefetch_columns(tables_needing_column_desc)
+prefetched_table_info = metadata_prefetcher.prefetch_tables(tables_needing_table_desc)
+print(f"Prefetched column metadata for {len(prefetched_column_metadata)} table(s)")
+print(f"Prefetched table metadata for {len(prefetched_table_info)} table(s)")
+
+# Shared sample rows: each table is read once for both the column and table descriptions
+# (data_limit/max_cell_chars cover the largest values either generator config asks for).
+# Samples evicted from memory during the column phase spill to local disk for the table phase.
+table_sampler = TableSampler(spark, data_limit=5, max_cell_chars=1000,
+                             spill_path=tempfile.mkdtemp(prefix="table_samples_"))
+
+# Prompt size metrics shared by both generators (see prompt_token_budget in the generator configs)
+prompt_metrics = PromptMetrics()
+
+# Reuse descriptions of near-duplicate columns across tables (same normalized name, type family and value shape).
+# Pass embed_fn (texts -> vectors, e.g. a local sentence-transformers model's encode) to also match similar names.
+similarity_cache = DescriptionSimilarityCache()
+
+# COMMAND ----------
+
 # MAGIC %md
 # MAGIC ## Column Descriptions
 
@@ -320,7 +428,12 @@ if tables_needing_column_desc:
         "max_cell_chars": 250,
         "always_update": True,
         "prompt_return_length": 40,
-        "output_file_format": "json"
+        "output_file_format": "json",
+        "batch_ai_query": batch_ai_query,  # Opt-in: one set-based ai_query per table instead of one query per column
+        "prompt_token_budget": int(column_prompt_token_budget) if column_prompt_token_budget else None,  # Opt-in: only the column's distinct sample values, truncated to fit
+        "prompt_mode": column_prompt_mode,  # Opt-in "multi_column": one structured-JSON prompt describes many columns (chunked by multi_column_token_budget)
+        "multi_column_token_budget": 6000,
+        "multi_column_max_output_tokens": 2000  # Also caps columns per chunk so the JSON answer is not cut off
     }
     
     # Helper: Generate
@@ -333,7 +446,7 @@ if tables_needing_column_desc:
             catalog, schema, table = parts
             
             # Get override JSON for this table
-            override_json = get_table_override_json(df_pandas, catalog, schema, table)
+            override_json = override_index.get(table_full_name)
             
             generator = ColumnDescriptionGenerator(
                 spark=spark,
@@ -342,11 +455,21 @@ if tables_needing_column_desc:
                 table=table,
                 output_path=base_volume_path,
                 override_json=override_json,
+                description_cache=description_cache,
+                column_metadata=prefetched_column_metadata.get(table_full_name, []),
+                table_sampler=table_sampler,
+                results_store=results_store,
+                concurrency_controller=model_concurrency,
+                prompt_metrics=prompt_metrics,
+                model_router=model_router,
+                hedged_executor=hedged_executor,
+                similarity_cache=similarity_cache,
                 **column_desc_config
             )
             
             commented_columns = generator.execute()
             column_count = commented_columns.count()
+            replace_count = commented_columns.filter(col("replace_comment") == True).count()  # Rows the importer applies
             
             # Count source types
             source_counts = commented_columns.groupBy("source").count().collect()
@@ -361,6 +484,7 @@ if tables_needing_column_desc:
                 "status": "success", 
                 "message": f"{column_count} cols (AI:{ai_count}, Manual:{manual_count}, Audit:{audit_count})", 
                 "columns": column_count,
+                "replace_columns": replace_count,
                 "ai": ai_count,
                 "manual": manual_count,
                 "audit": audit_count
@@ -368,43 +492,20 @@ if tables_needing_column_desc:
         except Exception as e:
             return {"table": table_full_name, "status": "error", "message": str(e)[:100], "columns": 0, "ai": 0, "manual": 0, "audit": 0}
     
-    # Helper: Import
-    def import_column_descriptions_for_table(table_info):
-        try:
-            table_full_name = table_info["table"]
-            parts = table_full_name.split('.')
-            if len(parts) != 3:
-                return {"table": table_full_name, "status": "error", "message": "Invalid table name", "columns": 0}
-            
-            catalog, schema, table = parts
-            importer = ColumnDescriptionImporter(
-                spark=spark,
-                input_path=f"{base_volume_path}/bulk_comments/columns/json/{table}",
-                output_file_format="json"
-            )
-            
-            result = importer.execute()
-            return {
-                "table": table_full_name,
-                "status": "success",
-                "message": f"{result['successful_columns']} columns",
-                "columns": result['successful_columns']
-            }
-        except Exception as e:
-            return {"table": table_full_name, "status": "error", "message": str(e)[:100], "columns": 0}
-    
     # Step 1: Generate
     print("\n--- Step 1: Generating Column Descriptions ---")
     print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting parallel generation...")
     
-    with ThreadPoolExecutor(max_workers=int(default_parallelism)) as executor:
-        futures = {executor.submit(generate_column_descriptions_for_table, tbl): tbl for tbl in tables_needing_column_desc}
+    with ThreadPoolExecutor(max_workers=model_concurrency.max_concurrency) as executor:
+        futures = {executor.submit(progress_ledger.track, tbl, "column_generate", generate_column_descriptions_for_table, tbl): tbl
+                   for tbl in tables_needing_column_desc}
         generation_results = []
         for i, future in enumerate(as_completed(futures), 1):
             result = future.result()
             generation_results.append(result)
             status_icon = "✓" if result["status"] == "success" else "✗"
             print(f"  [{i}/{len(tables_needing_column_desc)}] {status_icon} {result['table']} - {result['message']}")
+    progress_ledger.checkpoint()
     
     successful_generations = [r for r in generation_results if r["status"] == "success"]
     total_columns = sum(r["columns"] for r in successful_generations)
@@ -431,14 +532,43 @@ if tables_needing_column_desc:
     print("\n--- Step 2: Importing Column Descriptions ---")
     print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting parallel import...")
     
-    with ThreadPoolExecutor(max_workers=int(default_parallelism)) as executor:
-        futures = {executor.submit(import_column_descriptions_for_table, r): r["table"] for r in successful_generations}
-        import_results = []
-        for i, future in enumerate(as_completed(futures), 1):
-            result = future.result()
-            import_results.append(result)
-            status_icon = "✓" if result["status"] == "success" else "✗"
-            print(f"  [{i}/{len(successful_generations)}] {status_icon} {result['table']} - {result['message']}")
+    # One read of all generated tables, one ALTER TABLE per table, tables in parallel
+    import_results = []
+    try:
+        importer = ColumnDescriptionImporter(
+            spark=spark,
+            input_path=f"{base_volume_path}/bulk_comments/columns/json",
+            output_file_format="json",
+            table_list=[r["table"] for r in successful_generations],
+            max_workers=int(default_parallelism),
+            results_store=results_store
+        )
+        importer.execute()
+        for i, r in enumerate(sorted(importer.table_results, key=lambda r: r["table"]), 1):
+            status = "success" if r["failed_columns"] == 0 else "error"
+            message = f"{r['successful_columns']} columns in {r['seconds']}s ({r['statements']} statement(s))"
+            if r["errors"]:
+                message += f"; failed: {'; '.join(r['errors'])[:100]}"
+            import_results.append({"table": r["table"], "status": status, "message": message, "columns": r["successful_columns"], "seconds": r["seconds"]})
+            status_icon = "✓" if status == "success" else "✗"
+            print(f"  [{i}/{len(successful_generations)}] {status_icon} {r['table']} - {message}")
+        # Only tables the generator reported as having no columns to replace have nothing to import;
+        # any other table without an import result was not applied
+        imported_tables = {r["table"] for r in import_results}
+        for r in successful_generations:
+            if r["table"] in imported_tables:
+                continue
+            if r.get("replace_columns") == 0:
+                import_results.append({"table": r["table"], "status": "success", "message": "0 columns to replace", "columns": 0})
+            else:
+                import_results.append({"table": r["table"], "status": "error", "message": "No import result", "columns": 0})
+    except Exception as e:
+        print(f"  ✗ Error importing column descriptions: {str(e)[:150]}")
+        import_results = [{"table": r["table"], "status": "error", "message": f"Import: {str(e)[:100]}", "columns": 0} for r in successful_generations]
+    
+    for r in import_results:
+        progress_ledger.record(r["table"], "column_import", r["status"], r.get("seconds"), r["message"] if r["status"] != "success" else None)
+    progress_ledger.checkpoint()
     
     successful_imports = [r for r in import_results if r["status"] == "success"]
     total_imported = sum(r["columns"] for r in successful_imports)
@@ -485,7 +615,8 @@ if tables_needing_table_desc:
         "max_cell_chars": 1000,
         "always_update": True,
         "prompt_return_length": 200,
-        "output_file_format": "json"
+        "output_file_format": "json",
+        "prompt_token_budget": int(table_prompt_token_budget) if table_prompt_token_budget else None  # Opt-in: distinct sample rows without all-null columns, truncated to fit
     }
     
     # Helper: Generate
@@ -498,7 +629,7 @@ if tables_needing_table_desc:
             catalog, schema, table = parts
             
             # Get override JSON for this table
-            override_json = get_table_override_json(df_pandas, catalog, schema, table)
+            override_json = override_index.get(table_full_name)
             
             generator = TableDescriptionGenerator(
                 spark=spark,
@@ -507,6 +638,14 @@ if tables_needing_table_desc:
                 table=table,
                 output_path=base_volume_path,
                 override_json=override_json,
+                description_cache=description_cache,
+                table_info=prefetched_table_info.get(table_full_name, {}),
+                table_sampler=table_sampler,
+                results_store=results_store,
+                concurrency_controller=model_concurrency,
+                prompt_metrics=prompt_metrics,
+                model_router=model_router,
+                hedged_executor=hedged_executor,
                 **table_desc_config
             )
             
@@ -533,14 +672,16 @@ if tables_needing_table_desc:
     print("\n--- Step 1: Generating Table Descriptions ---")
     print(f"[{datetime.now().strftime('%H:%M:%S')}] Starting parallel generation...")
     
-    with ThreadPoolExecutor(max_workers=int(default_parallelism)) as executor:
-        futures = {executor.submit(generate_table_descriptions_for_table, tbl): tbl for tbl in tables_needing_table_desc}
+    with ThreadPoolExecutor(max_workers=model_concurrency.max_concurrency) as executor:
+        futures = {executor.submit(progress_ledger.track, tbl, "table_generate", generate_table_descriptions_for_table, tbl): tbl
+                   for tbl in tables_needing_table_desc}
         generation_results = []
         for i, future in enumerate(as_completed(futures), 1):
             result = future.result()
             generation_results.append(result)
             status_icon = "✓" if result["status"] == "success" else "✗"
             print(f"  [{i}/{len(tables_needing_table_desc)}] {status_icon} {result['table']} - {result['message']}")
+    progress_ledger.checkpoint()
     
     successful_generations = [r for r in generation_results if r["status"] == "success"]
     
@@ -574,14 +715,27 @@ if tables_needing_table_desc:
                 spark=spark,
                 input_path=f"{base_volume_path}/bulk_comments/tables/json",
                 output_file_format="json",
-                table_list=tables_to_import  # Only import these specific tables
+                table_list=tables_to_import,  # Only import these specific tables
+                max_workers=int(default_parallelism),
+                results_store=results_store
             )
             result = importer.execute()
             print(f"  ✓ Imported descriptions for {result['tables_processed']} table(s)")
+            if result['table_results']:
+                slowest = max(result['table_results'], key=lambda r: r['seconds'])
+                print(f"  ⏱  Slowest table: {slowest['table']} ({slowest['seconds']}s)")
             table_import_success = (result['tables_processed'] > 0)
+            import_status = {r['table']: r for r in result['table_results']}
+            for table_full_name in tables_to_import:
+                # A generated table without an import result was not applied (e.g. its description was not found)
+                r = import_status.get(table_full_name, {"status": "error", "seconds": None, "error": "No import result"})
+                progress_ledger.record(table_full_name, "table_import", r["status"], r["seconds"], r["error"])
         except Exception as e:
             print(f"  ✗ Error importing table descriptions: {str(e)}")
             table_import_success = False
+            for r in successful_generations:
+                progress_ledger.record(r["table"], "table_import", "error", None, f"Import: {str(e)[:150]}")
+        progress_ledger.checkpoint()
     
     print("\n" + "=" * 80)
     print(f"TABLE DESCRIPTIONS COMPLETE")
@@ -611,6 +765,12 @@ else:
 # COMMAND ----------
 
 # DBTITLE 1,Execution Summary
+# Write the remaining progress ledger records
+try:
+    progress_ledger.flush()
+except Exception as e:
+    print(f"⚠️  Progress ledger flush failed, this run's records were not saved: {str(e)[:200]}")
+
 # Calculate summary
 successful_tags = sum(1 for r in tag_results if r['status'] in ['success', 'partial']) if tag_results else 0
 failed_tags = sum(1 for r in tag_results if r['status'] == 'error') if tag_results else 0
@@ -644,6 +804,10 @@ print(f"   ✗ Failed: {table_desc_failed}")
 if table_desc_success > 0 and 'table_generation_stats' in locals():
     print(f"   📊 Source: AI={table_generation_stats['ai']}, Manual={table_generation_stats['manual']}")
 
+print(f"\n🔎 Table Samples:")
+print(f"   Reads: {table_sampler.misses}, Reused: {table_sampler.hits} ({table_sampler.spill_reads} from disk)")
+table_sampler.clear()
+
 # Show error details
 if failed_tags > 0:
     print("\n⚠️  Tag Failures - Details:")
@@ -665,6 +829,39 @@ if table_desc_failed > 0:
         print(f"   ✗ {table}")
         print(f"      {error_msg}")
 
+model_summary = model_concurrency.get_summary()
+print(f"\n⚙️  Model Concurrency:")
+print(f"   Calls: {model_summary['calls']}, Throttled: {model_summary['throttled_calls']}, Tokens (approx): {model_summary['tokens_used']}")
+print(f"   Final: {model_summary['concurrency']}, Peak: {model_summary['max_concurrency_reached']}")
+for h in model_concurrency.get_history():
+    print(f"   +{h['elapsed_seconds']}s → {h['concurrency']} ({h['reason']})")
+
+prompt_summary = prompt_metrics.get_summary()
+print(f"\n✂️  Prompt Size (approx tokens):")
+print(f"   Prompts: {prompt_summary['prompts']}, Avg: {prompt_summary['avg_tokens']}, Max: {prompt_summary['max_tokens']}, Truncated: {prompt_summary['truncated_prompts']}")
+
+similarity_summary = similarity_cache.get_summary()
+print(f"\n♻️  Similar Column Reuse:")
+print(f"   Lookups: {similarity_summary['lookups']}, Reused: {similarity_summary['exact_hits'] + similarity_summary['embedding_hits']} ({similarity_summary['reuse_rate']:.0%}), Ambiguous: {similarity_summary['ambiguous']}")
+
+if model_router is not None:
+    router_summary = model_router.get_summary()
+    print(f"\n🔀 Model Routing:")
+    for tier in ModelRouter.TIERS:
+        t = router_summary[tier]
+        print(f"   {tier} ({t['endpoint']}): Routed: {t['routed']}, Calls: {t['calls']}, Failure rate: {t['failure_rate']:.1%}, "
+              f"Avg latency: {t['avg_latency_seconds']}s, p95: {t['p95_latency_seconds']}s, Fallbacks: {t['fallbacks']}")
+    print(f"   Large tier reasons: {router_summary['reasons']}")
+
+if hedged_executor is not None:
+    hedge_summary = hedged_executor.get_summary()
+    print(f"\n🛡️  Hedged Requests:")
+    print(f"   Calls: {hedge_summary['calls']}, Hedged: {hedge_summary['hedges']} ({hedge_summary['hedge_rate']:.1%}), "
+          f"Hedge wins: {hedge_summary['hedge_wins']} (win rate {hedge_summary['win_rate']:.0%}), Budget exhausted: {hedge_summary['budget_exhausted']}, "
+          f"No capacity: {hedge_summary['busy_skips']}")
+    print(f"   Seconds saved (approx): {hedge_summary['seconds_saved']}, Thresholds: {hedge_summary['thresholds_seconds']}")
+    hedged_executor.close()
+
 print("\n" + "=" * 80)
 
 # Create detailed status table
@@ -13,12 +13,35 @@ from .table_description_processor import (
     TableDescriptionGenerator,
     TableDescriptionImporter
 )
+from .description_cache import DescriptionCache
+from .metadata_prefetcher import MetadataPrefetcher
+from .table_sampler import TableSampler
+from .results_store import DescriptionResultsStore
+from .concurrency_controller import AdaptiveConcurrencyController, TokenBudgetExceeded
+from .override_index import OverrideIndex
+from .progress_ledger import ProgressLedger
+from .prompt_budget import PromptMetrics
+from .description_similarity import DescriptionSimilarityCache
+from .model_router import ModelRouter
+from .hedged_requests import HedgedRequestExecutor
 
 __all__ = [
     'TagProcessor',
     'ColumnDescriptionGenerator',
     'ColumnDescriptionImporter',
     'TableDescriptionGenerator',
-    'TableDescriptionImporter'
+    'TableDescriptionImporter',
+    'DescriptionCache',
+    'MetadataPrefetcher',
+    'TableSampler',
+    'DescriptionResultsStore',
+    'AdaptiveConcurrencyController',
+    'TokenBudgetExceeded',
+    'OverrideIndex',
+    'ProgressLedger',
+    'PromptMetrics',
+    'DescriptionSimilarityCache',
+    'ModelRouter',
+    'HedgedRequestExecutor'
 ]
 
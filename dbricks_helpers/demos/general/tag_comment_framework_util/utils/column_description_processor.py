@@ -2,21 +2,59 @@
 Column Description Processor
 """
 
-from typing import Dict, List
+import json
+import re
+import time
+from typing import Dict, List, Optional
+from functools import reduce
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pyspark.sql import DataFrame, Row
 from pyspark.sql import functions as F
 from pyspark.sql.types import StructType, StructField, StringType, BooleanType
 
+from .prompt_budget import estimate_tokens, dedupe_values, fit_values_to_tokens
+
 
 class ColumnDescriptionGenerator:
     """Generate AI column descriptions and save to storage."""
     
+    # Prompt template (EXACT ORIGINAL wording), also hashed into description cache keys
+    COLUMN_PROMPT_TEMPLATE = (
+        'This description will be stored as a Unity Catalog table column comment. '
+        'Write a detailed, single-sentence description of approximately {prompt_return_length} words '
+        'for the column "{column_name}" from the table "{table}" in schema "{schema}" '
+        'within catalog "{catalog}". '
+        'This description should clearly explain what kind of information the column contains and its purpose. '
+        'The column data type is "{data_type}". '
+        'Use the following sample rows for context: {sample_text}. '
+        'Keep the description professional and concise, suitable for a data dictionary. '
+        'Do not mention schema or catalog names in the output.'
+    )
+    
+    # Multi-column prompt: one structured JSON response describing many columns of the table
+    MULTI_COLUMN_PROMPT_TEMPLATE = (
+        'These descriptions will be stored as Unity Catalog table column comments. '
+        'For each column listed below from the table "{table}" in schema "{schema}" within catalog "{catalog}", '
+        'write a detailed, single-sentence description of approximately {prompt_return_length} words '
+        'that clearly explains what kind of information the column contains and its purpose. '
+        'Keep each description professional and concise, suitable for a data dictionary. '
+        'Do not mention schema or catalog names in the descriptions.\n\n'
+        'Columns (name, data type, sample values):\n{column_lines}\n\n'
+        'Respond with only a JSON object that maps every column name exactly as listed above to its description, '
+        'with no other text.'
+    )
+    
     def __init__(self, spark, catalog, output_path,
                  endpoint_name="databricks-meta-llama-3-3-70b-instruct",
                  schema=None, table=None,
                  data_limit=5, max_cell_chars=1000, always_update=True,
                  prompt_return_length=40, output_file_format="json",
-                 override_json=None):
+                 override_json=None, batch_ai_query=False, description_cache=None,
+                 column_metadata=None, table_sampler=None, results_store=None,
+                 concurrency_controller=None, prompt_token_budget=None, prompt_metrics=None,
+                 prompt_mode="single_column", multi_column_token_budget=6000, multi_column_sample_tokens=50,
+                 multi_column_max_output_tokens=2000,
+                 similarity_cache=None, model_router=None, hedged_executor=None):
         self.spark = spark
         self.catalog = catalog
         self.schema = schema
@@ -29,46 +67,82 @@ class ColumnDescriptionGenerator:
         self.prompt_return_length = prompt_return_length
         self.output_file_format = output_file_format
         self.override_json = override_json or {}
+        self.column_override_index = self.build_column_override_index()  # {column_name: (description, source)}
+        self.batch_ai_query = batch_ai_query  # One set-based ai_query over all columns instead of one query per column
+        self.batch_retries = 0  # Columns retried one by one after a null/empty batch result
+        self.description_cache = description_cache  # Optional DescriptionCache consulted before calling the model
+        self.cache_hits = 0
+        self.column_metadata = column_metadata  # Optional prefetched [{column_name, data_type, comment}] (see MetadataPrefetcher)
+        self.table_sampler = table_sampler  # Optional TableSampler shared with TableDescriptionGenerator
+        self.results_store = results_store  # Optional DescriptionResultsStore written instead of per-table files
+        self.concurrency_controller = concurrency_controller  # Optional AdaptiveConcurrencyController shared by all generators
+        self.prompt_token_budget = prompt_token_budget  # Optional max prompt tokens: sample projected to the column, deduped, truncated
+        self.prompt_metrics = prompt_metrics  # Optional PromptMetrics shared by all generators
+        self.prompt_mode = prompt_mode  # "single_column" (one prompt per column) or "multi_column" (one JSON prompt per chunk of columns)
+        self.multi_column_token_budget = multi_column_token_budget  # Max tokens per multi-column prompt (columns are chunked to fit)
+        self.multi_column_sample_tokens = multi_column_sample_tokens  # Sample value tokens per column line
+        self.multi_column_max_output_tokens = multi_column_max_output_tokens  # Response tokens per chunk (also sent as max_tokens)
+        self.multi_column_calls = 0
+        self.multi_column_retries = 0  # Columns retried one by one after an invalid/missing JSON entry
+        self.multi_column_mismatches = 0  # Chunks whose JSON keys did not match the requested columns
+        self.similarity_cache = similarity_cache  # Optional DescriptionSimilarityCache shared by all column generators
+        self.similarity_hits = 0
+        self.model_router = model_router  # Optional ModelRouter choosing a fast or large endpoint per request
+        self.hedged_executor = hedged_executor  # Optional HedgedRequestExecutor duplicating straggling model calls
+        self.table_columns = []  # [(column_name, data_type)] of the whole table, hashed into description cache keys
     
     def get_column_info(self) -> List[Dict]:
         """Get column metadata and sample data (matches original logic exactly)."""
         full_table_name = f"{self.catalog}.{self.schema}.{self.table}"
         
-        # Get column metadata
-        columns_df = self.spark.sql(f"""
-            SELECT column_name, data_type, comment
-            FROM system.information_schema.columns
-            WHERE table_catalog = '{self.catalog}'
-            AND table_schema = '{self.schema}'
-            AND table_name = '{self.table}'
-            ORDER BY ordinal_position
-        """)
-        
-        columns = columns_df.collect()
+        # Get column metadata (prefetched in bulk when provided)
+        if self.column_metadata is not None:
+            columns = self.column_metadata
+        else:
+            columns_df = self.spark.sql(f"""
+                SELECT column_name, data_type, comment
+                FROM system.information_schema.columns
+                WHERE table_catalog = '{self.catalog}'
+                AND table_schema = '{self.schema}'
+                AND table_name = '{self.table}'
+                ORDER BY ordinal_position
+            """)
+            
+            columns = columns_df.collect()
+        self.table_columns = [(col["column_name"], col["data_type"]) for col in columns]
         
         # Get sample data (matching original logic with recursive dict and truncation)
         sample_rows = []
         try:
-            data_query = f"SELECT * FROM {full_table_name} LIMIT {self.data_limit}"
-            rows_raw = [row.asDict(recursive=True) for row in self.spark.sql(data_query).collect()]
+            if self.table_sampler is not None:
+                # Shared sample: the table is read once for both generators, projected to the described columns
+                column_names = [col["column_name"] for col in columns] or None
+                rows = self.table_sampler.get_sample(full_table_name, self.data_limit, column_names)
+                sample_rows = self.table_sampler.truncate_rows(rows, self.max_cell_chars)
+            else:
+                data_query = f"SELECT * FROM {full_table_name} LIMIT {self.data_limit}"
+                rows_raw = [row.asDict(recursive=True) for row in self.spark.sql(data_query).collect()]
             
-            for row_dict in rows_raw:
-                clean_row = {}
-                for col, val in row_dict.items():
-                    if val is None:
-                        clean_row[col] = None
-                    else:
-                        val_str = str(val)
-                        # Truncate overly long individual column values only
-                        if len(val_str) > self.max_cell_chars:
-                            clean_row[col] = val_str[:self.max_cell_chars] + " ...[truncated]"
+                for row_dict in rows_raw:
+                    clean_row = {}
+                    for col, val in row_dict.items():
+                        if val is None:
+                            clean_row[col] = None
                         else:
-                            clean_row[col] = val_str
-                sample_rows.append(clean_row)
+                            val_str = str(val)
+                            # Truncate overly long individual column values only
+                            if len(val_str) > self.max_cell_chars:
+                                clean_row[col] = val_str[:self.max_cell_chars] + " ...[truncated]"
+                            else:
+                                clean_row[col] = val_str
+                    sample_rows.append(clean_row)
         except:
             sample_rows = []
         
-        # Build column info
+        return self.build_column_info(columns, sample_rows)
+    
+    def build_column_info(self, columns: List, sample_rows: List[Dict]) -> List[Dict]:
+        """Combine column metadata with the table's sample rows."""
         column_info = []
         for col in columns:
             col_name = col["column_name"]
@@ -81,41 +155,338 @@ class ColumnDescriptionGenerator:
         
         return column_info
     
+    def build_column_prompt(self, col_info: Dict, record_metrics: bool = True) -> str:
+        """
+        Build the column description prompt using EXACT ORIGINAL template.
+        With a prompt_token_budget the sample is only this column's distinct values, truncated to the budget.
+        """
+        def format_prompt(sample_text):
+            return self.COLUMN_PROMPT_TEMPLATE.format(
+                prompt_return_length=self.prompt_return_length,
+                column_name=col_info["column_name"],
+                table=self.table,
+                schema=self.schema,
+                catalog=self.catalog,
+                data_type=col_info["data_type"],
+                sample_text=sample_text
+            )
+        
+        truncated = False
+        if self.prompt_token_budget is None:
+            # Extract sample values for this specific column from the sample rows
+            sample_rows = col_info['sample_rows'][:3]  # Use only first 3 rows for brevity
+            sample_text = str(sample_rows)
+        else:
+            values = dedupe_values(row.get(col_info["column_name"]) for row in col_info['sample_rows'])
+            sample_budget = self.prompt_token_budget - estimate_tokens(format_prompt(""))
+            sample_text, truncated = fit_values_to_tokens(values, sample_budget)
+        
+        prompt = format_prompt(sample_text)
+        if self.prompt_metrics is not None and record_metrics:
+            self.prompt_metrics.record(prompt, truncated)
+        return prompt
+    
     def get_column_description_ai(self, col_info: Dict) -> str:
         """Generate AI description for a column using EXACT ORIGINAL template."""
-        # Extract sample values for this specific column from the sample rows
-        sample_rows = col_info['sample_rows'][:3]  # Use only first 3 rows for brevity
-        sample_text = str(sample_rows)
-        
-        prompt = (
-            f'This description will be stored as a Unity Catalog table column comment. '
-            f'Write a detailed, single-sentence description of approximately {self.prompt_return_length} words '
-            f'for the column "{col_info["column_name"]}" from the table "{self.table}" in schema "{self.schema}" '
-            f'within catalog "{self.catalog}". '
-            f'This description should clearly explain what kind of information the column contains and its purpose. '
-            f'The column data type is "{col_info["data_type"]}". '
-            f'Use the following sample rows for context: {sample_text}. '
-            f'Keep the description professional and concise, suitable for a data dictionary. '
-            f'Do not mention schema or catalog names in the output.'
-        )
+        prompt = self.build_column_prompt(col_info)
 
-        result = self.spark.sql(f"""
-            SELECT ai_query(
-                '{self.endpoint_name}',
-                '{prompt.replace("'", "''")}'
-            ) as description
-        """).collect()[0]['description']
+        def query_model(endpoint_name):
+            return self.spark.sql(f"""
+                SELECT ai_query(
+                    '{endpoint_name}',
+                    '{prompt.replace("'", "''")}'
+                ) as description
+            """).collect()[0]['description']
         
+        result = self.run_model_call(query_model, [prompt], self.classify_column(col_info, prompt))
+        if result is None or not result.strip():
+            raise ValueError(f"ai_query returned no description for column {col_info['column_name']}")
         return result.strip()
     
-    def get_column_description_with_override(self, col_info: Dict) -> tuple:
+    def get_column_descriptions_ai_batch(self, col_infos: List[Dict]) -> Dict[str, str]:
         """
-        Determine column description based on override logic.
-        Priority: audit_columns > specific columns > "ALL" > AI
-        Returns: (description, source) where source is 'ai'|'manual'|'audit'
+        Generate AI descriptions for many columns with one set-based ai_query.
+        Builds one DataFrame of (table, column, prompt) rows so Spark runs the model
+        calls in parallel across tasks instead of one driver round trip per column.
+        Columns whose ai_query result is null or empty are left out (the caller retries them).
+        Returns: {column_name: description}
+        """
+        if not col_infos:
+            return {}
+        
+        prompts = [self.build_column_prompt(c) for c in col_infos]
+        tiers = [self.classify_column(c, prompt) for c, prompt in zip(col_infos, prompts)]
+        
+        # One set-based query per model tier (a single query when no router is configured)
+        descriptions = {}
+        for tier in dict.fromkeys(tiers):
+            group = [(c, prompt) for c, prompt, t in zip(col_infos, prompts, tiers) if t == tier]
+            prompts_df = self.spark.createDataFrame(
+                [(self.catalog, self.schema, self.table, c["column_name"], prompt) for c, prompt in group],
+                schema="table_catalog string, table_schema string, table_name string, column_name string, prompt string"
+            )
+            
+            def query_model(endpoint_name, prompts_df=prompts_df):
+                results = (prompts_df
+                    .selectExpr("column_name", f"ai_query('{endpoint_name}', prompt) AS description")
+                    .collect())
+                return {r["column_name"]: r["description"].strip() for r in results
+                        if r["description"] is not None and r["description"].strip()}
+            
+            descriptions.update(self.run_model_call(query_model, [prompt for _, prompt in group], tier))
+        return descriptions
+    
+    def classify_column(self, col_info: Dict, prompt: str) -> Optional[str]:
+        """Model tier for a column prompt (None without a model router)."""
+        if self.model_router is None:
+            return None
+        sample_text = " ".join(str(v) for v in dedupe_values(self.get_sample_values(col_info)))
+        return self.model_router.classify(prompt, [col_info["data_type"]], sample_text)
+    
+    def run_model_call(self, query_model, prompts: List[str], tier: Optional[str] = None):
+        """
+        Run query_model(endpoint_name) on the notebook endpoint, or on the tier's endpoint when a model router
+        is configured, through the shared concurrency controller when one is configured.
+        With a hedged executor, calls slower than its latency percentile are duplicated and the first response wins;
+        the primary and the hedge then each run through the concurrency controller.
         """
-        col_name = col_info["column_name"]
+        prompt_tokens = sum(estimate_tokens(p) for p in prompts)
+        if self.hedged_executor is not None:
+            query_model = self.hedged_executor.wrap(query_model, len(prompts), self.concurrency_controller, prompt_tokens)
+        
+        if self.model_router is None:
+            call = lambda: query_model(self.endpoint_name)
+        else:
+            call = lambda: self.model_router.run(tier, query_model, len(prompts))
         
+        if self.concurrency_controller is None or self.hedged_executor is not None:
+            return call()
+        return self.concurrency_controller.run(call, prompt_tokens, len(prompts))
+    
+    def get_prompt_settings(self) -> List:
+        """The effective prompt template and the settings that shape the prompt or response."""
+        if self.prompt_mode == "multi_column":
+            return [self.MULTI_COLUMN_PROMPT_TEMPLATE, self.prompt_return_length,
+                    self.multi_column_sample_tokens, self.multi_column_max_output_tokens]
+        return [self.COLUMN_PROMPT_TEMPLATE, self.prompt_return_length, self.prompt_token_budget]
+    
+    def get_cache_endpoint(self, col_info: Dict) -> str:
+        """Endpoint the column is routed to (the notebook endpoint without a model router)."""
+        if self.model_router is None:
+            return self.endpoint_name
+        if self.prompt_mode == "multi_column":
+            prompt = self.build_multi_column_line(col_info)
+        else:
+            prompt = self.build_column_prompt(col_info, record_metrics=False)
+        sample_text = " ".join(str(v) for v in dedupe_values(self.get_sample_values(col_info)))
+        return self.model_router.endpoint_for(prompt, [col_info["data_type"]], sample_text)
+    
+    def get_cache_key(self, col_info: Dict, endpoint_name: Optional[str] = None) -> str:
+        """Description cache key: routed endpoint, prompt settings, column name/type and the table's column names/types."""
+        return self.description_cache.make_key(
+            endpoint_name or self.get_cache_endpoint(col_info), self.get_prompt_settings(),
+            f"{self.catalog}.{self.schema}.{self.table}",
+            col_info["column_name"], col_info["data_type"],
+            self.description_cache.fingerprint(self.table_columns)
+        )
+    
+    def get_column_descriptions_ai_single(self, col_infos: List[Dict]) -> Dict[str, str]:
+        """
+        One prompt per column (one batch query, or one query per column).
+        Columns the batch query returned no description for are retried one query per column.
+        """
+        if self.batch_ai_query:
+            descriptions = self.get_column_descriptions_ai_batch(col_infos)
+            retry = [c for c in col_infos if c["column_name"] not in descriptions]
+            self.batch_retries += len(retry)
+            descriptions.update({c["column_name"]: self.get_column_description_ai(c) for c in retry})
+            return descriptions
+        return {c["column_name"]: self.get_column_description_ai(c) for c in col_infos}
+    
+    def build_multi_column_line(self, col_info: Dict) -> str:
+        """One column line of the multi-column prompt: name, type and distinct sample values."""
+        values = dedupe_values(row.get(col_info["column_name"]) for row in col_info["sample_rows"])
+        sample_text, _ = fit_values_to_tokens(values, self.multi_column_sample_tokens)
+        return f'- "{col_info["column_name"]}" ({col_info["data_type"]}): {sample_text}'
+    
+    def build_multi_column_prompts(self, col_infos: List[Dict]) -> List[tuple]:
+        """
+        Chunk the columns so every multi-column prompt stays within multi_column_token_budget and
+        its expected JSON response (about prompt_return_length words per column) within multi_column_max_output_tokens.
+        Returns: [(chunk col_infos, prompt)]
+        """
+        def format_prompt(lines):
+            return self.MULTI_COLUMN_PROMPT_TEMPLATE.format(
+                table=self.table,
+                schema=self.schema,
+                catalog=self.catalog,
+                prompt_return_length=self.prompt_return_length,
+                column_lines="\n".join(lines)
+            )
+        
+        base_tokens = estimate_tokens(format_prompt([]))
+        chunks, chunk, lines, chunk_tokens, output_tokens = [], [], [], base_tokens, 0
+        for col_info in col_infos:
+            line = self.build_multi_column_line(col_info)
+            line_tokens = estimate_tokens(line) + 1
+            # "name": "description", with about 1.5 tokens per word of description
+            answer_tokens = estimate_tokens(col_info["column_name"]) + int(self.prompt_return_length * 1.5) + 8
+            if chunk and (chunk_tokens + line_tokens > self.multi_column_token_budget
+                          or output_tokens + answer_tokens > self.multi_column_max_output_tokens):
+                chunks.append((chunk, format_prompt(lines)))
+                chunk, lines, chunk_tokens, output_tokens = [], [], base_tokens, 0
+            chunk.append(col_info)
+            lines.append(line)
+            chunk_tokens += line_tokens
+            output_tokens += answer_tokens
+        if chunk:
+            chunks.append((chunk, format_prompt(lines)))
+        
+        if self.prompt_metrics is not None:
+            for _, prompt in chunks:
+                self.prompt_metrics.record(prompt)
+        return chunks
+    
+    @staticmethod
+    def parse_multi_column_response(response: Optional[str], column_names: List[str]) -> Dict[str, str]:
+        """
+        Validate a multi-column JSON response and map it back to the requested columns.
+        Keys match exactly, then case-insensitively; a response with keys that are not requested columns
+        (renamed or invented columns) is rejected as a whole.
+        Returns only columns with a non-empty string description (missing columns are retried by the caller).
+        """
+        if not response:
+            return {}
+        
+        # Models sometimes wrap the JSON in a markdown code fence or add text around it
+        text = re.sub(r"^```(?:json)?|```$", "", response.strip(), flags=re.IGNORECASE).strip()
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            parsed = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        
+        by_lower_name = {str(k).strip().lower(): v for k, v in parsed.items()}
+        if not set(by_lower_name) <= {name.lower() for name in column_names}:
+            return {}
+        
+        descriptions = {}
+        for name in column_names:
+            value = parsed.get(name, by_lower_name.get(name.lower()))
+            if isinstance(value, str) and value.strip():
+                descriptions[name] = value.strip()
+        return descriptions
+    
+    def get_column_descriptions_ai_multi(self, col_infos: List[Dict]) -> Dict[str, str]:
+        """
+        Describe many columns per model call with structured JSON prompts (chunked by token budget).
+        All chunk prompts run as one set-based ai_query; columns missing from a chunk's JSON
+        (parse failure, invalid or absent entries, unexpected keys) are retried with the single-column prompt.
+        Each call passes max_tokens = multi_column_max_output_tokens so chunks are sized to what the endpoint returns.
+        Returns: {column_name: description}
+        """
+        if not col_infos:
+            return {}
+        
+        chunks = self.build_multi_column_prompts(col_infos)
+        # A chunk goes to the large tier when any of its columns would (column line as the prompt size)
+        tiers = [
+            None if self.model_router is None else
+            "large" if "large" in [self.classify_column(c, self.build_multi_column_line(c)) for c in chunk] else "fast"
+            for chunk, _ in chunks
+        ]
+        
+        responses = {}
+        for tier in dict.fromkeys(tiers):
+            group = [(i, prompt) for i, ((_, prompt), t) in enumerate(zip(chunks, tiers)) if t == tier]
+            prompts_df = self.spark.createDataFrame(group, schema="chunk_id int, prompt string")
+            
+            def query_model(endpoint_name, prompts_df=prompts_df):
+                results = (prompts_df
+                    .selectExpr("chunk_id", f"""ai_query('{endpoint_name}', prompt,
+                        modelParameters => named_struct('max_tokens', {int(self.multi_column_max_output_tokens)})) AS response""")
+                    .collect())
+                return {r["chunk_id"]: r["response"] for r in results}
+            
+            responses.update(self.run_model_call(query_model, [prompt for _, prompt in group], tier))
+        self.multi_column_calls += len(chunks)
+        
+        descriptions = {}
+        for i, (chunk, _) in enumerate(chunks):
+            parsed = self.parse_multi_column_response(responses.get(i), [c["column_name"] for c in chunk])
+            if len(parsed) != len(chunk):
+                self.multi_column_mismatches += 1
+            descriptions.update(parsed)
+        
+        retry = [c for c in col_infos if c["column_name"] not in descriptions]
+        if retry:
+            self.multi_column_retries += len(retry)
+            descriptions.update(self.get_column_descriptions_ai_single(retry))
+        return descriptions
+    
+    def get_sample_values(self, col_info: Dict) -> List:
+        return [row.get(col_info["column_name"]) for row in col_info["sample_rows"]]
+    
+    def generate_ai_descriptions(self, col_infos: List[Dict]) -> Dict[str, str]:
+        """
+        Generate AI descriptions for columns, consulting the description cache and then the
+        similarity cache (near-duplicate columns of other tables) first.
+        Only new or changed columns are sent to the model (one query per column, or one batch query).
+        Returns: {column_name: description}
+        """
+        descriptions = {}
+        pending = col_infos
+        
+        if self.description_cache is not None and col_infos:
+            endpoints = {c["column_name"]: self.get_cache_endpoint(c) for c in col_infos}
+            keys = {c["column_name"]: self.get_cache_key(c, endpoints[c["column_name"]]) for c in col_infos}
+            cached = self.description_cache.get_many(list(keys.values()))
+            descriptions = {name: cached[key] for name, key in keys.items() if key in cached}
+            pending = [c for c in col_infos if c["column_name"] not in descriptions]
+            self.cache_hits = len(descriptions)
+        
+        if self.similarity_cache is not None and pending:
+            for c in pending:
+                similar = self.similarity_cache.lookup(c["column_name"], c["data_type"], self.get_sample_values(c), self.table)
+                if similar is not None:
+                    descriptions[c["column_name"]] = similar
+            pending = [c for c in pending if c["column_name"] not in descriptions]
+            self.similarity_hits = len(descriptions) - self.cache_hits
+        
+        if self.prompt_mode == "multi_column":
+            generated = self.get_column_descriptions_ai_multi(pending)
+        else:
+            generated = self.get_column_descriptions_ai_single(pending)
+        
+        if self.description_cache is not None and generated:
+            self.description_cache.put_many([
+                {
+                    "cache_key": keys[name],
+                    "description": description,
+                    "endpoint_name": endpoints[name],
+                    "full_table_name": f"{self.catalog}.{self.schema}.{self.table}",
+                    "column_name": name
+                }
+                for name, description in generated.items()
+            ])
+        
+        if self.similarity_cache is not None:
+            for c in pending:
+                self.similarity_cache.add(c["column_name"], c["data_type"], self.get_sample_values(c),
+                                          generated.get(c["column_name"]), self.table)
+        
+        descriptions.update(generated)
+        return descriptions
+    
+    def build_column_override_index(self) -> Dict[str, tuple]:
+        """
+        Normalize the override JSON once into {column_name: (description, source)}.
+        Priority: audit_columns > specific columns > "ALL" > AI (columns not in the index use AI)
+        """
         # Safety check: Ensure audit_columns is a dict
         # Support both old ("audit_columns") and new ("audit_columns_desc") schema
         audit_columns = self.override_json.get("audit_columns_desc") or self.override_json.get("audit_columns", {})
@@ -126,52 +497,63 @@ class ColumnDescriptionGenerator:
         # Support both old ("columns") and new ("columns_desc") schema
         columns_value = self.override_json.get("columns_desc") or self.override_json.get("columns")
         
-        # Check if "columns" is set to "ALL" - force AI for all (unless audit)
-        if columns_value == "ALL":
-            # Check audit columns first
-            if col_name in audit_columns:
-                return (audit_columns[col_name], "audit")
-            else:
-                # Generate with AI
-                return (self.get_column_description_ai(col_info), "ai")
-        
-        # Check audit columns (highest priority)
-        if col_name in audit_columns:
-            return (audit_columns[col_name], "audit")
-        
-        # Check specific column overrides
-        # Safety check: Ensure columns is a dict
-        if not isinstance(columns_value, dict):
-            columns_value = {}
-        
-        if col_name in columns_value:
-            manual_desc = columns_value[col_name]
-            if manual_desc is not None and str(manual_desc).strip() != '':
-                # Use manual description
-                return (manual_desc, "manual")
-            else:
-                # null or empty means use AI
-                return (self.get_column_description_ai(col_info), "ai")
+        index = {}
+        # "columns" set to "ALL" forces AI for all columns (unless audit)
+        if columns_value != "ALL" and isinstance(columns_value, dict):
+            for col_name, manual_desc in columns_value.items():
+                if manual_desc is not None and str(manual_desc).strip() != '':
+                    # Use manual description
+                    index[col_name] = (manual_desc, "manual")
+                else:
+                    # null or empty means use AI
+                    index[col_name] = (None, "ai")
         
-        # Default: not specified, generate with AI
-        return (self.get_column_description_ai(col_info), "ai")
+        # Audit columns (highest priority)
+        for col_name, audit_desc in audit_columns.items():
+            index[col_name] = (audit_desc, "audit")
+        
+        return index
+    
+    def resolve_column_override(self, col_info: Dict) -> tuple:
+        """
+        Resolve the manual/audit override for a column without calling the model.
+        Priority: audit_columns > specific columns > "ALL" > AI
+        Returns: (description, source) where description is None when source is 'ai'
+        """
+        return self.column_override_index.get(col_info["column_name"], (None, "ai"))
+    
+    def get_column_description_with_override(self, col_info: Dict) -> tuple:
+        """
+        Determine column description based on override logic.
+        Priority: audit_columns > specific columns > "ALL" > AI
+        Returns: (description, source) where source is 'ai'|'manual'|'audit'
+        """
+        description, source = self.resolve_column_override(col_info)
+        if source == "ai":
+            return (self.get_column_description_ai(col_info), "ai")
+        return (description, source)
     
     def execute(self) -> DataFrame:
         """Generate descriptions for all columns in the table."""
         columns = self.get_column_info()
         
+        # Resolve overrides first, then describe all remaining columns (cache, then model)
+        ai_columns = [
+            c for c in columns
+            if (self.always_update or not c["existing_comment"]) and self.resolve_column_override(c)[1] == "ai"
+        ]
+        ai_descriptions = self.generate_ai_descriptions(ai_columns)
+        
         rows = []
         for col_info in columns:
             # Check if we need to generate description
             should_generate = self.always_update or not col_info["existing_comment"]
             
             if should_generate:
-                # Use override logic if override_json is provided
-                if self.override_json:
-                    new_comment, source = self.get_column_description_with_override(col_info)
-                else:
-                    new_comment = self.get_column_description_ai(col_info)
-                    source = "ai"
+                # Use override logic (manual/audit) or the generated AI description
+                new_comment, source = self.resolve_column_override(col_info)
+                if source == "ai":
+                    new_comment = ai_descriptions.get(col_info["column_name"])
             else:
                 new_comment = None
                 source = "existing"
@@ -203,7 +585,11 @@ class ColumnDescriptionGenerator:
         return self.spark.createDataFrame(rows, schema=schema)
     
     def save_comments(self, commented_columns: DataFrame) -> None:
-        """Save column comments to storage."""
+        """Save column comments to storage (MERGE into the results store when one is configured)."""
+        if self.results_store is not None:
+            self.results_store.write_results("column", commented_columns)
+            return
+        
         output_location = f"{self.output_path}/{self.output_file_format}/{self.table}"
         
         (
@@ -220,27 +606,52 @@ class ColumnDescriptionGenerator:
 class ColumnDescriptionImporter:
     """Import and apply column descriptions to Unity Catalog."""
     
-    def __init__(self, spark, input_path, output_file_format="json"):
+    def __init__(self, spark, input_path=None, output_file_format="json", table_list=None, max_workers=8,
+                 results_store=None):
         self.spark = spark
         self.input_path = input_path
         self.output_file_format = output_file_format
+        self.table_list = table_list  # Optional: list of specific tables (catalog.schema.table) to import
+        self.max_workers = max_workers  # Tables altered in parallel
+        self.table_results = []  # Per-table outcome and timing from the last apply_comments
+        self.results_store = results_store  # Optional DescriptionResultsStore read instead of input_path
     
     def read_comments(self) -> DataFrame:
-        """Read comments from storage."""
-        try:
-            # Read from all table subfolders
-            df = (self.spark.read
-                .format(self.output_file_format)
-                .option("header", "true")
-                .option("inferSchema", "true")
-                .load(self.input_path + "/*"))
-        except:
-            # Fallback to direct path
-            df = (self.spark.read
-                .format(self.output_file_format)
-                .option("header", "true")
-                .option("inferSchema", "true")
-                .load(self.input_path))
+        """Read comments from storage (only rows not applied yet when reading the results store)."""
+        if self.results_store is not None:
+            return self.results_store.read_pending("column", self.table_list)
+        
+        reader = (self.spark.read
+            .format(self.output_file_format)
+            .option("header", "true")
+            .option("inferSchema", "true"))
+        
+        if self.table_list:
+            # One read over the generated table folders instead of one read per table
+            paths = sorted(set(f"{self.input_path}/{name.split('.')[-1]}" for name in self.table_list))
+            try:
+                df = reader.load(paths)
+            except:
+                # Some folders are missing: read the ones that exist
+                dfs = []
+                for path in paths:
+                    try:
+                        dfs.append(reader.load(path))
+                    except:
+                        pass  # Skip tables that couldn't be read
+                if not dfs:
+                    raise
+                df = reduce(lambda df1, df2: df1.unionByName(df2, allowMissingColumns=True), dfs)
+            
+            # Folders are named by table only, so keep just the requested catalog.schema.table
+            df = df.filter(F.concat_ws('.', "table_catalog", "table_schema", "table_name").isin(list(self.table_list)))
+        else:
+            try:
+                # Read from all table subfolders
+                df = reader.load(self.input_path + "/*")
+            except:
+                # Fallback to direct path
+                df = reader.load(self.input_path)
         
         return df.filter(F.col("replace_comment") == True)
     
@@ -253,36 +664,68 @@ class ColumnDescriptionImporter:
                         F.col("table_name")))
             .withColumn("cleaned_comment", F.regexp_replace("new_comment", "'", "")))
     
+    def collect_comments_by_table(self, prepared_df: DataFrame) -> Dict[str, List[Dict]]:
+        """Collect all comments with one Spark job. Returns: {full_table_name: [row dict]}"""
+        comments_by_table = {}
+        for r in prepared_df.collect():
+            comments_by_table.setdefault(r["full_table_name"], []).append(r.asDict())
+        return comments_by_table
+    
+    def apply_table_comments(self, table_name: str, columns: List[Dict]) -> Dict:
+        """
+        Apply all column comments of one table with a single ALTER TABLE ... ALTER COLUMN statement.
+        Falls back to one statement per column when the combined statement fails,
+        so only the offending columns are reported as failed.
+        """
+        start_time = time.time()
+        result = {"table": table_name, "successful_columns": 0, "failed_columns": 0, "statements": 1, "errors": [], "applied": []}
+        
+        column_clauses = [f"`{col['column_name']}` COMMENT '{col['cleaned_comment']}'" for col in columns]
+        try:
+            self.spark.sql(f"ALTER TABLE {table_name} ALTER COLUMN {', '.join(column_clauses)}")
+            result["successful_columns"] = len(columns)
+            result["applied"] = columns
+        except Exception as batch_error:
+            if len(columns) == 1:
+                result["failed_columns"] = 1
+                result["errors"].append(f"{columns[0]['column_name']}: {str(batch_error)[:100]}")
+                print(f"  ✗ Failed: {table_name}.{columns[0]['column_name']} - {str(batch_error)[:100]}")
+            else:
+                for col, clause in zip(columns, column_clauses):
+                    result["statements"] += 1
+                    try:
+                        self.spark.sql(f"ALTER TABLE {table_name} ALTER COLUMN {clause}")
+                        result["successful_columns"] += 1
+                        result["applied"].append(col)
+                    except Exception as e:
+                        result["failed_columns"] += 1
+                        result["errors"].append(f"{col['column_name']}: {str(e)[:100]}")
+                        print(f"  ✗ Failed: {table_name}.{col['column_name']} - {str(e)[:100]}")
+        
+        result["seconds"] = round(time.time() - start_time, 2)
+        return result
+    
     def apply_comments(self, prepared_df: DataFrame) -> int:
-        """Apply comments to Unity Catalog columns. Returns count of successful updates."""
-        # Group by table
-        tables = prepared_df.select("full_table_name").distinct().collect()
-        successful_count = 0
-        
-        for table_row in tables:
-            table_name = table_row["full_table_name"]
-            table_columns = prepared_df.filter(F.col("full_table_name") == table_name).collect()
-            
-            for col in table_columns:
-                col_name = col["column_name"]
-                comment = col["cleaned_comment"]
-                
-                try:
-                    self.spark.sql(f"ALTER TABLE {table_name} ALTER COLUMN `{col_name}` COMMENT '{comment}'")
-                    successful_count += 1
-                except Exception as e:
-                    print(f"  ✗ Failed: {table_name}.{col_name} - {str(e)[:100]}")
-        
-        return successful_count
+        """Apply comments to Unity Catalog columns, tables in parallel. Returns count of successful updates."""
+        comments_by_table = self.collect_comments_by_table(prepared_df)
+        
+        self.table_results = []
+        if comments_by_table:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(comments_by_table))) as executor:
+                futures = [executor.submit(self.apply_table_comments, table_name, columns)
+                           for table_name, columns in comments_by_table.items()]
+                for future in as_completed(futures):
+                    self.table_results.append(future.result())
+        
+        if self.results_store is not None:
+            self.results_store.mark_applied("column", [col for r in self.table_results for col in r["applied"]])
+        
+        return sum(r["successful_columns"] for r in self.table_results)
     
     def execute(self) -> Dict:
-        """Execute the import workflow. Returns dictionary with successful_columns count."""
+        """Execute the import workflow. Returns dictionary with successful_columns count and per-table results."""
         comments = self.read_comments()
-        
-        if comments.count() == 0:
-            return {'successful_columns': 0}
-        
         prepared = self.prepare_comments(comments)
         successful_count = self.apply_comments(prepared)
         
-        return {'successful_columns': successful_count}
+        return {'successful_columns': successful_count, 'table_results': self.table_results}
@@ -0,0 +1,164 @@
+"""
+Adaptive Concurrency Controller
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from .prompt_budget import estimate_tokens
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a model call would exceed the run's token budget."""
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD concurrency limit for model serving calls shared by the description generators.
+    The limit grows by increase_step after a full window of calls with flat latency, and is
+    multiplied by decrease_factor on throttling (429 / RESOURCE_EXHAUSTED) or a latency spike.
+    Latency baselines are kept per call size (see size_bucket) and keep tracking slow calls,
+    so a lasting latency shift (larger model, larger prompts) stops counting as a spike.
+    """
+
+    THROTTLE_MARKERS = ["429", "RESOURCE_EXHAUSTED", "REQUEST_LIMIT_EXCEEDED", "TOO_MANY_REQUESTS", "rate limit"]
+
+    def __init__(self, initial_concurrency=4, min_concurrency=1, max_concurrency=64,
+                 increase_step=1, decrease_factor=0.5, latency_spike_ratio=2.0,
+                 token_budget=None, max_retries=5, verbose=False):
+        self.limit = max(min_concurrency, min(initial_concurrency, max_concurrency))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_ratio = latency_spike_ratio  # Latency above baseline * ratio counts as a spike
+        self.token_budget = token_budget  # Approximate prompt + response tokens allowed for the run (None = unlimited)
+        self.max_retries = max_retries  # Retries of a throttled call
+        self.verbose = verbose
+        self.in_flight = 0
+        self.tokens_used = 0
+        self.calls = 0
+        self.throttled_calls = 0
+        self.baseline_latency = {}  # {size bucket: moving average of call latency}
+        self.successes_since_change = 0
+        self.last_decrease = 0.0
+        self.history = [{"time": time.time(), "concurrency": self.limit, "reason": "initial"}]
+        self.condition = threading.Condition()
+
+    @classmethod
+    def is_throttle_error(cls, error: Exception) -> bool:
+        message = str(error)
+        return any(marker.lower() in message.lower() for marker in cls.THROTTLE_MARKERS)
+
+    @staticmethod
+    def size_bucket(prompt_count: int) -> int:
+        """Set-based calls are slower than single prompts: 1, 2-9, 10-99, ... prompts are tracked separately."""
+        return len(str(max(int(prompt_count), 1)))
+    
+    @staticmethod
+    def estimate_response_tokens(result) -> int:
+        """Rough token count of a model response (one description or {name: description} for batch calls)."""
+        if isinstance(result, dict):
+            return sum(estimate_tokens(v) for v in result.values())
+        return estimate_tokens(result) if isinstance(result, str) else 0
+
+    def set_limit(self, limit: int, reason: str) -> None:
+        """Change the limit (caller holds the condition) and log it."""
+        limit = max(self.min_concurrency, min(limit, self.max_concurrency))
+        if limit != self.limit:
+            self.limit = limit
+            self.history.append({"time": time.time(), "concurrency": limit, "reason": reason})
+            if self.verbose:
+                print(f"  ⚙ Model concurrency -> {limit} ({reason})")
+            self.condition.notify_all()
+        self.successes_since_change = 0
+
+    def reserve_tokens(self, tokens: int) -> None:
+        with self.condition:
+            if self.token_budget is not None and self.tokens_used + tokens > self.token_budget:
+                raise TokenBudgetExceeded(
+                    f"Token budget exceeded: {self.tokens_used} used + {tokens} requested > {self.token_budget}")
+            self.tokens_used += tokens
+
+    @contextmanager
+    def slot(self):
+        """Wait for a free concurrency slot."""
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def record(self, latency: float, throttled: bool = False, tokens: int = 0, prompt_count: int = 1) -> None:
+        """Feed one call's outcome back into the limit (additive increase, multiplicative decrease)."""
+        with self.condition:
+            self.calls += 1
+            self.tokens_used += tokens
+            now = time.time()
+            bucket = self.size_bucket(prompt_count)
+            baseline = self.baseline_latency.get(bucket)
+            spike = not throttled and baseline is not None and latency > baseline * self.latency_spike_ratio
+
+            # The baseline follows every completed call (spikes included), so a lasting shift is absorbed
+            if not throttled:
+                self.baseline_latency[bucket] = latency if baseline is None else 0.8 * baseline + 0.2 * latency
+
+            if throttled or spike:
+                self.throttled_calls += 1 if throttled else 0
+                # Back off at most once per baseline latency so one burst does not collapse the limit
+                if now - self.last_decrease > (baseline or 1.0):
+                    self.last_decrease = now
+                    self.set_limit(int(self.limit * self.decrease_factor), "throttled" if throttled else "latency spike")
+                return
+
+            self.successes_since_change += 1
+            if self.successes_since_change >= self.limit and self.limit < self.max_concurrency:
+                self.set_limit(self.limit + self.increase_step, "latency flat")
+
+    def run(self, call: Callable, prompt_tokens: int = 0, prompt_count: int = 1):
+        """
+        Run one model call under the controller: waits for a slot, checks the token budget,
+        records latency, and retries throttled calls with backoff.
+        prompt_count selects the latency baseline of set-based calls that send many prompts at once.
+        """
+        self.reserve_tokens(prompt_tokens)
+        for attempt in range(1, self.max_retries + 1):
+            with self.slot():
+                start_time = time.time()
+                try:
+                    result = call()
+                except Exception as e:
+                    if not self.is_throttle_error(e) or attempt == self.max_retries:
+                        raise
+                    self.record(time.time() - start_time, throttled=True, prompt_count=prompt_count)
+                else:
+                    self.record(time.time() - start_time, tokens=self.estimate_response_tokens(result), prompt_count=prompt_count)
+                    return result
+            time.sleep(min(2 ** attempt, 30))
+
+    def get_summary(self) -> Dict:
+        return {
+            "concurrency": self.limit,
+            "max_concurrency_reached": max(h["concurrency"] for h in self.history),
+            "calls": self.calls,
+            "throttled_calls": self.throttled_calls,
+            "tokens_used": self.tokens_used,
+            "token_budget": self.token_budget,
+            "baseline_latency_seconds": {f"{10 ** (bucket - 1)}+ prompts": round(latency, 2)
+                                         for bucket, latency in sorted(self.baseline_latency.items())}
+        }
+
+    def get_history(self) -> List[Dict]:
+        """Concurrency chosen over time for this run."""
+        start_time = self.history[0]["time"]
+        return [
+            {"elapsed_seconds": round(h["time"] - start_time, 1), "concurrency": h["concurrency"], "reason": h["reason"]}
+            for h in self.history
+        ]
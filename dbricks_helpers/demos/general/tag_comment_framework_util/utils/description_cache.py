@@ -0,0 +1,97 @@
+"""
+Description Cache
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, List
+
+
+def run_with_conflict_retry(action, max_retries: int = 5):
+    """Run a Delta write, retrying on concurrent modification conflicts from parallel writers."""
+    for attempt in range(1, max_retries + 1):
+        try:
+            return action()
+        except Exception as e:
+            if "Concurrent" not in str(e) or attempt == max_retries:
+                raise
+            time.sleep(attempt)
+
+
+class DescriptionCache:
+    """Content-addressed Delta cache of generated descriptions."""
+
+    def __init__(self, spark, table_name):
+        self.spark = spark
+        self.table_name = table_name
+
+    @staticmethod
+    def fingerprint(value) -> str:
+        """Stable hash of any JSON-serializable value (prompt templates, sample values, ...)."""
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+    @classmethod
+    def make_key(cls, endpoint_name: str, prompt_settings, full_table_name: str,
+                 column_name: str, data_type: str, metadata_fingerprint: str) -> str:
+        """
+        Cache key for one description.
+        Any change to the endpoint, prompt settings (template, budgets), column name/type or table schema is a cache miss.
+        Sample rows are not part of the key: LIMIT/TABLESAMPLE samples differ between runs of an unchanged table.
+        """
+        return cls.fingerprint([
+            endpoint_name, cls.fingerprint(prompt_settings), full_table_name,
+            column_name, data_type, metadata_fingerprint
+        ])
+
+    def ensure_table(self) -> None:
+        """Create the cache table if it does not exist."""
+        self.spark.sql(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                cache_key STRING,
+                description STRING,
+                endpoint_name STRING,
+                full_table_name STRING,
+                column_name STRING,
+                created_at TIMESTAMP
+            ) USING DELTA
+        """)
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Look up many cache keys with one query. Returns {cache_key: description} for hits."""
+        if not keys:
+            return {}
+
+        keys_df = self.spark.createDataFrame([(k,) for k in set(keys)], schema="cache_key string")
+        rows = (self.spark.table(self.table_name)
+            .join(keys_df.hint("broadcast"), "cache_key")
+            .select("cache_key", "description")
+            .collect())
+
+        return {r["cache_key"]: r["description"] for r in rows if r["description"]}
+
+    def put_many(self, entries: List[Dict]) -> None:
+        """
+        Insert or refresh cache entries with one MERGE.
+        Each entry needs cache_key, description, endpoint_name, full_table_name and column_name.
+        """
+        entries = [e for e in entries if e.get("description")]
+        if not entries:
+            return
+
+        source_df = self.spark.createDataFrame(
+            [(e["cache_key"], e["description"], e["endpoint_name"], e["full_table_name"], e.get("column_name")) for e in entries],
+            schema="cache_key string, description string, endpoint_name string, full_table_name string, column_name string"
+        ).dropDuplicates(["cache_key"])
+
+        run_with_conflict_retry(lambda: self.spark.sql(f"""
+            MERGE INTO {self.table_name} AS t
+            USING {{source}} AS s
+            ON t.cache_key = s.cache_key
+            WHEN MATCHED THEN UPDATE SET
+                t.description = s.description,
+                t.created_at = current_timestamp()
+            WHEN NOT MATCHED THEN INSERT
+                (cache_key, description, endpoint_name, full_table_name, column_name, created_at)
+                VALUES (s.cache_key, s.description, s.endpoint_name, s.full_table_name, s.column_name, current_timestamp())
+        """, source=source_df))
@@ -0,0 +1,161 @@
+"""
+Description Similarity Cache
+"""
+
+import math
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .prompt_budget import dedupe_values
+
+
+class DescriptionSimilarityCache:
+    """
+    In-run cache that reuses generated column descriptions for near-duplicate columns across tables
+    (created_at, customer_id, load_ts, ...). Columns match on a key of normalized name, type family
+    and value-profile signature; with an embed_fn, names that do not match exactly are compared by
+    cosine similarity among columns with the same type family and value profile.
+    Confident matches reuse the description, ambiguous ones go to the model.
+    """
+
+    # Names whose meaning depends on the table (customers.id vs orders.id): always sent to the model
+    GENERIC_NAMES = {"id", "key", "name", "type", "code", "value", "status", "description", "desc",
+                     "date", "amount", "flag", "category", "label", "text", "data"}
+
+    TYPE_FAMILIES = [
+        ("array", "array"), ("map", "map"), ("struct", "struct"),
+        ("timestamp", "datetime"), ("date", "datetime"), ("interval", "interval"),
+        ("boolean", "boolean"), ("binary", "binary"),
+        ("tinyint", "integer"), ("smallint", "integer"), ("bigint", "integer"), ("int", "integer"), ("long", "integer"),
+        ("decimal", "numeric"), ("double", "numeric"), ("float", "numeric"),
+        ("string", "string"), ("varchar", "string"), ("char", "string")
+    ]
+
+    def __init__(self, embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 confident_threshold=0.92, ambiguous_threshold=0.80, max_profile_patterns=3):
+        self.embed_fn = embed_fn  # Optional local embedding model: list of texts -> list of vectors
+        self.confident_threshold = confident_threshold  # Similarity at or above this reuses the description
+        self.ambiguous_threshold = ambiguous_threshold  # Similarity between the thresholds is ambiguous (model)
+        self.max_profile_patterns = max_profile_patterns  # Value shapes kept in the profile signature
+        self.entries = {}  # {(name, type family, profile): (description, source table)}
+        self.names_by_profile = {}  # {(type family, profile): [names]} embedding candidates
+        self.embeddings = {}  # {normalized name: vector}
+        self.lock = threading.Lock()
+        self.exact_hits = 0
+        self.embedding_hits = 0
+        self.ambiguous = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_column_name(column_name: str) -> str:
+        """customerId, Customer-ID and CUSTOMER_ID all become customer_id."""
+        name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", str(column_name))
+        return "_".join(t for t in re.split(r"[^a-z0-9]+", name.lower()) if t)
+
+    @classmethod
+    def type_family(cls, data_type: str) -> str:
+        """Coarse type family (bigint and int both map to integer, varchar(10) to string, ...)."""
+        data_type = str(data_type or "").lower()
+        for prefix, family in cls.TYPE_FAMILIES:
+            if data_type.startswith(prefix):
+                return family
+        return data_type
+
+    def value_profile(self, values: List) -> str:
+        """
+        Signature of the sample values' shape: the most common value patterns (digits -> 9, letters -> a,
+        runs collapsed, so 2024-01-05 10:00:00 becomes 9-9-9 9:9:9) plus a cardinality bucket.
+        """
+        distinct = dedupe_values(values)
+        if not distinct:
+            return "empty"
+
+        counts = {}
+        for value in distinct:
+            shape = re.sub(r"[A-Za-z]+", "a", re.sub(r"[0-9]+", "9", str(value)))[:30]
+            counts[shape] = counts.get(shape, 0) + 1
+        patterns = sorted(counts, key=lambda p: (-counts[p], p))[:self.max_profile_patterns]
+        non_null = [v for v in values if v is not None and str(v).strip() != ""]
+        cardinality = "single" if len(distinct) == 1 else "repeated" if len(distinct) < len(non_null) else "distinct"
+        return f"{'|'.join(sorted(patterns))}#{cardinality}"
+
+    def make_key(self, column_name: str, data_type: str, values: List) -> Tuple[str, str, str]:
+        return (self.normalize_column_name(column_name), self.type_family(data_type), self.value_profile(values))
+
+    @staticmethod
+    def cosine_similarity(a: List[float], b: List[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def embed(self, names: List[str]) -> Dict[str, List[float]]:
+        """Embeddings for normalized names, computed once per name."""
+        with self.lock:
+            missing = [n for n in dict.fromkeys(names) if n not in self.embeddings]
+        if missing:
+            vectors = self.embed_fn([n.replace("_", " ") for n in missing])
+            with self.lock:
+                self.embeddings.update(zip(missing, vectors))
+        with self.lock:
+            return {n: self.embeddings[n] for n in names}
+
+    def is_reusable(self, key: Tuple[str, str, str], description: str, source_table: str, table: str) -> bool:
+        """A description naming its source table would be wrong on another table."""
+        return (key[0] not in self.GENERIC_NAMES
+                and (source_table == table
+                     or not re.search(rf"\b{re.escape(source_table)}\b", description, flags=re.IGNORECASE)))
+
+    def lookup(self, column_name: str, data_type: str, values: List, table: str) -> Optional[str]:
+        """Reusable description for a column, or None when the column should go to the model."""
+        key = self.make_key(column_name, data_type, values)
+        with self.lock:
+            entry = self.entries.get(key)
+            candidates = [((name,) + key[1:], self.entries[(name,) + key[1:]])
+                          for name in self.names_by_profile.get(key[1:], []) if name != key[0]]
+
+        if entry is not None and self.is_reusable(key, entry[0], entry[1], table):
+            with self.lock:
+                self.exact_hits += 1
+            return entry[0]
+
+        if self.embed_fn is not None and candidates and key[0] not in self.GENERIC_NAMES:
+            vectors = self.embed([key[0]] + [k[0] for k, _ in candidates])
+            score, best_key, best_entry = max(
+                ((self.cosine_similarity(vectors[key[0]], vectors[k[0]]), k, e) for k, e in candidates),
+                key=lambda c: c[0])
+            if score >= self.confident_threshold and self.is_reusable(best_key, best_entry[0], best_entry[1], table):
+                with self.lock:
+                    self.embedding_hits += 1
+                return best_entry[0]
+            if score >= self.ambiguous_threshold:
+                with self.lock:
+                    self.ambiguous += 1
+                return None
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def add(self, column_name: str, data_type: str, values: List, description: str, table: str) -> None:
+        """Remember a generated description (the first description for a key is kept)."""
+        if not description:
+            return
+        key = self.make_key(column_name, data_type, values)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (description, table)
+                self.names_by_profile.setdefault(key[1:], []).append(key[0])
+
+    def get_summary(self) -> Dict:
+        with self.lock:
+            lookups = self.exact_hits + self.embedding_hits + self.ambiguous + self.misses
+            return {
+                "lookups": lookups,
+                "exact_hits": self.exact_hits,
+                "embedding_hits": self.embedding_hits,
+                "ambiguous": self.ambiguous,
+                "misses": self.misses,
+                "reuse_rate": round((self.exact_hits + self.embedding_hits) / lookups, 3) if lookups else 0,
+                "entries": len(self.entries)
+            }
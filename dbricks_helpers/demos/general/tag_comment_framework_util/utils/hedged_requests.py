@@ -0,0 +1,176 @@
+"""
+Hedged Requests
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Optional
+
+
+class HedgeCancelled(Exception):
+    """Raised in place of a hedge that had not reached the endpoint when the primary call finished."""
+
+
+class HedgedRequestExecutor:
+    """
+    Cut model call tail latency with hedged requests: when a call runs longer than the hedge_percentile
+    latency of earlier calls of the same size, a duplicate is sent to the same (or a secondary) endpoint
+    and the first response wins. Hedges are capped at max_hedge_ratio of all calls.
+    With a concurrency controller, the primary and the hedge each take their own slot and token reservation,
+    and a losing call keeps its slot until it finishes (a running ai_query cannot be cancelled).
+    Hedges are skipped while the controller or the executor has no free capacity, so losing calls never queue primaries.
+    """
+
+    def __init__(self, hedge_percentile=0.95, min_samples=20, max_hedge_ratio=0.1,
+                 secondary_endpoint=None, window_size=500, max_workers=64):
+        self.hedge_percentile = hedge_percentile  # Latency percentile after which a call is hedged
+        self.min_samples = min_samples  # Calls of a size bucket observed before it is hedged
+        self.max_hedge_ratio = max_hedge_ratio  # Max hedges as a fraction of calls (hedging budget)
+        self.secondary_endpoint = secondary_endpoint  # Optional endpoint for hedges (default: same endpoint)
+        self.window_size = window_size  # Recent latencies kept per size bucket
+        self.max_workers = max_workers  # Primary and hedge calls running at once (losing calls included)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.latencies = {}  # {size bucket: deque of primary call latencies}
+        self.lock = threading.Lock()
+        self.running = 0  # Submitted calls that have not finished
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0  # Calls over the threshold that were not hedged (budget spent)
+        self.busy_skips = 0  # Calls over the threshold that were not hedged (no free slot or worker)
+        self.seconds_saved = 0.0  # Primary latency minus winning hedge latency, where the primary succeeded
+
+    @staticmethod
+    def size_bucket(prompt_count: int) -> int:
+        """Set-based calls are slower than single prompts: 1, 2-9, 10-99, ... prompts are tracked separately."""
+        return len(str(max(int(prompt_count), 1)))
+
+    def threshold(self, prompt_count: int = 1) -> Optional[float]:
+        """Hedge threshold in seconds for a call of this size (None until min_samples calls were observed)."""
+        with self.lock:
+            latencies = sorted(self.latencies.get(self.size_bucket(prompt_count), []))
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(int(self.hedge_percentile * len(latencies)), len(latencies) - 1)]
+
+    def record_latency(self, prompt_count: int, latency: float) -> None:
+        with self.lock:
+            self.latencies.setdefault(self.size_bucket(prompt_count), deque(maxlen=self.window_size)).append(latency)
+
+    def reserve_hedge(self, concurrency_controller=None) -> bool:
+        """Take one hedge from the budget (max_hedge_ratio of calls so far) when there is capacity for it."""
+        if concurrency_controller is not None and concurrency_controller.in_flight >= concurrency_controller.limit:
+            with self.lock:
+                self.busy_skips += 1
+            return False
+        with self.lock:
+            if self.running >= self.max_workers:
+                self.busy_skips += 1
+                return False
+            if self.hedges + 1 > self.max_hedge_ratio * self.calls:
+                self.budget_exhausted += 1
+                return False
+            self.hedges += 1
+            return True
+
+    def submit(self, attempt: Callable, *args) -> Future:
+        """Run an attempt on the executor, counting it as running until it finishes."""
+        with self.lock:
+            self.running += 1
+        future = self.executor.submit(attempt, *args)
+        future.add_done_callback(lambda f: self.finish())
+        return future
+
+    def finish(self) -> None:
+        with self.lock:
+            self.running -= 1
+
+    def run(self, query_model: Callable, endpoint_name: str, prompt_count: int = 1,
+            concurrency_controller=None, prompt_tokens: int = 0):
+        """
+        Run query_model(endpoint_name), hedging it once it exceeds the percentile threshold.
+        With a concurrency_controller every attempt runs through it (slot, token budget, throttling retries).
+        """
+        started = {}  # {"primary": start time of the model call itself (after any slot wait)}
+
+        def attempt(endpoint, name, cancelled=None):
+            def call():
+                if cancelled is not None and cancelled.is_set():
+                    raise HedgeCancelled("primary call finished first")
+                started[name] = time.time()
+                return query_model(endpoint)
+            if cancelled is not None and cancelled.is_set():
+                raise HedgeCancelled("primary call finished first")
+            if concurrency_controller is None:
+                return call()
+            return concurrency_controller.run(call, prompt_tokens, prompt_count)
+
+        with self.lock:
+            self.calls += 1
+            saturated = self.running >= self.max_workers
+        if saturated:
+            # Every worker is busy (losing calls included): run in the caller's thread without hedging
+            return attempt(endpoint_name, "primary")
+        threshold = self.threshold(prompt_count)
+
+        primary = self.submit(attempt, endpoint_name, "primary")
+        # The primary's own latency feeds the threshold even when a hedge wins
+        primary.add_done_callback(
+            lambda f: f.exception() is None and self.record_latency(prompt_count, time.time() - started["primary"]))
+
+        if (threshold is None or not wait([primary], timeout=threshold).not_done
+                or not self.reserve_hedge(concurrency_controller)):
+            return primary.result()
+
+        cancelled = threading.Event()
+        primary.add_done_callback(lambda f: f.exception() is None and cancelled.set())
+        hedge = self.submit(attempt, self.secondary_endpoint or endpoint_name, "hedge", cancelled)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self.lock:
+                            self.hedge_wins += 1
+                        hedge_latency = time.time() - started["hedge"]
+                        # Savings are only known (and only real) when the primary eventually succeeds
+                        primary.add_done_callback(lambda f: f.exception() is None and self.add_saved(
+                            time.time() - started["primary"] - threshold - hedge_latency))
+                    else:
+                        hedge.cancel()
+                    return future.result()
+        # Both failed: surface the primary's error
+        return primary.result()
+
+    def add_saved(self, seconds: float) -> None:
+        with self.lock:
+            self.seconds_saved += max(seconds, 0.0)
+
+    def wrap(self, query_model: Callable, prompt_count: int = 1, concurrency_controller=None,
+             prompt_tokens: int = 0) -> Callable:
+        """query_model(endpoint_name) with hedging (each attempt under concurrency_controller), for the generators' model calls."""
+        return lambda endpoint_name: self.run(query_model, endpoint_name, prompt_count, concurrency_controller, prompt_tokens)
+
+    def close(self) -> None:
+        """Stop the executor; queued hedges are cancelled and running calls finish in the background."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_summary(self) -> Dict:
+        with self.lock:
+            buckets = sorted(self.latencies)
+        thresholds = {f"{10 ** (bucket - 1)}+ prompts": self.threshold(10 ** (bucket - 1)) for bucket in buckets}
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_rate": round(self.hedges / self.calls, 3) if self.calls else 0,
+                "hedge_wins": self.hedge_wins,
+                "win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else 0,
+                "budget_exhausted": self.budget_exhausted,
+                "busy_skips": self.busy_skips,
+                "seconds_saved": round(self.seconds_saved, 1),
+                "thresholds_seconds": {k: round(v, 2) if v is not None else None for k, v in thresholds.items()}
+            }
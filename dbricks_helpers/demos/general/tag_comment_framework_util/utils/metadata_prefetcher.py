@@ -0,0 +1,70 @@
+"""
+Metadata Prefetcher
+"""
+
+from typing import Dict, List
+from pyspark.sql import DataFrame
+from pyspark.sql import functions as F
+
+
+class MetadataPrefetcher:
+    """Prefetch information_schema metadata for many tables with one set-based query each."""
+
+    def __init__(self, spark):
+        self.spark = spark
+
+    def get_targets_df(self, table_names: List[str]) -> DataFrame:
+        """DataFrame of (table_catalog, table_schema, table_name) for catalog.schema.table names."""
+        targets = [tuple(name.split('.')) for name in set(table_names) if len(name.split('.')) == 3]
+        return self.spark.createDataFrame(
+            targets,
+            schema="table_catalog string, table_schema string, table_name string"
+        )
+
+    def get_information_schema(self, view: str, table_names: List[str]) -> DataFrame:
+        """information_schema view rows for the target tables (catalog filter prunes the scan)."""
+        catalogs = sorted(set(name.split('.')[0] for name in table_names))
+        return (self.spark.table(f"system.information_schema.{view}")
+            .filter(F.col("table_catalog").isin(catalogs))
+            .join(F.broadcast(self.get_targets_df(table_names)), ["table_catalog", "table_schema", "table_name"]))
+
+    def prefetch_columns(self, table_names: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Get column metadata for every target table with one query.
+        Returns: {catalog.schema.table: [{column_name, data_type, comment}, ...]} in ordinal order
+        """
+        if not table_names:
+            return {}
+
+        rows = (self.get_information_schema("columns", table_names)
+            .select("table_catalog", "table_schema", "table_name", "column_name",
+                    "data_type", "comment", "ordinal_position")
+            .orderBy("table_catalog", "table_schema", "table_name", "ordinal_position")
+            .collect())
+
+        columns = {}
+        for r in rows:
+            full_table_name = f"{r['table_catalog']}.{r['table_schema']}.{r['table_name']}"
+            columns.setdefault(full_table_name, []).append({
+                "column_name": r["column_name"],
+                "data_type": r["data_type"],
+                "comment": r["comment"]
+            })
+        return columns
+
+    def prefetch_tables(self, table_names: List[str]) -> Dict[str, Dict]:
+        """
+        Get table metadata for every target table with one query.
+        Returns: {catalog.schema.table: {table_catalog, table_schema, table_name, comment}}
+        """
+        if not table_names:
+            return {}
+
+        rows = (self.get_information_schema("tables", table_names)
+            .select("table_catalog", "table_schema", "table_name", "comment")
+            .collect())
+
+        return {
+            f"{r['table_catalog']}.{r['table_schema']}.{r['table_name']}": r.asDict()
+            for r in rows
+        }
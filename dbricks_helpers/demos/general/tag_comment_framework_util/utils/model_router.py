@@ -0,0 +1,128 @@
+"""
+Model Router
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .prompt_budget import estimate_tokens
+from .concurrency_controller import AdaptiveConcurrencyController
+
+
+class ModelRouter:
+    """
+    Route description prompts to a fast (small) or large model endpoint by estimated difficulty.
+    A prompt goes to the large tier when it is long, describes complex types (array/map/struct/variant)
+    or its sample values have high character entropy (free text, JSON, opaque codes); otherwise to the fast tier.
+    Latency and failures are recorded per tier; fast tier errors fall back to the large tier, and the fast
+    tier is bypassed while its failure rate is above max_fast_failure_rate.
+    """
+
+    TIERS = ["fast", "large"]
+    COMPLEX_TYPE_PATTERN = re.compile(r"\b(array|map|struct|variant)\b", re.IGNORECASE)
+
+    def __init__(self, fast_endpoint, large_endpoint, max_fast_prompt_tokens=1000, max_fast_entropy=4.5,
+                 max_fast_failure_rate=0.2, min_calls_for_failure_rate=20):
+        self.endpoints = {"fast": fast_endpoint, "large": large_endpoint}
+        self.max_fast_prompt_tokens = max_fast_prompt_tokens  # Longer prompts go to the large tier
+        self.max_fast_entropy = max_fast_entropy  # Sample character entropy (bits/char) above this goes to the large tier
+        self.max_fast_failure_rate = max_fast_failure_rate  # Fast tier is bypassed above this failure rate
+        self.min_calls_for_failure_rate = min_calls_for_failure_rate  # Fast tier calls before its failure rate counts
+        self.stats = {tier: {"routed": 0, "calls": 0, "failures": 0, "fallbacks": 0, "latencies": []} for tier in self.TIERS}
+        self.reasons = {}  # {reason: count} of large tier routing decisions
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def sample_entropy(text: str) -> float:
+        """Shannon entropy of the sample text in bits per character."""
+        text = str(text or "")
+        if not text:
+            return 0.0
+        counts = {}
+        for char in text:
+            counts[char] = counts.get(char, 0) + 1
+        return -sum(n / len(text) * math.log2(n / len(text)) for n in counts.values())
+
+    def failure_rate(self, tier: str) -> float:
+        with self.lock:
+            stats = self.stats[tier]
+            return stats["failures"] / stats["calls"] if stats["calls"] else 0.0
+
+    def content_reason(self, prompt: str, data_types: List[str] = (), sample_text: str = "") -> Optional[str]:
+        """Why the request itself needs the large tier (prompt size, complex type, sample entropy), or None."""
+        if estimate_tokens(prompt) > self.max_fast_prompt_tokens:
+            return "prompt size"
+        if any(self.COMPLEX_TYPE_PATTERN.search(str(t)) for t in data_types):
+            return "complex type"
+        if self.sample_entropy(sample_text) > self.max_fast_entropy:
+            return "sample entropy"
+        return None
+
+    def endpoint_for(self, prompt: str, data_types: List[str] = (), sample_text: str = "") -> str:
+        """
+        Endpoint the request is routed to by its content, without recording a routing decision
+        (description cache keys; fast tier health fallbacks are not part of the key).
+        """
+        return self.endpoints["large" if self.content_reason(prompt, data_types, sample_text) else "fast"]
+
+    def classify(self, prompt: str, data_types: List[str] = (), sample_text: str = "") -> str:
+        """Tier for one request: 'large' for long prompts, complex types, high-entropy samples or an unhealthy fast tier."""
+        reason = self.content_reason(prompt, data_types, sample_text)
+        if (reason is None and self.stats["fast"]["calls"] >= self.min_calls_for_failure_rate
+                and self.failure_rate("fast") > self.max_fast_failure_rate):
+            reason = "fast tier failure rate"
+
+        tier = "large" if reason else "fast"
+        with self.lock:
+            self.stats[tier]["routed"] += 1
+            if reason:
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return tier
+
+    def record(self, tier: str, latency: float, failed: bool = False) -> None:
+        with self.lock:
+            stats = self.stats[tier]
+            stats["calls"] += 1
+            stats["failures"] += 1 if failed else 0
+            if not failed:
+                stats["latencies"].append(latency)
+
+    def run(self, tier: str, query_model: Callable, prompt_count: int = 1):
+        """
+        Run query_model(endpoint_name) on the tier's endpoint and record its latency (per prompt) or failure.
+        Fast tier errors are retried once on the large tier; throttling is raised so the caller can back off.
+        """
+        start_time = time.time()
+        try:
+            result = query_model(self.endpoints[tier])
+        except Exception as e:
+            self.record(tier, 0.0, failed=True)
+            if tier != "fast" or AdaptiveConcurrencyController.is_throttle_error(e):
+                raise
+            with self.lock:
+                self.stats["fast"]["fallbacks"] += 1
+            return self.run("large", query_model, prompt_count)
+        self.record(tier, (time.time() - start_time) / max(prompt_count, 1))
+        return result
+
+    def get_summary(self) -> Dict:
+        """Routing counts, latency and failure rate per tier, and why requests went to the large tier."""
+        with self.lock:
+            summary = {"reasons": dict(self.reasons)}
+            for tier in self.TIERS:
+                stats = self.stats[tier]
+                latencies = sorted(stats["latencies"])
+                summary[tier] = {
+                    "endpoint": self.endpoints[tier],
+                    "routed": stats["routed"],
+                    "calls": stats["calls"],
+                    "failures": stats["failures"],
+                    "failure_rate": round(stats["failures"] / stats["calls"], 3) if stats["calls"] else 0,
+                    "fallbacks": stats["fallbacks"],
+                    "avg_latency_seconds": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    "p95_latency_seconds": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None
+                }
+            return summary
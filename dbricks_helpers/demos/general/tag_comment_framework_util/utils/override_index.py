@@ -0,0 +1,69 @@
+"""
+Override Index
+"""
+
+import json
+from typing import Dict, Optional
+import pandas as pd
+
+
+class OverrideIndex:
+    """Override JSON from the Excel input, parsed and validated once and keyed by catalog.schema.table."""
+
+    def __init__(self, overrides: Dict[str, Dict], errors: Optional[Dict[str, str]] = None):
+        self.overrides = overrides  # {catalog.schema.table: parsed override JSON}
+        self.errors = errors or {}  # {catalog.schema.table: validation error} for invalid JSON
+
+    @staticmethod
+    def parse_override_json(json_string, table_name):
+        """
+        Parse and validate override JSON.
+        Returns None if JSON is empty.
+        Raises exception if JSON is invalid.
+        """
+        if pd.isna(json_string) or str(json_string).strip() == '':
+            return None
+
+        try:
+            return json.loads(json_string)
+        except Exception as e:
+            raise ValueError(f"❌ INVALID JSON for table {table_name}: {str(e)}")
+
+    @classmethod
+    def from_pandas(cls, df_pandas) -> "OverrideIndex":
+        """Build the index with one pass over the Excel rows (the first row of a table wins)."""
+        overrides, errors, seen = {}, {}, set()
+
+        for row in df_pandas.to_dict('records'):
+            catalog, schema, table = row.get('table_catalog'), row.get('table_schema'), row.get('table_name')
+            if pd.isna(catalog) or pd.isna(schema) or pd.isna(table):
+                continue
+
+            full_table_name = f"{catalog}.{schema}.{table}"
+            if full_table_name in seen:
+                continue
+            seen.add(full_table_name)
+
+            # Check if override is enabled
+            override_desc = row.get('override_desc')
+            if pd.isna(override_desc) or str(override_desc).strip().upper() != 'Y':
+                continue
+
+            try:
+                override_json = cls.parse_override_json(row.get('override_json'), full_table_name)
+            except ValueError as e:
+                errors[full_table_name] = str(e)
+                continue
+            if override_json is not None:
+                overrides[full_table_name] = override_json
+
+        return cls(overrides, errors)
+
+    def get(self, full_table_name: str) -> Optional[Dict]:
+        """
+        Override JSON for a table, or None if override is disabled or not applicable.
+        Raises ValueError if the table's override JSON is invalid.
+        """
+        if full_table_name in self.errors:
+            raise ValueError(self.errors[full_table_name])
+        return self.overrides.get(full_table_name)
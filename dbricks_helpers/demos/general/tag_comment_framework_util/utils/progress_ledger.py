@@ -0,0 +1,157 @@
+"""
+Progress Ledger
+"""
+
+import threading
+import time
+import uuid
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from .description_cache import run_with_conflict_retry
+
+
+class ProgressLedger:
+    """
+    Delta ledger of the latest status per table and stage, so reruns only process unfinished or failed tables.
+    Without a table_name the ledger only keeps this run's records in memory (nothing is skipped).
+    """
+
+    def __init__(self, spark, table_name=None, shard_index=0, shard_count=1, run_id=None, flush_every=50,
+                 flush_interval_seconds=30):
+        self.spark = spark
+        self.table_name = table_name
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.run_id = run_id or uuid.uuid4().hex
+        self.flush_every = flush_every  # Buffered records written per MERGE
+        self.flush_interval_seconds = flush_interval_seconds  # Longest time a finished table stays unwritten
+        self.buffer = []
+        self.records = []  # Every record of this run
+        self.last_flush = time.time()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # One MERGE at a time
+
+    @staticmethod
+    def shard_tables(table_names: List[str], shard_index: int, shard_count: int) -> List[str]:
+        """Tables owned by one shard; a stable hash of the table name keeps concurrent jobs from overlapping."""
+        if shard_count <= 1:
+            return list(table_names)
+        return [t for t in table_names if zlib.crc32(t.lower().encode()) % shard_count == shard_index]
+
+    def ensure_table(self) -> None:
+        """Create the ledger table if it does not exist."""
+        if not self.table_name:
+            return
+        self.spark.sql(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                table_full_name STRING,
+                stage STRING,
+                status STRING,
+                duration_seconds DOUBLE,
+                error STRING,
+                run_id STRING,
+                shard_index INT,
+                shard_count INT,
+                updated_at TIMESTAMP
+            ) USING DELTA
+            TBLPROPERTIES ('delta.enableDeletionVectors' = 'true', 'delta.enableRowTracking' = 'true')
+        """)
+
+    def completed_tables(self, stage: str) -> set:
+        """Tables whose latest status for the stage is success (persisted or recorded in this run)."""
+        completed = set()
+        if self.table_name:
+            rows = self.spark.sql(f"""
+                SELECT table_full_name FROM {self.table_name}
+                WHERE stage = '{stage}' AND status = 'success'
+            """).collect()
+            completed = {r["table_full_name"] for r in rows}
+
+        with self.lock:
+            for r in self.records:
+                if r["stage"] == stage:
+                    if r["status"] == "success":
+                        completed.add(r["table_full_name"])
+                    else:
+                        completed.discard(r["table_full_name"])
+        return completed
+
+    def pending_tables(self, stage: str, table_names: List[str]) -> List[str]:
+        """Tables (in input order) that have not finished the stage yet."""
+        completed = self.completed_tables(stage)
+        return [t for t in table_names if t not in completed]
+
+    def record(self, table_full_name: str, stage: str, status: str,
+               duration_seconds: Optional[float] = None, error: Optional[str] = None) -> None:
+        """
+        Buffer one table/stage outcome; the buffer is flushed to the ledger every flush_every records
+        or flush_interval_seconds, whichever comes first.
+        Records are written from worker threads, so a failed flush is logged (records stay buffered) instead of raised.
+        """
+        record = {
+            "table_full_name": table_full_name, "stage": stage, "status": status,
+            "duration_seconds": float(duration_seconds) if duration_seconds is not None else None,
+            "error": (error or None) and str(error)[:500]
+        }
+        with self.lock:
+            self.records.append(record)
+            self.buffer.append(record)
+            should_flush = (len(self.buffer) >= self.flush_every
+                            or time.time() - self.last_flush >= self.flush_interval_seconds)
+        if should_flush:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Flush the buffered records, logging a failure (records stay buffered) instead of raising. Called after each stage."""
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️  Progress ledger flush failed, {len(self.buffer)} record(s) kept for the next flush: {str(e)[:200]}")
+
+    def track(self, table_full_name: str, stage: str, action: Callable, *args) -> Dict:
+        """Run action(*args) for a table and record its status (result["status"]/["message"]) and duration."""
+        start_time = time.time()
+        result = action(*args)
+        self.record(table_full_name, stage, result.get("status", "error"), time.time() - start_time,
+                    None if result.get("status") == "success" else result.get("message"))
+        return result
+
+    def flush(self) -> None:
+        """MERGE the buffered records into the ledger (one row per table and stage)."""
+        with self.flush_lock:  # Serialize MERGEs from worker threads
+            with self.lock:
+                records, self.buffer = self.buffer, []
+                self.last_flush = time.time()
+            if not self.table_name or not records:
+                return
+
+            # Keep the last record per table and stage
+            latest = {(r["table_full_name"], r["stage"]): r for r in records}
+            source_df = self.spark.createDataFrame(
+                [(r["table_full_name"], r["stage"], r["status"], r["duration_seconds"], r["error"],
+                  self.run_id, self.shard_index, self.shard_count) for r in latest.values()],
+                schema="table_full_name string, stage string, status string, duration_seconds double, error string, "
+                       "run_id string, shard_index int, shard_count int"
+            )
+
+            merge = lambda: self.spark.sql(f"""
+                MERGE INTO {self.table_name} AS t
+                USING {{source}} AS s
+                ON t.table_full_name = s.table_full_name AND t.stage = s.stage
+                WHEN MATCHED THEN UPDATE SET
+                    t.status = s.status, t.duration_seconds = s.duration_seconds, t.error = s.error,
+                    t.run_id = s.run_id, t.shard_index = s.shard_index, t.shard_count = s.shard_count,
+                    t.updated_at = current_timestamp()
+                WHEN NOT MATCHED THEN INSERT
+                    (table_full_name, stage, status, duration_seconds, error, run_id, shard_index, shard_count, updated_at)
+                    VALUES (s.table_full_name, s.stage, s.status, s.duration_seconds, s.error,
+                            s.run_id, s.shard_index, s.shard_count, current_timestamp())
+            """, source=source_df)
+            try:
+                run_with_conflict_retry(merge)
+            except Exception:
+                # Keep the records for the next flush
+                with self.lock:
+                    self.buffer = records + self.buffer
+                raise
@@ -0,0 +1,89 @@
+"""
+Prompt Budget
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+
+TRUNCATED_MARKER = " ...[truncated]"
+
+
+def estimate_tokens(text) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return len(str(text or "")) // 4
+
+
+def dedupe_values(values) -> List:
+    """Distinct values in first-seen order, without nulls and blanks."""
+    seen, distinct = set(), []
+    for value in values:
+        if value is None or str(value).strip() == "" or value in seen:
+            continue
+        seen.add(value)
+        distinct.append(value)
+    return distinct
+
+
+def fit_values_to_tokens(values: List, max_tokens: int) -> Tuple[str, bool]:
+    """
+    Render values as a list string that fits max_tokens, adding values in order while they fit.
+    Returns: (text, truncated)
+    """
+    max_chars = max(max_tokens, 0) * 4
+    selected = []
+    for value in values:
+        if len(str(selected + [value])) > max_chars:
+            if not selected:
+                # Not even one value fits: keep the start of the first one
+                return (str(value)[:max(max_chars - len(TRUNCATED_MARKER), 0)] + TRUNCATED_MARKER, True)
+            return (str(selected), True)
+        selected.append(value)
+    return (str(selected), False)
+
+
+def fit_rows_to_tokens(rows: List[Dict], max_tokens: int) -> Tuple[str, bool]:
+    """
+    Render sample rows that fit max_tokens: duplicate rows and all-null columns are dropped first.
+    Returns: (text, truncated)
+    """
+    non_null_columns = {col for row in rows for col, value in row.items() if value is not None}
+    projected = [{col: value for col, value in row.items() if col in non_null_columns} for row in rows]
+
+    distinct_rows, seen = [], set()
+    for row in projected:
+        key = tuple(sorted(row.items()))
+        if key not in seen:
+            seen.add(key)
+            distinct_rows.append(row)
+
+    return fit_values_to_tokens(distinct_rows, max_tokens)
+
+
+class PromptMetrics:
+    """Thread-safe prompt size metrics shared by the description generators."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.prompts = 0
+        self.truncated = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+
+    def record(self, prompt: str, truncated: bool = False) -> None:
+        tokens = estimate_tokens(prompt)
+        with self.lock:
+            self.prompts += 1
+            self.truncated += 1 if truncated else 0
+            self.total_tokens += tokens
+            self.max_tokens = max(self.max_tokens, tokens)
+
+    def get_summary(self) -> Dict:
+        with self.lock:
+            return {
+                "prompts": self.prompts,
+                "truncated_prompts": self.truncated,
+                "total_tokens": self.total_tokens,
+                "avg_tokens": round(self.total_tokens / self.prompts, 1) if self.prompts else 0,
+                "max_tokens": self.max_tokens
+            }
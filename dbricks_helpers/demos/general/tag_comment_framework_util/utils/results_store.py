@@ -0,0 +1,97 @@
+"""
+Description Results Store
+"""
+
+import uuid
+from typing import Dict, List, Optional
+from pyspark.sql import DataFrame, Window
+from pyspark.sql import functions as F
+
+from .description_cache import run_with_conflict_retry
+
+
+class DescriptionResultsStore:
+    """Delta table of generated table/column descriptions, appended per run and marked once applied."""
+
+    KEY_COLUMNS = ["run_id", "object_type", "table_catalog", "table_schema", "table_name", "column_name"]
+
+    SCHEMA = [
+        ("run_id", "STRING"), ("object_type", "STRING"),
+        ("table_catalog", "STRING"), ("table_schema", "STRING"), ("table_name", "STRING"),
+        ("column_name", "STRING"), ("data_type", "STRING"),
+        ("replace_comment", "BOOLEAN"), ("existing_comment", "STRING"), ("new_comment", "STRING"), ("source", "STRING"),
+        ("generated_at", "TIMESTAMP"), ("applied_at", "TIMESTAMP")
+    ]
+
+    def __init__(self, spark, table_name, run_id=None):
+        self.spark = spark
+        self.table_name = table_name
+        self.run_id = run_id or uuid.uuid4().hex  # Rows written by this run; earlier runs stay as history
+
+    def ensure_table(self) -> None:
+        """Create the results table if it does not exist (row-level concurrency for parallel MERGEs)."""
+        self.spark.sql(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} ({", ".join(f"{name} {data_type}" for name, data_type in self.SCHEMA)})
+            USING DELTA
+            TBLPROPERTIES ('delta.enableDeletionVectors' = 'true', 'delta.enableRowTracking' = 'true')
+        """)
+
+    def write_results(self, object_type: str, results: DataFrame) -> None:
+        """
+        MERGE a generator's output (ColumnDescriptionGenerator/TableDescriptionGenerator.execute) into the store.
+        object_type is 'column' or 'table'; rerunning a table in the same run replaces its rows.
+        """
+        source_df = (results
+            .withColumn("run_id", F.lit(self.run_id))
+            .withColumn("object_type", F.lit(object_type))
+            .withColumn("column_name", F.col("column_name") if "column_name" in results.columns else F.lit(None).cast("string"))
+            .withColumn("data_type", F.col("data_type") if "data_type" in results.columns else F.lit(None).cast("string"))
+            .withColumn("generated_at", F.current_timestamp())
+            .withColumn("applied_at", F.lit(None).cast("timestamp"))
+            .select(*[name for name, _ in self.SCHEMA]))
+
+        match = " AND ".join(f"t.{c} <=> s.{c}" for c in self.KEY_COLUMNS)
+        run_with_conflict_retry(lambda: self.spark.sql(f"""
+            MERGE INTO {self.table_name} AS t
+            USING {{source}} AS s
+            ON {match}
+            WHEN MATCHED THEN UPDATE SET *
+            WHEN NOT MATCHED THEN INSERT *
+        """, source=source_df))
+
+    def read_pending(self, object_type: str, table_list: Optional[List[str]] = None) -> DataFrame:
+        """
+        Latest result per table/column that still has to be applied (replace_comment and not applied yet).
+        Optionally limited to table_list (catalog.schema.table names).
+        """
+        results = self.spark.table(self.table_name).filter(F.col("object_type") == object_type)
+        if table_list:
+            results = results.filter(
+                F.concat_ws('.', "table_catalog", "table_schema", "table_name").isin(list(table_list)))
+
+        latest = Window.partitionBy("table_catalog", "table_schema", "table_name", "column_name").orderBy(F.col("generated_at").desc())
+        return (results
+            .withColumn("result_rank", F.row_number().over(latest))
+            .filter((F.col("result_rank") == 1) & F.col("applied_at").isNull() & (F.col("replace_comment") == True))
+            .drop("result_rank"))
+
+    def mark_applied(self, object_type: str, applied: List[Dict]) -> None:
+        """
+        Set applied_at for results that were applied to Unity Catalog with one MERGE.
+        Each entry needs run_id, table_catalog, table_schema, table_name and column_name (None for tables).
+        """
+        if not applied:
+            return
+
+        applied_df = self.spark.createDataFrame(
+            [(a["run_id"], object_type, a["table_catalog"], a["table_schema"], a["table_name"], a.get("column_name")) for a in applied],
+            schema="run_id string, object_type string, table_catalog string, table_schema string, table_name string, column_name string"
+        ).dropDuplicates()
+
+        match = " AND ".join(f"t.{c} <=> s.{c}" for c in self.KEY_COLUMNS)
+        run_with_conflict_retry(lambda: self.spark.sql(f"""
+            MERGE INTO {self.table_name} AS t
+            USING {{source}} AS s
+            ON {match}
+            WHEN MATCHED THEN UPDATE SET t.applied_at = current_timestamp()
+        """, source=applied_df))
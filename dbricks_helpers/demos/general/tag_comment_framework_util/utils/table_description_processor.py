@@ -2,22 +2,50 @@
 Table Description Processor
 """
 
-from typing import Dict, Optional
-from functools import reduce
+import os
+import time
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pyspark.sql import DataFrame, Row
 from pyspark.sql import functions as F
 from pyspark.sql.types import StructType, StructField, StringType, BooleanType
 
+from .prompt_budget import estimate_tokens, fit_rows_to_tokens
+
 
 class TableDescriptionGenerator:
     """Generate AI table descriptions and save to storage."""
     
+    # Prompt template (EXACT ORIGINAL wording), also hashed into description cache keys
+    TABLE_PROMPT_TEMPLATE = (
+        'Provide the business context / definition, related business processes, and how to use / business enablement for the Table Metadata below using the format below:\n\n'
+        
+        '**BUSINESS CONTEXT / DEFINITION**:\n'
+        '[Example Format: - This data provides information about customer choices for in-season products, including details about product distribution, allocation, and lifecycle. It helps businesses understand how products are being distributed, allocated, and managed throughout their lifecycle, enabling informed decisions about product offerings, inventory management, and customer satisfaction.]\n'
+        '**RELATED BUSINESS PROCESSES**:\n'
+        '[Example Format: - Product Distribution and Allocation: This data supports the process of distributing products to various channels and allocating them to specific customer groups.]\n'
+        '**HOW TO USE / BUSINESS ENABLEMENT**:\n'
+        '[Example Format: - Use this data to analyze product distribution patterns and identify areas for improvement in allocation and inventory management..]\n'
+        
+        '\nStrict Requirements:\n\n'
+        '- Use concise business language suitable for non-technical business users and avoid technical jargon in all the descriptions above.\n'
+        '- Do not use catalog names, schema names, table names, or data types in any of the descriptions above.\n'
+        '- The entire output should be <= {prompt_return_length} words in all the descriptions above.\n'
+        
+        '\nTable Metadata:\n\n'
+        '- The table "{table}" is in schema "{schema}" within catalog "{catalog}".\n'
+        '- The table columns are {schema_str}.\n'
+        '- The sample data is: {sample_preview}.\n'
+    )
+    
     def __init__(self, spark, catalog, output_path,
                  endpoint_name="databricks-meta-llama-3-3-70b-instruct",
                  schema=None, table=None,
                  data_limit=2, max_cell_chars=1000, always_update=True,
                  prompt_return_length=200, output_file_format="json",
-                 override_json=None):
+                 override_json=None, description_cache=None, table_info=None, table_sampler=None,
+                 results_store=None, concurrency_controller=None, prompt_token_budget=None, prompt_metrics=None,
+                 model_router=None, hedged_executor=None):
         self.spark = spark
         self.catalog = catalog
         self.schema = schema
@@ -30,6 +58,16 @@ class TableDescriptionGenerator:
         self.prompt_return_length = prompt_return_length
         self.output_file_format = output_file_format
         self.override_json = override_json or {}
+        self.description_cache = description_cache  # Optional DescriptionCache consulted before calling the model
+        self.cache_hit = False
+        self.table_info = table_info  # Optional prefetched information_schema.tables row (see MetadataPrefetcher)
+        self.table_sampler = table_sampler  # Optional TableSampler shared with ColumnDescriptionGenerator
+        self.results_store = results_store  # Optional DescriptionResultsStore written instead of per-table files
+        self.concurrency_controller = concurrency_controller  # Optional AdaptiveConcurrencyController shared by all generators
+        self.prompt_token_budget = prompt_token_budget  # Optional max prompt tokens: sample rows deduped and truncated
+        self.prompt_metrics = prompt_metrics  # Optional PromptMetrics shared by all generators
+        self.model_router = model_router  # Optional ModelRouter choosing a fast or large endpoint per request
+        self.hedged_executor = hedged_executor  # Optional HedgedRequestExecutor duplicating straggling model calls
         
     def get_table_metadata(self, catalog: str, schema: str, table: str) -> Dict:
         """Get table schema and sample data (EXACT ORIGINAL logic)."""
@@ -44,26 +82,31 @@ class TableDescriptionGenerator:
         # Get sample data with truncation (matching original exactly)
         samples = []
         
-        # Collect up to data_limit rows from the table
-        for row in df.limit(self.data_limit).collect():
-            rdict = {}
+        # Shared sample: reuse the rows already read for the column descriptions
+        if self.table_sampler is not None:
+            samples = self.table_sampler.truncate_rows(
+                self.table_sampler.get_sample(full_table_name, self.data_limit, df.columns), self.max_cell_chars)
+        else:
+            # Collect up to data_limit rows from the table
+            for row in df.limit(self.data_limit).collect():
+                rdict = {}
             
-            # Iterate through each column in the row
-            for col, val in row.asDict(recursive=True).items():
-                if val is None:
-                    # Preserve null values as-is
-                    rdict[col] = None
-                else:
-                    val_str = str(val)
-                    
-                    # Truncate only if individual value exceeds the configured limit
-                    if len(val_str) > self.max_cell_chars:
-                        rdict[col] = val_str[:self.max_cell_chars] + " ...[truncated]"
+                # Iterate through each column in the row
+                for col, val in row.asDict(recursive=True).items():
+                    if val is None:
+                        # Preserve null values as-is
+                        rdict[col] = None
                     else:
-                        rdict[col] = val_str
+                        val_str = str(val)
+                    
+                        # Truncate only if individual value exceeds the configured limit
+                        if len(val_str) > self.max_cell_chars:
+                            rdict[col] = val_str[:self.max_cell_chars] + " ...[truncated]"
+                        else:
+                            rdict[col] = val_str
             
-            # Append the sanitized row to the sample list
-            samples.append(rdict)
+                # Append the sanitized row to the sample list
+                samples.append(rdict)
         
         # Return the metadata dictionary for this table
         return {
@@ -74,38 +117,103 @@ class TableDescriptionGenerator:
             "samples": samples
         }
     
+    def build_table_prompt(self, table_metadata: Dict, record_metrics: bool = True) -> str:
+        """
+        Build the table description prompt using the business-focused template (EXACT ORIGINAL).
+        With a prompt_token_budget, duplicate rows and all-null columns are dropped and the sample is truncated to the budget.
+        """
+        def format_prompt(sample_preview):
+            return self.TABLE_PROMPT_TEMPLATE.format(
+                prompt_return_length=self.prompt_return_length,
+                table=table_metadata["table"],
+                schema=table_metadata["schema"],
+                catalog=table_metadata["catalog"],
+                schema_str=table_metadata["schema_str"],
+                sample_preview=sample_preview
+            )
+        
+        truncated = False
+        if self.prompt_token_budget is None:
+            sample_preview = str(table_metadata["samples"])
+        else:
+            sample_budget = self.prompt_token_budget - estimate_tokens(format_prompt(""))
+            sample_preview, truncated = fit_rows_to_tokens(table_metadata["samples"], sample_budget)
+        
+        prompt = format_prompt(sample_preview)
+        if self.prompt_metrics is not None and record_metrics:
+            self.prompt_metrics.record(prompt, truncated)
+        return prompt
+    
+    def get_sample_text(self, table_metadata: Dict) -> str:
+        return " ".join(str(v) for row in table_metadata["samples"] for v in row.values() if v is not None)
+    
+    def get_cache_endpoint(self, table_metadata: Dict) -> str:
+        """Endpoint the table is routed to (the notebook endpoint without a model router)."""
+        if self.model_router is None:
+            return self.endpoint_name
+        prompt = self.build_table_prompt(table_metadata, record_metrics=False)
+        return self.model_router.endpoint_for(prompt, [table_metadata["schema_str"]], self.get_sample_text(table_metadata))
+    
+    def get_cache_key(self, table_metadata: Dict, endpoint_name: Optional[str] = None) -> str:
+        """Description cache key: routed endpoint, prompt template and budgets, and the table schema (not the sample rows)."""
+        return self.description_cache.make_key(
+            endpoint_name or self.get_cache_endpoint(table_metadata),
+            [self.TABLE_PROMPT_TEMPLATE, self.prompt_return_length, self.prompt_token_budget],
+            f"{table_metadata['catalog']}.{table_metadata['schema']}.{table_metadata['table']}",
+            None, table_metadata["schema_str"],
+            self.description_cache.fingerprint(table_metadata["schema_str"])
+        )
+    
+    def generate_ai_description(self, table_metadata: Dict) -> str:
+        """Generate the AI description, consulting the description cache before calling the model."""
+        if self.description_cache is None:
+            return self.get_table_description_ai(table_metadata)
+        
+        endpoint_name = self.get_cache_endpoint(table_metadata)
+        cache_key = self.get_cache_key(table_metadata, endpoint_name)
+        cached = self.description_cache.get_many([cache_key])
+        if cache_key in cached:
+            self.cache_hit = True
+            return cached[cache_key]
+        
+        description = self.get_table_description_ai(table_metadata)
+        self.description_cache.put_many([{
+            "cache_key": cache_key,
+            "description": description,
+            "endpoint_name": endpoint_name,
+            "full_table_name": f"{table_metadata['catalog']}.{table_metadata['schema']}.{table_metadata['table']}",
+            "column_name": None
+        }])
+        return description
+    
     def get_table_description_ai(self, table_metadata: Dict) -> str:
         """Generate AI description using metadata with business-focused template (EXACT ORIGINAL)."""
-        sample_preview = str(table_metadata["samples"])
+        prompt = self.build_table_prompt(table_metadata)
         
-        prompt = (
-            f'Provide the business context / definition, related business processes, and how to use / business enablement for the Table Metadata below using the format below:\n\n'
-            
-            f'**BUSINESS CONTEXT / DEFINITION**:\n'
-            f'[Example Format: - This data provides information about customer choices for in-season products, including details about product distribution, allocation, and lifecycle. It helps businesses understand how products are being distributed, allocated, and managed throughout their lifecycle, enabling informed decisions about product offerings, inventory management, and customer satisfaction.]\n'
-            f'**RELATED BUSINESS PROCESSES**:\n'
-            f'[Example Format: - Product Distribution and Allocation: This data supports the process of distributing products to various channels and allocating them to specific customer groups.]\n'
-            f'**HOW TO USE / BUSINESS ENABLEMENT**:\n'
-            f'[Example Format: - Use this data to analyze product distribution patterns and identify areas for improvement in allocation and inventory management..]\n'
-            
-            f'\nStrict Requirements:\n\n'
-            f'- Use concise business language suitable for non-technical business users and avoid technical jargon in all the descriptions above.\n'
-            f'- Do not use catalog names, schema names, table names, or data types in any of the descriptions above.\n'
-            f'- The entire output should be <= {self.prompt_return_length} words in all the descriptions above.\n'
-            
-            f'\nTable Metadata:\n\n'
-            f'- The table "{table_metadata["table"]}" is in schema "{table_metadata["schema"]}" within catalog "{table_metadata["catalog"]}".\n'
-            f'- The table columns are {table_metadata["schema_str"]}.\n'
-            f'- The sample data is: {sample_preview}.\n'
-        )
+        def query_model(endpoint_name):
+            return self.spark.sql(f"""
+                SELECT ai_query(
+                    '{endpoint_name}',
+                    '{prompt.replace("'", "''")}'
+                ) as description
+            """).collect()[0]['description']
+        
+        if self.hedged_executor is not None:
+            # The primary and the hedge each run through the concurrency controller
+            query_model = self.hedged_executor.wrap(query_model, 1, self.concurrency_controller, estimate_tokens(prompt))
         
-        result = self.spark.sql(f"""
-            SELECT ai_query(
-                '{self.endpoint_name}',
-                '{prompt.replace("'", "''")}'
-            ) as description
-        """).collect()[0]['description']
+        if self.model_router is None:
+            call = lambda: query_model(self.endpoint_name)
+        else:
+            tier = self.model_router.classify(prompt, [table_metadata["schema_str"]], self.get_sample_text(table_metadata))
+            call = lambda: self.model_router.run(tier, query_model)
         
+        if self.concurrency_controller is None or self.hedged_executor is not None:
+            result = call()
+        else:
+            result = self.concurrency_controller.run(call, estimate_tokens(prompt))
+        if result is None or not result.strip():
+            raise ValueError(f"ai_query returned no description for table {table_metadata['catalog']}.{table_metadata['schema']}.{table_metadata['table']}")
         return result.strip()
     
     def get_table_description_with_override(self, table_metadata: Dict) -> tuple:
@@ -122,20 +230,23 @@ class TableDescriptionGenerator:
             return (table_desc, "manual")
         else:
             # Use AI generation
-            return (self.get_table_description_ai(table_metadata), "ai")
+            return (self.generate_ai_description(table_metadata), "ai")
     
     def execute(self) -> DataFrame:
         """Generate description for the specified table."""
-        # Get table info
-        query = f"""
-            SELECT table_catalog, table_schema, table_name, comment
-            FROM system.information_schema.tables
-            WHERE table_catalog = '{self.catalog}'
-            AND table_schema = '{self.schema}'
-            AND table_name = '{self.table}'
-        """
-        
-        table_info = self.spark.sql(query).collect()
+        # Get table info (prefetched in bulk when provided)
+        if self.table_info is not None:
+            table_info = [self.table_info] if self.table_info else []
+        else:
+            query = f"""
+                SELECT table_catalog, table_schema, table_name, comment
+                FROM system.information_schema.tables
+                WHERE table_catalog = '{self.catalog}'
+                AND table_schema = '{self.schema}'
+                AND table_name = '{self.table}'
+            """
+            
+            table_info = self.spark.sql(query).collect()
         if not table_info:
             raise Exception(f"Table not found: {self.catalog}.{self.schema}.{self.table}")
         
@@ -151,7 +262,7 @@ class TableDescriptionGenerator:
             if self.override_json:
                 new_comment, source = self.get_table_description_with_override(metadata)
             else:
-                new_comment = self.get_table_description_ai(metadata)
+                new_comment = self.generate_ai_description(metadata)
                 source = "ai"
         else:
             new_comment = None
@@ -181,7 +292,11 @@ class TableDescriptionGenerator:
         return self.spark.createDataFrame([row], schema=schema)
     
     def save_descriptions(self, table_descriptions: DataFrame) -> None:
-        """Save descriptions to storage."""
+        """Save descriptions to storage (MERGE into the results store when one is configured)."""
+        if self.results_store is not None:
+            self.results_store.write_results("table", table_descriptions)
+            return
+        
         output_location = f"{self.output_path}/{self.output_file_format}/{self.table}"
         
         (
@@ -198,59 +313,67 @@ class TableDescriptionGenerator:
 class TableDescriptionImporter:
     """Import and apply table descriptions to Unity Catalog."""
     
-    def __init__(self, spark, input_path, output_file_format="json", table_list=None):
+    DESCRIPTION_SCHEMA = StructType([
+        StructField("table_catalog", StringType(), True),
+        StructField("table_schema", StringType(), True),
+        StructField("table_name", StringType(), True),
+        StructField("replace_comment", BooleanType(), True),
+        StructField("existing_comment", StringType(), True),
+        StructField("new_comment", StringType(), True),
+        StructField("source", StringType(), True)
+    ])
+    
+    def __init__(self, spark, input_path=None, output_file_format="json", table_list=None, max_workers=8,
+                 results_store=None):
         self.spark = spark
         self.input_path = input_path
         self.output_file_format = output_file_format
         self.table_list = table_list  # Optional: list of specific tables to import
+        self.max_workers = max_workers  # Tables commented in parallel
+        self.table_results = []  # Per-table outcome and timing from the last apply_descriptions
+        self.results_store = results_store  # Optional DescriptionResultsStore read instead of input_path
+        self.missing_paths = []  # Requested table folders not found by the last read_descriptions
+    
+    def find_missing_paths(self, paths: List[str]) -> List[str]:
+        """Table folders that do not exist, from one listing of input_path (UC Volumes are mounted on the driver)."""
+        try:
+            existing = set(os.listdir(self.input_path))
+        except OSError:
+            return []  # Not a locally mounted path: the single read reports a missing folder
+        return [path for path in paths if path.rsplit('/', 1)[-1] not in existing]
     
     def read_descriptions(self) -> DataFrame:
-        """Read descriptions from storage."""
+        """Read descriptions from storage (only rows not applied yet when reading the results store)."""
+        if self.results_store is not None:
+            return self.results_store.read_pending("table", self.table_list)
+        
+        # The generator's schema is known, so there is no inference pass over the files
+        reader = (self.spark.read
+            .format(self.output_file_format)
+            .option("header", "true")
+            .schema(self.DESCRIPTION_SCHEMA))
+        
         # If specific tables provided, read only those
         if self.table_list:
-            dfs = []
-            for table_full_name in self.table_list:
-                # Extract table name from catalog.schema.table
-                table_name = table_full_name.split('.')[-1]
-                try:
-                    df = (self.spark.read
-                        .format(self.output_file_format)
-                        .option("header", "true")
-                        .option("inferSchema", "true")
-                        .load(f"{self.input_path}/{table_name}"))
-                    dfs.append(df)
-                except:
-                    pass  # Skip tables that couldn't be read
+            # One read over the generated table folders instead of one read per table
+            paths = sorted(set(f"{self.input_path}/{name.split('.')[-1]}" for name in self.table_list))
+            self.missing_paths = self.find_missing_paths(paths)
+            if self.missing_paths:
+                print(f"  ⚠️  {len(self.missing_paths)} table description folder(s) not found: {', '.join(self.missing_paths[:10])}")
+            existing_paths = [path for path in paths if path not in self.missing_paths]
+            if not existing_paths:
+                return self.spark.createDataFrame([], self.DESCRIPTION_SCHEMA)
+            df = reader.load(existing_paths)
             
-            if dfs:
-                df = reduce(lambda df1, df2: df1.union(df2), dfs)
-            else:
-                # Return empty DataFrame with correct schema
-                schema = StructType([
-                    StructField("table_catalog", StringType(), True),
-                    StructField("table_schema", StringType(), True),
-                    StructField("table_name", StringType(), True),
-                    StructField("replace_comment", BooleanType(), True),
-                    StructField("existing_comment", StringType(), True),
-                    StructField("new_comment", StringType(), True)
-                ])
-                df = self.spark.createDataFrame([], schema)
+            # Folders are named by table only, so keep just the requested catalog.schema.table
+            df = df.filter(F.concat_ws('.', "table_catalog", "table_schema", "table_name").isin(list(self.table_list)))
         else:
-            # Read all tables (original behavior)
             try:
                 # Read from all table subfolders
-                df = (self.spark.read
-                    .format(self.output_file_format)
-                    .option("header", "true")
-                    .option("inferSchema", "true")
-                    .load(self.input_path + "/*"))
+                df = reader.load(self.input_path + "/*")
             except:
                 # Fallback to direct path
-                df = (self.spark.read
-                    .format(self.output_file_format)
-                    .option("header", "true")
-                    .option("inferSchema", "true")
-                    .load(self.input_path))
+                df = reader.load(self.input_path)
         
         return df.filter(F.col("replace_comment") == True)
     
@@ -263,31 +386,38 @@ class TableDescriptionImporter:
                          F.col("table_name")))
             .withColumn("cleaned_comment", F.regexp_replace("new_comment", "'", "")))
     
+    def apply_description(self, row: Dict) -> Dict:
+        """Apply one table description. Returns outcome and timing."""
+        full_name = row["full_table_name"]
+        start_time = time.time()
+        try:
+            self.spark.sql(f"COMMENT ON TABLE {full_name} IS '{row['cleaned_comment']}'")
+            status, error = "success", None
+        except Exception as e:
+            status, error = "error", str(e)[:100]
+            print(f"  ✗ Failed: {full_name} - {error}")
+        return {"table": full_name, "status": status, "error": error, "seconds": round(time.time() - start_time, 2), "row": row}
+    
     def apply_descriptions(self, prepared_df: DataFrame) -> int:
-        """Apply descriptions to Unity Catalog tables. Returns count of successful updates."""
-        tables = prepared_df.collect()
-        successful_count = 0
+        """Apply descriptions to Unity Catalog tables, in parallel. Returns count of successful updates."""
+        tables = [row.asDict() for row in prepared_df.collect()]
         
-        for row in tables:
-            full_name = row["full_table_name"]
-            comment = row["cleaned_comment"]
-            
-            try:
-                self.spark.sql(f"COMMENT ON TABLE {full_name} IS '{comment}'")
-                successful_count += 1
-            except Exception as e:
-                print(f"  ✗ Failed: {full_name} - {str(e)[:100]}")
+        self.table_results = []
+        if tables:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tables))) as executor:
+                futures = [executor.submit(self.apply_description, row) for row in tables]
+                for future in as_completed(futures):
+                    self.table_results.append(future.result())
+        
+        if self.results_store is not None:
+            self.results_store.mark_applied("table", [r["row"] for r in self.table_results if r["status"] == "success"])
         
-        return successful_count
+        return sum(1 for r in self.table_results if r["status"] == "success")
     
     def execute(self) -> Dict:
-        """Execute the import workflow. Returns dictionary with tables_processed count."""
+        """Execute the import workflow. Returns dictionary with tables_processed count and per-table results."""
         descriptions = self.read_descriptions()
-        
-        if descriptions.count() == 0:
-            return {'tables_processed': 0}
-        
         prepared = self.prepare_descriptions(descriptions)
         successful_count = self.apply_descriptions(prepared)
         
-        return {'tables_processed': successful_count}
+        return {'tables_processed': successful_count, 'table_results': self.table_results}
@@ -0,0 +1,188 @@
+"""
+Table Sampler
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class TableSampler:
+    """
+    Read sample rows once per table and share them between the description generators.
+    With a spill_path, samples evicted from the in-memory LRU are written to local disk and read back from there,
+    so the table description phase does not re-read tables the column phase already sampled.
+    """
+
+    def __init__(self, spark, data_limit=5, max_cell_chars=1000, tablesample_percent=None,
+                 max_cached_tables=256, max_cached_bytes=256 * 1024 * 1024, spill_path=None):
+        self.spark = spark
+        self.data_limit = data_limit  # Rows read per table (largest limit any generator asks for)
+        self.max_cell_chars = max_cell_chars  # Values are capped here before caching; generators truncate further
+        self.tablesample_percent = tablesample_percent  # Optional TABLESAMPLE (n PERCENT) to avoid scanning large tables
+        self.max_cached_tables = max_cached_tables
+        self.max_cached_bytes = max_cached_bytes
+        self.cache = OrderedDict()  # {full_table_name: {"columns", "limit", "rows", "bytes"}} in LRU order
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.table_locks = {}  # One lock per table so concurrent generators read it only once
+        self.spill_path = spill_path  # Optional local directory for samples evicted from memory
+        self.spilled = set()  # Tables with a sample file under spill_path
+        self.spill_reads = 0
+
+    @staticmethod
+    def quote_column(column_name: str) -> str:
+        return "`" + column_name.replace("`", "``") + "`"
+
+    @staticmethod
+    def estimate_bytes(rows: List[Dict]) -> int:
+        """Approximate cached size of sample rows (keys and string values)."""
+        return sum(len(k) + len(v or "") for row in rows for k, v in row.items())
+
+    def build_sample_query(self, full_table_name: str, columns: Optional[List[str]], limit: int,
+                           tablesample: bool) -> str:
+        projection = ", ".join(self.quote_column(c) for c in columns) if columns else "*"
+        sample_clause = f" TABLESAMPLE ({self.tablesample_percent} PERCENT)" if tablesample else ""
+        return f"SELECT {projection} FROM {full_table_name}{sample_clause} LIMIT {limit}"
+
+    def read_sample(self, full_table_name: str, columns: Optional[List[str]], limit: int) -> List[Dict]:
+        """Read sample rows with values as strings (None preserved), capped at max_cell_chars."""
+        rows_raw = None
+        if self.tablesample_percent:
+            rows_raw = self.spark.sql(self.build_sample_query(full_table_name, columns, limit, True)).collect()
+            if len(rows_raw) < limit:
+                rows_raw = None  # Sample came back short (small table), read the first rows instead
+        if rows_raw is None:
+            rows_raw = self.spark.sql(self.build_sample_query(full_table_name, columns, limit, False)).collect()
+
+        rows = []
+        for row in rows_raw:
+            clean_row = {}
+            for col, val in row.asDict(recursive=True).items():
+                if val is None:
+                    clean_row[col] = None
+                else:
+                    val_str = str(val)
+                    # Keep one extra char so callers can still tell the value was longer than their limit
+                    if self.max_cell_chars is not None and len(val_str) > self.max_cell_chars + 1:
+                        val_str = val_str[:self.max_cell_chars + 1]
+                    clean_row[col] = val_str
+            rows.append(clean_row)
+        return rows
+
+    def get_spill_file(self, full_table_name: str) -> str:
+        return os.path.join(self.spill_path, hashlib.sha256(full_table_name.encode()).hexdigest() + ".json")
+
+    def spill(self, full_table_name: str, entry: Dict) -> None:
+        """Write an evicted sample to the spill directory (no-op without a spill_path)."""
+        if self.spill_path is None:
+            return
+        os.makedirs(self.spill_path, exist_ok=True)
+        with open(self.get_spill_file(full_table_name), "w") as spill_file:
+            json.dump({"columns": entry["columns"], "limit": entry["limit"], "rows": entry["rows"]}, spill_file)
+        self.spilled.add(full_table_name)
+
+    def load_spilled(self, full_table_name: str) -> Optional[Dict]:
+        """Move a spilled sample back into the in-memory cache."""
+        if full_table_name not in self.spilled:
+            return None
+        self.spilled.discard(full_table_name)
+        spill_file = self.get_spill_file(full_table_name)
+        with open(spill_file) as f:
+            entry = json.load(f)
+        os.remove(spill_file)
+        self.spill_reads += 1
+        self.put_cached(full_table_name, entry["columns"], entry["limit"], entry["rows"])
+        return self.cache.get(full_table_name) or dict(entry, bytes=self.estimate_bytes(entry["rows"]))
+
+    def get_cached(self, full_table_name: str, columns: Optional[List[str]], limit: int) -> Optional[List[Dict]]:
+        """Cached rows for the request (from memory or the spill directory), or None when the sample cannot satisfy it."""
+        entry = self.cache.get(full_table_name) or self.load_spilled(full_table_name)
+        if entry is None:
+            return None
+        has_rows = entry["limit"] >= limit or len(entry["rows"]) < entry["limit"]
+        has_columns = entry["columns"] is None or (columns is not None and set(columns) <= set(entry["columns"]))
+        if not (has_rows and has_columns):
+            return None
+        self.cache.move_to_end(full_table_name)
+        rows = entry["rows"][:limit]
+        if columns is not None and entry["columns"] != list(columns):
+            rows = [{c: row.get(c) for c in columns} for row in rows]
+        return rows
+
+    def put_cached(self, full_table_name: str, columns: Optional[List[str]], limit: int, rows: List[Dict]) -> None:
+        """
+        Cache a sample, evicting least recently used tables to stay within the table and byte bounds
+        (evicted samples are spilled to disk when a spill_path is set).
+        """
+        size = self.estimate_bytes(rows)
+        if size > self.max_cached_bytes:
+            self.spill(full_table_name, {"columns": list(columns) if columns is not None else None, "limit": limit, "rows": rows})
+            return
+        self.spilled.discard(full_table_name)
+        old = self.cache.pop(full_table_name, None)
+        if old is not None:
+            self.cached_bytes -= old["bytes"]
+        self.cache[full_table_name] = {
+            "columns": list(columns) if columns is not None else None,
+            "limit": limit, "rows": rows, "bytes": size
+        }
+        self.cached_bytes += size
+        while self.cache and (len(self.cache) > self.max_cached_tables or self.cached_bytes > self.max_cached_bytes):
+            evicted_table, evicted = self.cache.popitem(last=False)
+            self.cached_bytes -= evicted["bytes"]
+            self.spill(evicted_table, evicted)
+
+    def get_sample(self, full_table_name: str, limit: Optional[int] = None,
+                   columns: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Sample rows for a table as {column: string value} dicts.
+        The table is read once (data_limit rows, only the requested columns) and served from cache afterwards.
+        Callers apply their own row limit and cell truncation on top of the shared sample.
+        """
+        limit = limit or self.data_limit
+        with self.lock:
+            table_lock = self.table_locks.setdefault(full_table_name, threading.Lock())
+
+        with table_lock:
+            with self.lock:
+                rows = self.get_cached(full_table_name, columns, limit)
+                if rows is not None:
+                    self.hits += 1
+                    return rows
+                self.misses += 1
+
+            read_limit = max(limit, self.data_limit)
+            rows = self.read_sample(full_table_name, columns, read_limit)
+            with self.lock:
+                self.put_cached(full_table_name, columns, read_limit, rows)
+            return rows[:limit]
+
+    def clear(self) -> None:
+        """Drop all cached samples and remove the spill directory."""
+        with self.lock:
+            self.cache.clear()
+            self.cached_bytes = 0
+            self.spilled.clear()
+            if self.spill_path is not None:
+                shutil.rmtree(self.spill_path, ignore_errors=True)
+
+    @staticmethod
+    def truncate_rows(rows: List[Dict], max_cell_chars: int) -> List[Dict]:
+        """Truncate overly long individual values only (same marker the generators always used)."""
+        truncated = []
+        for row in rows:
+            clean_row = {}
+            for col, val in row.items():
+                if val is not None and len(val) > max_cell_chars:
+                    clean_row[col] = val[:max_cell_chars] + " ...[truncated]"
+                else:
+                    clean_row[col] = val
+            truncated.append(clean_row)
+        return truncated
@@ -2,47 +2,130 @@
 Tag Processor
 """
 
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
+from pyspark.sql import functions as F
 
 
 class TagProcessor:
     """Apply tags to Unity Catalog tables."""
     
-    def __init__(self, spark, tag_column_mapping: Dict[str, str], verbose=False):
+    def __init__(self, spark, tag_column_mapping: Dict[str, str], verbose=False, unset_missing=False):
         self.spark = spark
         self.tag_column_mapping = tag_column_mapping
         self.verbose = verbose
+        self.unset_missing = unset_missing  # Also UNSET mapped tags whose Excel value is blank
     
-    def apply_tags_to_table(self, catalog: str, schema: str, table: str, tags: Dict[str, str]) -> Dict:
-        """Apply tags to a single table."""
-        full_table_name = f"{catalog}.{schema}.{table}"
-        results = {"success": [], "failed": []}
+    @staticmethod
+    def normalize_tag_value(tag_value) -> Optional[str]:
+        """Normalize a tag value. Returns None for NA, NaN, None, empty, and null-like values."""
+        if pd.isna(tag_value) or not tag_value or str(tag_value).strip().upper() in ['NA', 'NULL', '', 'NAN', 'N/A', 'NONE']:
+            return None
+        
+        # Convert boolean-like values
+        if str(tag_value) in ['1', '1.0']:
+            return 'true'
+        elif str(tag_value) in ['0', '0.0']:
+            return 'false'
+        return str(tag_value)
+    
+    def get_current_tags(self, table_names: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Read the current tags of many tables with one information_schema.table_tags query.
+        information_schema stores lowercase names, so names are lowercased for the query and the keys.
+        Returns: {catalog.schema.table (lowercase): {tag_name: tag_value}} (tables without tags map to {})
+        """
+        targets = [tuple(name.lower().split('.')) for name in set(table_names) if len(name.split('.')) == 3]
+        current_tags = {".".join(t): {} for t in targets}
+        if not targets:
+            return current_tags
+        
+        targets_df = self.spark.createDataFrame(targets, schema="catalog_name string, schema_name string, table_name string")
+        catalogs = sorted(set(t[0] for t in targets))
+        rows = (self.spark.table("system.information_schema.table_tags")
+            .filter(F.col("catalog_name").isin(catalogs))
+            .join(F.broadcast(targets_df), ["catalog_name", "schema_name", "table_name"])
+            .select("catalog_name", "schema_name", "table_name", "tag_name", "tag_value")
+            .collect())
+        
+        for r in rows:
+            current_tags[f"{r['catalog_name']}.{r['schema_name']}.{r['table_name']}"][r["tag_name"]] = r["tag_value"]
+        return current_tags
+    
+    def run_tag_statement(self, full_table_name: str, clause: str, tags: Dict[str, Optional[str]], results: Dict, result_key: str) -> None:
+        """
+        Run one multi-tag SET TAGS / UNSET TAGS statement for a table.
+        If the batched statement fails, retry tag by tag so only the offending tags are reported as failed.
+        """
+        def tag_list(tag_items):
+            if clause == "SET":
+                return ", ".join(f"'{tag_name}' = '{tag_value}'" for tag_name, tag_value in tag_items)
+            return ", ".join(f"'{tag_name}'" for tag_name, _ in tag_items)
+        
+        try:
+            self.spark.sql(f"ALTER TABLE {full_table_name} {clause} TAGS ({tag_list(tags.items())})")
+            results[result_key].extend(tags.keys())
+            return
+        except Exception as e:
+            if len(tags) == 1:
+                error_msg = str(e)[:150]
+                results["failed"].append({"tag": next(iter(tags)), "error": error_msg})
+                if self.verbose:
+                    print(f"  ✗ Failed to {clause.lower()} {next(iter(tags))}: {error_msg}")
+                return
         
         for tag_name, tag_value in tags.items():
-            # Skip NA, NaN, None, empty, and null-like values
-            if pd.isna(tag_value) or not tag_value or str(tag_value).strip().upper() in ['NA', 'NULL', '', 'NAN', 'N/A', 'NONE']:
-                continue
-            
-            # Convert boolean-like values
-            if str(tag_value) in ['1', '1.0']:
-                tag_value = 'true'
-            elif str(tag_value) in ['0', '0.0']:
-                tag_value = 'false'
-            
+            self.run_tag_statement(full_table_name, clause, {tag_name: tag_value}, results, result_key)
+    
+    def apply_tags_to_table(self, catalog: str, schema: str, table: str, tags: Dict[str, str],
+                            current_tags: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Apply tags to a single table.
+        Only tags that are missing or have a different value are set (one SET TAGS statement);
+        current_tags is read from information_schema when it was not prefetched.
+        """
+        full_table_name = f"{catalog}.{schema}.{table}"
+        results = {"success": [], "failed": [], "unchanged": [], "unset": []}
+        
+        if current_tags is None:
             try:
-                self.spark.sql(f"ALTER TABLE {full_table_name} SET TAGS ('{tag_name}' = '{tag_value}')")
-                results["success"].append(tag_name)
+                current_tags = self.get_current_tags([full_table_name]).get(full_table_name.lower(), {})
             except Exception as e:
-                error_msg = str(e)[:150]
-                results["failed"].append({"tag": tag_name, "error": error_msg})
+                # Without the current tags every tag is set (nothing is skipped or unset)
                 if self.verbose:
-                    print(f"  ✗ Failed to set {tag_name}={tag_value}: {error_msg}")
+                    print(f"  ⚠️  Could not read current tags of {full_table_name}: {str(e)[:150]}")
+                current_tags = {}
+        
+        desired_tags = {}
+        for tag_name, tag_value in tags.items():
+            tag_value = self.normalize_tag_value(tag_value)
+            # Skip NA, NaN, None, empty, and null-like values
+            if tag_value is not None:
+                desired_tags[tag_name] = tag_value
+        
+        tags_to_set = {}
+        for tag_name, tag_value in desired_tags.items():
+            if current_tags.get(tag_name) == tag_value:
+                results["unchanged"].append(tag_name)
+            else:
+                tags_to_set[tag_name] = tag_value
+        
+        if tags_to_set:
+            self.run_tag_statement(full_table_name, "SET", tags_to_set, results, "success")
+        
+        if self.unset_missing:
+            tags_to_unset = {
+                tag_name: None for tag_name in self.tag_column_mapping.values()
+                if tag_name in current_tags and tag_name not in desired_tags
+            }
+            if tags_to_unset:
+                self.run_tag_statement(full_table_name, "UNSET", tags_to_unset, results, "unset")
         
         return results
     
-    def process_single_table(self, row) -> Dict:
+    def process_single_table(self, row, current_tags: Optional[Dict[str, str]] = None) -> Dict:
         """Process tags for a single table."""
         catalog = row["table_catalog"]
         schema = row["table_schema"]
@@ -57,7 +140,7 @@ class TagProcessor:
                     tags[tag_name] = str(row[col_name])
             
             # Apply tags
-            results = self.apply_tags_to_table(catalog, schema, table, tags)
+            results = self.apply_tags_to_table(catalog, schema, table, tags, current_tags)
             
             if results["failed"]:
                 failed_tags = [f"{f['tag']}: {f['error']}" for f in results["failed"]]
@@ -66,6 +149,8 @@ class TagProcessor:
                     "status": "partial",
                     "success_count": len(results["success"]),
                     "failed_count": len(results["failed"]),
+                    "unchanged_count": len(results["unchanged"]),
+                    "unset_count": len(results["unset"]),
                     "errors": failed_tags
                 }
             else:
@@ -74,6 +159,8 @@ class TagProcessor:
                     "status": "success",
                     "success_count": len(results["success"]),
                     "failed_count": 0,
+                    "unchanged_count": len(results["unchanged"]),
+                    "unset_count": len(results["unset"]),
                     "errors": []
                 }
         
@@ -83,16 +170,35 @@ class TagProcessor:
                 "status": "error",
                 "success_count": 0,
                 "failed_count": 0,
+                "unchanged_count": 0,
+                "unset_count": 0,
                 "errors": [str(e)[:150]]
             }
     
     def execute(self, df, max_workers: int = 10) -> List[Dict]:
-        """Execute tag application with multithreading."""
+        """Execute tag application with multithreading (current tags are read once for all tables)."""
         tables = df.to_dict('records')
         results = []
         
+        table_names = [f"{row['table_catalog']}.{row['table_schema']}.{row['table_name']}" for row in tables]
+        try:
+            current_tags = self.get_current_tags(table_names)
+        except Exception as e:
+            # Fall back to reading the current tags per table
+            print(f"⚠️  Prefetching current tags failed, reading them per table: {str(e)[:150]}")
+            current_tags = {}
+        
+        def process_timed(row, table_current_tags):
+            start_time = time.time()
+            result = self.process_single_table(row, table_current_tags)
+            result["seconds"] = round(time.time() - start_time, 2)
+            return result
+        
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self.process_single_table, row): row for row in tables}
+            futures = {
+                executor.submit(process_timed, row, current_tags.get(table_name.lower())): row
+                for row, table_name in zip(tables, table_names)
+            }
             
             for future in as_completed(futures):
                 result = future.result()
@@ -1,6 +1,8 @@
 # Databricks notebook source
 # DBTITLE 1,Library Imports
 import os
+import threading
+from collections import OrderedDict
 from typing import List, Tuple
 from pyspark.sql import functions as F
 from pyspark.sql import Row, DataFrame
@@ -17,8 +19,15 @@ dbutils.widgets.text("Output Path", "", "Enter Base Volumes Path (Mandatory):")
 dbutils.widgets.text("Model Serving Endpoint Name", "databricks-meta-llama-3-3-70b-instruct", "Model Serving Endpoint Name (Mandatory):")
 dbutils.widgets.text("Sample Data Limit", "5", "Sample Data Limit (Mandatory):")
 dbutils.widgets.text("Sample Max Cell Chars", "1000", "Sample Max Cell Chars (Mandatory):")
+dbutils.widgets.text("Sample Cache Tables", "64", "Sample Cache Tables (Mandatory):")
+dbutils.widgets.text("Sample Prefetch Ahead", "4", "Sample Prefetch Ahead Tables (Mandatory):")
 dbutils.widgets.dropdown("Always Update Comments", choices=["true", "false"], defaultValue="true", label="Always Update Comments (Optional):")
 dbutils.widgets.dropdown("Prompt Return Length", choices=["10", "20", "30", "40", "50"], defaultValue="40", label="Prompt Return Length (Mandatory):")
+dbutils.widgets.dropdown("Generation Mode", choices=["batch", "streaming"], defaultValue="batch", label="Generation Mode (Mandatory):")
+dbutils.widgets.text("Streaming Work Table", "", "Streaming Work Table (Streaming Mode):")
+dbutils.widgets.text("Streaming Output Table", "", "Streaming Output Table (Streaming Mode):")
+dbutils.widgets.text("Streaming Batch Size", "500", "Columns per Micro-Batch (Streaming Mode):")
+dbutils.widgets.dropdown("Streaming Refresh Snapshot", choices=["true", "false"], defaultValue="false", label="Refresh Column Snapshot (Streaming Mode):")
 
 # COMMAND ----------
 
@@ -51,6 +60,14 @@ print(f"data_limit: {data_limit}")
 max_cell_chars = int(dbutils.widgets.get("Sample Max Cell Chars"))
 print(f"max_cell_chars: {max_cell_chars}")
 
+# Maximum number of tables whose sample rows are kept in driver memory at once
+sample_cache_tables = int(dbutils.widgets.get("Sample Cache Tables"))
+print(f"sample_cache_tables: {sample_cache_tables}")
+
+# Number of upcoming tables in the work queue whose samples are fetched in the background
+sample_prefetch_ahead = int(dbutils.widgets.get("Sample Prefetch Ahead"))
+print(f"sample_prefetch_ahead: {sample_prefetch_ahead}")
+
 # Prompt return table column comment length
 prompt_return_length = int(dbutils.widgets.get("Prompt Return Length"))
 print(f"prompt_return_length: {prompt_return_length}")
@@ -63,6 +80,31 @@ print(f"always_update: {always_update}")
 output_file_format = "json" # or csv
 print(f"output_file_format: {output_file_format}")
 
+# Generation mode: "batch" collects all comments on the driver, "streaming" processes the
+# column list in micro-batches with set-based ai_query and commits each batch to a Delta table
+generation_mode = dbutils.widgets.get("Generation Mode")
+print(f"generation_mode: {generation_mode}")
+
+# Delta snapshot of the information_schema column list used as the streaming source
+streaming_work_table = dbutils.widgets.get("Streaming Work Table")
+print(f"streaming_work_table: {streaming_work_table}")
+
+# Delta table the streaming micro-batches MERGE the generated comments into
+streaming_output_table = dbutils.widgets.get("Streaming Output Table")
+print(f"streaming_output_table: {streaming_output_table}")
+
+# Maximum number of columns per streaming micro-batch
+streaming_batch_size = int(dbutils.widgets.get("Streaming Batch Size"))
+print(f"streaming_batch_size: {streaming_batch_size}")
+
+# Re-snapshot the column list and restart the stream from scratch
+streaming_refresh = dbutils.widgets.get("Streaming Refresh Snapshot").lower() == "true"
+print(f"streaming_refresh: {streaming_refresh}")
+
+# Streaming checkpoint location (a rerun resumes from the last committed micro-batch)
+checkpoint_path = dbutils.widgets.get("Output Path") + "/bulk_comments/_checkpoints/columns"
+print(f"checkpoint_path: {checkpoint_path}")
+
 # Calculate default parallelism
 try: default_parallelism = spark.sparkContext.defaultParallelism / 2 # Does not work with serverless
 except: default_parallelism = (4 * os.cpu_count()) - 1
@@ -71,91 +113,178 @@ print(f"Number of executors: {default_parallelism}")
 # COMMAND ----------
 
 # DBTITLE 1,Get Sample Data (Multi-Threaded)
-def get_sample_data(catalog: str, limit: int, schema: str = None, table: str = None, max_workers: int = 8, max_cell_chars: int = 1000) -> dict:
+def fetch_table_sample(table_catalog: str, table_schema: str, table_name: str, limit: int, max_cell_chars: int = 1000) -> list:
     """
-    Fetch sample rows from one or more tables within a catalog (and optionally schema/table),
-    using multi-threading for faster parallel execution.
-    Truncates only *individual column values* that exceed a safe character limit to prevent
-    oversized AI prompts (e.g., large array or JSON string columns).
+    Fetch sample rows from a single table.
+    Each individual column value is truncated if it exceeds `max_cell_chars`.
     Args:
-        catalog (str): The catalog name to query.
-        limit (int): Maximum number of rows to fetch from each table.
-        schema (str, optional): Restrict search to a single schema if provided.
-        table (str, optional): Restrict search to a single table if provided.
-        max_workers (int, optional): Number of threads for parallel fetching. Default = 8.
-        max_cell_chars (int, optional): Maximum number of characters allowed per cell value. 
-            Default = 1000. Long individual cell values are truncated to this length 
-            to avoid exceeding AI model token limits.
+        table_catalog (str): Catalog of the table.
+        table_schema (str): Schema of the table.
+        table_name (str): Name of the table.
+        limit (int): Maximum number of rows to fetch.
+        max_cell_chars (int, optional): Maximum number of characters allowed per cell value. Default = 1000.
     Returns:
-        dict: Dictionary keyed by (catalog, schema, table) with values as:
-              - List of row dictionaries containing truncated sample data if successful.
-              - List with a single {"error": "..."} dictionary if data retrieval failed.
-    """
-
-    sample_data = {}
-    query = f"""
-        SELECT table_catalog, table_schema, table_name
-        FROM system.information_schema.tables
-        WHERE table_catalog = :catalog
+        list: Row dictionaries containing truncated sample data if successful,
+              or a single {"error": "..."} dictionary if data retrieval failed.
     """
-    if schema:
-        query += " AND table_schema = :schema"
-        if table:
-            query += " AND table_name = :table"
-
-    tables = spark.sql(
-        query,
-        args={"catalog": catalog, "schema": schema, "table": table}
-    ).collect()
-
-    # ------------------------------------------------------------------
-    # Worker function to fetch data for a single table.
-    # Each individual column value is truncated if it exceeds `max_cell_chars`.
-    # ------------------------------------------------------------------
-    def fetch_table_data(t):
-        full_table_name = f"{t.table_catalog}.{t.table_schema}.{t.table_name}"
-        data_query = f"SELECT * FROM {full_table_name} LIMIT {limit}"
-
-        try:
-            rows_raw = [row.asDict(recursive=True) for row in spark.sql(data_query).collect()]
-            rows_clean = []
-
-            for row_dict in rows_raw:
-                clean_row = {}
-                for col, val in row_dict.items():
-                    if val is None:
-                        clean_row[col] = None
+    full_table_name = f"{table_catalog}.{table_schema}.{table_name}"
+    data_query = f"SELECT * FROM {full_table_name} LIMIT {limit}"
+
+    try:
+        rows_raw = [row.asDict(recursive=True) for row in spark.sql(data_query).collect()]
+        rows_clean = []
+
+        for row_dict in rows_raw:
+            clean_row = {}
+            for col, val in row_dict.items():
+                if val is None:
+                    clean_row[col] = None
+                else:
+                    val_str = str(val)
+                    # Truncate overly long individual column values only
+                    if len(val_str) > max_cell_chars:
+                        clean_row[col] = val_str[:max_cell_chars] + " ...[truncated]"
                     else:
-                        val_str = str(val)
-                        # Truncate overly long individual column values only
-                        if len(val_str) > max_cell_chars:
-                            clean_row[col] = val_str[:max_cell_chars] + " ...[truncated]"
-                        else:
-                            clean_row[col] = val_str
-                rows_clean.append(clean_row)
-
-            return (t.table_catalog, t.table_schema, t.table_name), rows_clean
+                        clean_row[col] = val_str
+            rows_clean.append(clean_row)
 
-        except Exception as e:
-            # Handle query or permission errors gracefully
-            return (t.table_catalog, t.table_schema, t.table_name), [{"error": str(e)}]
+        return rows_clean
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_table = {executor.submit(fetch_table_data, t): t for t in tables}
-        for future in as_completed(future_to_table):
-            key, rows = future.result()
-            sample_data[key] = rows
+    except Exception as e:
+        # Handle query or permission errors gracefully
+        return [{"error": str(e)}]
 
-    return sample_data
 
+class SampleCache:
+    """
+    Lazily populated, size-bounded LRU cache of table sample rows.
+    Samples are fetched the first time a table is requested, and the next `prefetch_ahead` tables
+    of the work queue are fetched in the background so they are ready when their columns come up.
+    At most `max_tables` tables are kept; the least recently used finished entries are evicted, except
+    prefetched tables that have not been requested yet (they are still ahead in the work queue).
+    Behaves like the dict keyed by (catalog, schema, table) that describe_single_column expects.
+    Args:
+        limit (int): Maximum number of rows to fetch from each table.
+        max_cell_chars (int, optional): Maximum number of characters allowed per cell value. Default = 1000.
+        max_tables (int, optional): Maximum number of tables kept in the cache. Default = 64.
+        prefetch_ahead (int, optional): Number of upcoming work queue tables to prefetch. Default = 4.
+        max_workers (int, optional): Number of threads fetching samples. Default = 4.
+    """
 
-# Get table metadata with a few sample rows based on data_limit and max cell chars.
-# sample_data = get_sample_data(catalog="gdp_stage", limit=3, schema="allocation", table=table, max_workers=default_parallelism, max_cell_chars=max_cell_chars)
-# print(sample_data)
+    def __init__(self, limit: int, max_cell_chars: int = 1000, max_tables: int = 64, prefetch_ahead: int = 4, max_workers: int = 4):
+        self.limit = limit
+        self.max_cell_chars = max_cell_chars
+        self.max_tables = max(max_tables, 1)
+        self.prefetch_ahead = prefetch_ahead
+        self.executor = ThreadPoolExecutor(max_workers=max(int(max_workers), 1))
+        self.entries = OrderedDict()  # (catalog, schema, table) -> Future of sample rows, least recently used first
+        self.work_queue = []
+        self.queue_position = {}
+        self.prefetched = set()  # Prefetched keys not requested yet (still ahead in the work queue, never evicted)
+        self.lock = threading.Lock()
+        self.fetches = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def set_work_queue(self, keys) -> None:
+        """Set the order in which tables will be requested (duplicates are ignored)."""
+        with self.lock:
+            self.work_queue = list(dict.fromkeys(keys))
+            self.queue_position = {key: i for i, key in enumerate(self.work_queue)}
+
+    def submit(self, key: tuple, prefetch: bool = False):
+        """Start fetching a table's samples (caller holds the lock)."""
+        future = self.executor.submit(fetch_table_sample, *key, self.limit, self.max_cell_chars)
+        self.entries[key] = future
+        self.fetches += 1
+        if prefetch:
+            self.prefetched.add(key)
+        # Evict least recently used entries beyond max_tables (fetches still in flight and
+        # prefetched tables that have not been requested yet are kept)
+        for old_key in list(self.entries):
+            if len(self.entries) <= self.max_tables:
+                break
+            if self.entries[old_key].done() and old_key not in self.prefetched:
+                del self.entries[old_key]
+                self.evictions += 1
+        return future
+
+    def get(self, key: tuple, default=None) -> list:
+        """Sample rows for a table, fetched on first use; also prefetches the next tables in the work queue."""
+        with self.lock:
+            self.prefetched.discard(key)
+            future = self.entries.get(key)
+            if future is None:
+                future = self.submit(key)
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+
+            position = self.queue_position.get(key)
+            if position is not None:
+                for next_key in self.work_queue[position + 1:position + 1 + self.prefetch_ahead]:
+                    if next_key not in self.entries:
+                        self.submit(next_key, prefetch=True)
+
+        rows = future.result()
+        return rows if rows is not None else default
+
+    def get_summary(self) -> dict:
+        with self.lock:
+            return {"fetches": self.fetches, "hits": self.hits, "evictions": self.evictions, "cached_tables": len(self.entries)}
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+# Get sample rows for a single table on demand.
+# sample_cache = SampleCache(limit=3, max_cell_chars=max_cell_chars, max_tables=sample_cache_tables, prefetch_ahead=sample_prefetch_ahead)
+# print(sample_cache.get(("gdp_stage", "allocation", table)))
 
 # COMMAND ----------
 
 # DBTITLE 1,Get Column Comments (Multi-Threaded)
+# Column description prompt shared by the batch and streaming modes. Positional arguments:
+# prompt_return_length, column_name, table_name, table_schema, table_catalog, data_type, sample_text
+COLUMN_PROMPT_TEMPLATE = (
+    'This description will be stored as a Unity Catalog table column comment. '
+    'Write a detailed, single-sentence description of approximately %s words '
+    'for the column "%s" from the table "%s" in schema "%s" '
+    'within catalog "%s". '
+    'This description should clearly explain what kind of information the column contains and its purpose. '
+    'The column data type is "%s". '
+    'Use the following sample rows for context: %s. '
+    'Keep the description professional and concise, suitable for a data dictionary. '
+    'Do not mention schema or catalog names in the output.'
+)
+
+
+def get_column_metadata_query(schema: str = None, table: str = None) -> str:
+    """
+    Build the information_schema.columns query for a catalog (and optionally schema/table).
+    Args:
+        schema (str, optional): Restrict to a single schema if provided.
+        table (str, optional): Restrict to a single table if provided.
+    Returns:
+        str: Parameterized SQL query (uses :catalog, :schema and :table).
+    """
+    query = f"""
+      SELECT c.table_catalog, c.table_schema, c.table_name, c.column_name, c.data_type,
+             c.ordinal_position,
+             c.comment IS NULL or length(c.comment) == 0 AS replace_comment,
+             c.comment AS existing_comment
+      FROM system.information_schema.columns AS c
+      JOIN system.information_schema.tables AS t 
+           USING (table_catalog, table_schema, table_name)
+      WHERE c.table_catalog = :catalog
+    """
+    if schema:
+        query += " AND c.table_schema = :schema"
+        if table:
+            query += " AND c.table_name = :table"
+    return query
+
+
 def describe_single_column(col: Row, samples: dict, endpoint_name: str, replace_comment: bool, prompt_return_length: int) -> Row:
     """
     Generate an AI-assisted description for a single column.
@@ -163,8 +292,8 @@ def describe_single_column(col: Row, samples: dict, endpoint_name: str, replace_
         col (Row): A Spark Row containing column metadata from information_schema.columns,
                    including table_catalog, table_schema, table_name, column_name, data_type,
                    ordinal_position, and existing_comment.
-        samples (dict): Dictionary keyed by (catalog, schema, table) with lists of sample rows
-                        (from get_sample_data). Used to provide context for column description.
+        samples (SampleCache): Sample rows keyed by (catalog, schema, table) (a SampleCache or
+                               a plain dict). Used to provide context for column description.
         endpoint_name (str): The registered AI endpoint name used for generating the description
                              via the ai_query function.
         replace_comment: Whether to replace the existing comment with the new one.
@@ -198,16 +327,9 @@ def describe_single_column(col: Row, samples: dict, endpoint_name: str, replace_
     sample_rows = samples.get(key, [])
     sample_text = str(sample_rows[:3])  # Use only first 3 rows for brevity
 
-    prompt = (
-        f'This description will be stored as a Unity Catalog table column comment. '
-        f'Write a detailed, single-sentence description of approximately {prompt_return_length} words '
-        f'for the column "{col.column_name}" from the table "{col.table_name}" in schema "{col.table_schema}" '
-        f'within catalog "{col.table_catalog}". '
-        f'This description should clearly explain what kind of information the column contains and its purpose. '
-        f'The column data type is "{col.data_type}". '
-        f'Use the following sample rows for context: {sample_text}. '
-        f'Keep the description professional and concise, suitable for a data dictionary. '
-        f'Do not mention schema or catalog names in the output.'
+    prompt = COLUMN_PROMPT_TEMPLATE % (
+        prompt_return_length, col.column_name, col.table_name, col.table_schema,
+        col.table_catalog, col.data_type, sample_text
     )
     ai_sql = f"SELECT ai_query('{endpoint_name}', :prompt) AS new_comment"
     new_comment = spark.sql(ai_sql, args={"prompt": prompt}).collect()[0].new_comment
@@ -230,15 +352,17 @@ def describe_single_column(col: Row, samples: dict, endpoint_name: str, replace_
 def get_column_comments(
     catalog: str, limit: int, schema: str = None, 
     table: str = None, max_workers: int = 8, replace_comment: bool = False, 
-    prompt_return_length: int = 40, max_cell_chars: int = 1000
+    prompt_return_length: int = 40, max_cell_chars: int = 1000,
+    sample_cache_tables: int = 64, sample_prefetch_ahead: int = 4
 ) -> DataFrame:
     """
     Generate AI-assisted column descriptions for all columns in a catalog/schema/table.
     This function:
-      1. Fetches sample rows per table (via get_sample_data).
-      2. Retrieves column metadata from information_schema.columns.
+      1. Retrieves column metadata from information_schema.columns.
+      2. Creates a SampleCache that fetches sample rows per table on demand, prefetching
+         the next tables in column order (generation starts without waiting for all samples).
       3. Uses multi-threading to generate column descriptions in parallel
-         by calling `_describe_column` for each column.
+         by calling `describe_single_column` for each column.
       4. Returns a Spark DataFrame with both metadata and AI-generated descriptions.
     Args:
         catalog (str): The catalog name to scan for tables/columns.
@@ -248,6 +372,8 @@ def get_column_comments(
         max_workers (int, optional): Number of threads for parallel execution. Defaults to 8.
         prompt_return_length (int): Maximum number of words in the AI-generated description.
         max_cell_chars (int): Maximum number of characters in each cell of the sample rows.
+        sample_cache_tables (int, optional): Maximum number of tables kept in the sample cache. Defaults to 64.
+        sample_prefetch_ahead (int, optional): Number of upcoming tables to prefetch samples for. Defaults to 4.
     Returns:
         DataFrame: A Spark DataFrame with the following schema:
             - table_catalog (str)
@@ -259,34 +385,29 @@ def get_column_comments(
             - replace_comment (bool)
             - new_comment (str)
     """
-    # Step 1: get sample rows
-    samples = get_sample_data(catalog, limit, schema, table, max_workers, max_cell_chars)
-
-    # Step 2: get column metadata
-    query = f"""
-      SELECT c.table_catalog, c.table_schema, c.table_name, c.column_name, c.data_type,
-             c.ordinal_position,
-             c.comment IS NULL or length(c.comment) == 0 AS replace_comment,
-             c.comment AS existing_comment
-      FROM system.information_schema.columns AS c
-      JOIN system.information_schema.tables AS t 
-           USING (table_catalog, table_schema, table_name)
-      WHERE c.table_catalog = :catalog
-    """
-    if schema:
-        query += " AND c.table_schema = :schema"
-        if table:
-            query += " AND c.table_name = :table"
+    # Step 1: get column metadata
+    query = get_column_metadata_query(schema, table)
     query += " ORDER BY c.table_catalog, c.table_schema, c.table_name, c.ordinal_position"
 
     columns = spark.sql(query, args={"catalog": catalog, "schema": schema, "table": table}).collect()
 
+    # Step 2: On-demand sample cache following the table order of the columns to describe
+    samples = SampleCache(limit, max_cell_chars, max_tables=sample_cache_tables,
+                          prefetch_ahead=sample_prefetch_ahead, max_workers=min(int(max_workers), sample_prefetch_ahead + 1))
+    samples.set_work_queue(
+        (col.table_catalog, col.table_schema, col.table_name) for col in columns if replace_comment or col.replace_comment
+    )
+
     # Step 3: Parallelize description calls
     rows_out = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(describe_single_column, col, samples, endpoint_name, replace_comment, prompt_return_length) for col in columns]
-        for f in as_completed(futures):
-            rows_out.append(f.result())
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(describe_single_column, col, samples, endpoint_name, replace_comment, prompt_return_length) for col in columns]
+            for f in as_completed(futures):
+                rows_out.append(f.result())
+    finally:
+        samples.close()
+    print(f"Sample cache: {samples.get_summary()}")
 
     # Step 4: Schema + DataFrame
     schema_out = StructType([
@@ -304,14 +425,246 @@ def get_column_comments(
 
 
 # Get Column Comments
-commented_columns = get_column_comments(
-    catalog, data_limit, schema,
-    table, max_workers=default_parallelism,
-    replace_comment=always_update,
-    prompt_return_length=prompt_return_length,
-    max_cell_chars=max_cell_chars
-)
-display(commented_columns)
+if generation_mode == "batch":
+    commented_columns = get_column_comments(
+        catalog, data_limit, schema,
+        table, max_workers=default_parallelism,
+        replace_comment=always_update,
+        prompt_return_length=prompt_return_length,
+        max_cell_chars=max_cell_chars,
+        sample_cache_tables=sample_cache_tables,
+        sample_prefetch_ahead=sample_prefetch_ahead
+    )
+    display(commented_columns)
+
+# COMMAND ----------
+
+# DBTITLE 1,Get Column Comments (Streaming)
+def get_snapshot_scope(catalog: str, schema: str = None, table: str = None) -> str:
+    """
+    Return the catalog/schema/table scope of a column snapshot as "catalog.schema.table" ('*' for all).
+    """
+    return f"{catalog}.{schema or '*'}.{table or '*'}"
+
+
+def get_work_table_scope(work_table: str) -> str:
+    """
+    Return the scope stored on an existing column snapshot work table (None if it does not exist or has none).
+    """
+    if not spark.catalog.tableExists(work_table):
+        return None
+    properties = {r["key"]: r["value"] for r in spark.sql(f"SHOW TBLPROPERTIES {work_table}").collect()}
+    return properties.get("column_snapshot.scope")
+
+
+def snapshot_column_metadata(catalog: str, work_table: str, schema: str = None, table: str = None, batch_size: int = 500) -> None:
+    """
+    Snapshot the information_schema column list into a Delta work table used as the streaming source.
+    Columns are written in table order with at most `batch_size` columns per file, so reading one
+    file per trigger keeps each micro-batch bounded and most tables within a single micro-batch.
+    The catalog/schema/table scope is stored as the 'column_snapshot.scope' table property.
+    Args:
+        catalog (str): The catalog name to scan for tables/columns.
+        work_table (str): Fully-qualified Delta table name for the snapshot.
+        schema (str, optional): Restrict to a single schema.
+        table (str, optional): Restrict to a single table.
+        batch_size (int, optional): Maximum number of columns per file (micro-batch). Default = 500.
+    Returns: None
+    """
+    (
+        spark.sql(get_column_metadata_query(schema, table), args={"catalog": catalog, "schema": schema, "table": table})
+        .orderBy("table_catalog", "table_schema", "table_name", "ordinal_position")
+        .write
+        .format("delta")
+        .mode("overwrite")
+        .option("overwriteSchema", "true")
+        .option("maxRecordsPerFile", batch_size)
+        .saveAsTable(work_table)
+    )
+    scope = get_snapshot_scope(catalog, schema, table).replace("'", "\\'")
+    spark.sql(f"ALTER TABLE {work_table} SET TBLPROPERTIES ('column_snapshot.scope' = '{scope}')")
+
+
+def describe_column_batch(
+    batch_df: DataFrame, output_table: str, endpoint_name: str, replace_comment: bool,
+    limit: int, prompt_return_length: int = 40, max_workers: int = 8, max_cell_chars: int = 1000
+) -> None:
+    """
+    Generate column descriptions for one micro-batch with a single set-based ai_query and
+    MERGE them into the output Delta table. The MERGE is keyed by column, so a micro-batch
+    replayed after a failure overwrites its own rows instead of duplicating them.
+    ai_query runs with failOnError => false so one failed model call does not fail the batch;
+    failed columns are reported and left out of the MERGE (rerun with a refreshed snapshot to retry them).
+    Args:
+        batch_df (DataFrame): Micro-batch of rows from the column snapshot.
+        output_table (str): Fully-qualified Delta table receiving the generated comments.
+        endpoint_name (str): The model serving endpoint used by ai_query.
+        replace_comment (bool): Whether to replace existing comments.
+        limit (int): Number of sample rows per table to include for description context.
+        prompt_return_length (int): Maximum number of words in the AI-generated description.
+        max_workers (int, optional): Number of threads for fetching table samples. Default = 8.
+        max_cell_chars (int): Maximum number of characters in each cell of the sample rows.
+    Returns: None
+    """
+    batch_spark = batch_df.sparkSession
+    keys = ["table_catalog", "table_schema", "table_name"]
+    should_generate = F.lit(replace_comment) | F.col("replace_comment")
+    to_describe = batch_df.filter(should_generate)
+    skipped = batch_df.filter(~should_generate)
+
+    # Sample rows only for the tables in this micro-batch (driver memory stays bounded by the batch size)
+    tables = to_describe.select(*keys).distinct().collect()
+    sample_rows = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_table_sample, *t, limit, max_cell_chars): t for t in tables}
+        for f in as_completed(futures):
+            sample_rows.append((*futures[f], str(f.result()[:3])))  # Use only first 3 rows for brevity
+    samples_df = batch_spark.createDataFrame(
+        sample_rows, schema="table_catalog string, table_schema string, table_name string, sample_text string"
+    )
+
+    described = (
+        to_describe
+        .join(F.broadcast(samples_df), on=keys, how="left")
+        .withColumn("prompt", F.format_string(
+            COLUMN_PROMPT_TEMPLATE, F.lit(prompt_return_length), F.col("column_name"), F.col("table_name"),
+            F.col("table_schema"), F.col("table_catalog"), F.col("data_type"), F.coalesce(F.col("sample_text"), F.lit("[]"))
+        ))
+        .repartition(max(int(max_workers), 1))  # Spread the model calls across tasks
+        .withColumn("ai_response", F.expr(f"ai_query('{endpoint_name}', prompt, failOnError => false)"))
+        .withColumn("new_comment", F.col("ai_response.result"))
+        .withColumn("error_message", F.when(
+            F.col("ai_response.errorMessage").isNull() & (F.col("new_comment").isNull() | (F.trim(F.col("new_comment")) == "")),
+            F.lit("ai_query returned an empty description")
+        ).otherwise(F.col("ai_response.errorMessage")))
+        .withColumn("replace_comment", F.lit(True))
+        .drop("ai_response")
+        .persist()  # Evaluate ai_query once for both the error report and the MERGE
+    )
+    failed = described.filter(F.col("error_message").isNotNull())
+    failed_count = failed.count()
+    if failed_count > 0:
+        print(f"{failed_count} column description(s) failed in this micro-batch and were not merged:")
+        for row in failed.select(*keys, "column_name", "error_message").limit(10).collect():
+            print(f"  {row.table_catalog}.{row.table_schema}.{row.table_name}.{row.column_name}: {row.error_message}")
+
+    results = (
+        described
+        .filter(F.col("error_message").isNull())
+        .unionByName(skipped.withColumn("new_comment", F.lit(None).cast("string")).withColumn("replace_comment", F.lit(False)), allowMissingColumns=True)
+        .select(*keys, "column_name", "ordinal_position", "existing_comment", "replace_comment", "new_comment")
+        .withColumn("generated_at", F.current_timestamp())
+    )
+
+    batch_spark.sql(f"""
+        MERGE INTO {output_table} AS t
+        USING {{source}} AS s
+        ON t.table_catalog = s.table_catalog AND t.table_schema = s.table_schema
+           AND t.table_name = s.table_name AND t.column_name = s.column_name
+        WHEN MATCHED THEN UPDATE SET *
+        WHEN NOT MATCHED THEN INSERT *
+    """, source=results)
+    described.unpersist()
+
+
+def get_column_comments_streaming(
+    catalog: str, limit: int, work_table: str, output_table: str, checkpoint_path: str,
+    schema: str = None, table: str = None, max_workers: int = 8, replace_comment: bool = False,
+    prompt_return_length: int = 40, max_cell_chars: int = 1000, batch_size: int = 500, refresh: bool = False
+) -> DataFrame:
+    """
+    Generate AI-assisted column descriptions as a restartable stream.
+    This function:
+      1. Snapshots the column metadata into a Delta work table (first run, refresh, or a different
+         catalog/schema/table than the existing snapshot).
+      2. Streams the snapshot one file (at most `batch_size` columns) per micro-batch.
+      3. Describes each micro-batch with set-based ai_query (via describe_column_batch)
+         and MERGEs the results into the output Delta table.
+      4. Returns the output table filtered to the requested catalog/schema/table.
+    Progress is tracked in the checkpoint, so a rerun after a failure resumes from the last
+    committed micro-batch instead of starting over.
+    Args:
+        catalog (str): The catalog name to scan for tables/columns.
+        limit (int): Number of sample rows per table to include for description context.
+        work_table (str): Fully-qualified Delta table for the column snapshot (streaming source).
+        output_table (str): Fully-qualified Delta table for the generated comments.
+        checkpoint_path (str): Streaming checkpoint location.
+        schema (str, optional): Restrict to a single schema.
+        table (str, optional): Restrict to a single table.
+        max_workers (int, optional): Number of sample threads and ai_query tasks per micro-batch. Defaults to 8.
+        replace_comment (bool): Whether to replace existing comments.
+        prompt_return_length (int): Maximum number of words in the AI-generated description.
+        max_cell_chars (int): Maximum number of characters in each cell of the sample rows.
+        batch_size (int, optional): Maximum number of columns per micro-batch. Defaults to 500.
+        refresh (bool, optional): Re-snapshot the column list and restart the stream. Defaults to False.
+            A snapshot taken for a different catalog/schema/table is always replaced.
+    Returns:
+        DataFrame: The output table rows for the requested scope (same columns as get_column_comments).
+    """
+    if not work_table or not output_table:
+        raise ValueError("Streaming mode requires both 'Streaming Work Table' and 'Streaming Output Table'.")
+
+    # Step 1: Snapshot the column list (a new snapshot invalidates the old checkpoint)
+    snapshot_scope = get_work_table_scope(work_table)
+    if refresh or snapshot_scope != get_snapshot_scope(catalog, schema, table):
+        if snapshot_scope is not None and not refresh:
+            print(f"work table {work_table} holds a snapshot of {snapshot_scope}, taking a new snapshot....")
+        dbutils.fs.rm(checkpoint_path, True)
+        snapshot_column_metadata(catalog, work_table, schema, table, batch_size)
+
+    spark.sql(f"""
+        CREATE TABLE IF NOT EXISTS {output_table} (
+            table_catalog STRING,
+            table_schema STRING,
+            table_name STRING,
+            column_name STRING,
+            ordinal_position INT,
+            existing_comment STRING,
+            replace_comment BOOLEAN,
+            new_comment STRING,
+            generated_at TIMESTAMP
+        ) USING DELTA
+    """)
+
+    # Step 2 + 3: Process the snapshot in bounded micro-batches until it is fully consumed
+    query = (
+        spark.readStream
+        .format("delta")
+        .option("maxFilesPerTrigger", 1)
+        .table(work_table)
+        .writeStream
+        .foreachBatch(lambda batch_df, batch_id: describe_column_batch(
+            batch_df, output_table, endpoint_name, replace_comment, limit,
+            prompt_return_length, max_workers, max_cell_chars
+        ))
+        .option("checkpointLocation", checkpoint_path)
+        .trigger(availableNow=True)
+        .start()
+    )
+    query.awaitTermination()
+
+    # Step 4: Read back the committed results
+    df_out = spark.table(output_table).filter(F.col("table_catalog") == catalog)
+    if schema:
+        df_out = df_out.filter(F.col("table_schema") == schema)
+        if table:
+            df_out = df_out.filter(F.col("table_name") == table)
+    return df_out.drop("generated_at")
+
+
+# Get Column Comments
+if generation_mode == "streaming":
+    commented_columns = get_column_comments_streaming(
+        catalog, data_limit, streaming_work_table,
+        streaming_output_table, checkpoint_path,
+        schema, table, max_workers=default_parallelism,
+        replace_comment=always_update,
+        prompt_return_length=prompt_return_length,
+        max_cell_chars=max_cell_chars,
+        batch_size=streaming_batch_size,
+        refresh=streaming_refresh
+    )
+    display(commented_columns)
 
 # COMMAND ----------
 
@@ -407,4 +760,21 @@ display(commented_columns_updated)
     .option("header", "true")
     .format(output_file_format)
     .save(output_path + f"/{output_file_format}")
-)
\ No newline at end of file
+)
+
+# COMMAND ----------
+
+# DBTITLE 1,Write Column Comment User Updates to Streaming Output Table
+# Step 2 can read the streaming output table directly ("Input Table"), so the manual updates
+# applied above are merged back into it (only the comment columns are updated)
+if generation_mode == "streaming":
+    updated_keys = ["table_catalog", "table_schema", "table_name", "column_name"]
+    spark.sql(f"""
+        MERGE INTO {streaming_output_table} AS t
+        USING {{source}} AS s
+        ON t.table_catalog = s.table_catalog AND t.table_schema = s.table_schema
+           AND t.table_name = s.table_name AND t.column_name = s.column_name
+        WHEN MATCHED AND (t.new_comment IS DISTINCT FROM s.new_comment OR t.replace_comment IS DISTINCT FROM s.replace_comment)
+        THEN UPDATE SET t.new_comment = s.new_comment, t.replace_comment = s.replace_comment, t.generated_at = current_timestamp()
+    """, source=commented_columns_updated.select(*updated_keys, "new_comment", "replace_comment").dropDuplicates(updated_keys))
+    print(f"column comment updates merged into {streaming_output_table}....")
\ No newline at end of file
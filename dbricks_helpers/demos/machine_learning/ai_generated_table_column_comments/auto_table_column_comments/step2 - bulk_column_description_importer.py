@@ -10,6 +10,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # DBTITLE 1,Setup Databricks Widgets
 dbutils.widgets.text("Input Path", "", "Enter Base Volumes Path (Mandatory):")
+dbutils.widgets.text("Input Table", "", "Streaming Output Table (Optional):")
+dbutils.widgets.text("Catalog", "", "Enter Catalog Name (Input Table):")
+dbutils.widgets.text("Schema", "", "Enter Schema Name (Input Table, Optional):")
+dbutils.widgets.text("Table", "", "Enter Table Name (Input Table, Optional):")
 
 # COMMAND ----------
 
@@ -20,6 +24,18 @@ print(f"output_path: {output_path}")
 output_file_format = "json" # or csv
 print(f"output_file_format: {output_file_format}")
 
+# Delta table written by the step 1 streaming mode (read instead of the UC Volume files when set)
+input_table = dbutils.widgets.get("Input Table")
+print(f"input_table: {input_table}")
+
+# Scope of the step 1 run to import from the input table (the table keeps rows from earlier runs)
+catalog = dbutils.widgets.get("Catalog")
+print(f"catalog: {catalog}")
+schema = dbutils.widgets.get("Schema")
+print(f"schema: {schema}")
+table = dbutils.widgets.get("Table")
+print(f"table: {table}")
+
 # Calculate default parallelism
 try: default_parallelism = spark.sparkContext.defaultParallelism / 2 # Does not work with serverless
 except: default_parallelism = (4 * os.cpu_count()) - 1
@@ -28,13 +44,23 @@ print(f"Number of executors: {default_parallelism}")
 # COMMAND ----------
 
 # DBTITLE 1,Read Locally Written AI Generated Column Comments
-commented_columns = (
-    spark.read
-    .format(output_file_format)
-    .option("header", "true")
-    .option("inferSchema", "true")
-    .load(output_path + f"/{output_file_format}")
-).filter(F.col("replace_comment") == True) # This is set in the step 1 generator notebook
+if input_table:
+    if not catalog:
+        raise ValueError("Reading from 'Input Table' requires 'Catalog' (and optionally 'Schema'/'Table') of the step 1 run.")
+    commented_columns = spark.table(input_table).filter(F.col("table_catalog") == catalog)
+    if schema:
+        commented_columns = commented_columns.filter(F.col("table_schema") == schema)
+        if table:
+            commented_columns = commented_columns.filter(F.col("table_name") == table)
+else:
+    commented_columns = (
+        spark.read
+        .format(output_file_format)
+        .option("header", "true")
+        .option("inferSchema", "true")
+        .load(output_path + f"/{output_file_format}")
+    )
+commented_columns = commented_columns.filter(F.col("replace_comment") == True) # This is set in the step 1 generator notebook
 display(commented_columns)
 
 # COMMAND ----------
@@ -0,0 +1,44 @@
+# Databricks notebook source
+# DBTITLE 1,Library Imports
+import os, time
+
+# COMMAND ----------
+
+# DBTITLE 1,Get Requirements Install Marker Function
+# MAGIC %run "./requirements_marker"
+
+# COMMAND ----------
+
+# DBTITLE 1,Benchmark Parameters
+# notebook that every notebook chain goes through (libraries -> general_functions -> azure -> config)
+config_notebook_path = "./config"
+# number of warm runs after the cold run
+warm_runs = 3
+
+# requirements install marker (the same marker libraries.py writes after a successful install)
+requirementspath = os.getcwd() + "/requirements.txt"
+requirementsmarker = get_requirements_marker(requirementspath)
+print(f"requirementsmarker: {requirementsmarker}")
+
+# COMMAND ----------
+
+# DBTITLE 1,Benchmark Notebook Startup Time (Cold vs Install-Once)
+def time_notebook_run(notebook_path = None, timeout_seconds = 0):
+    """run a notebook in its own context and return the wall time in seconds"""
+    start_time = time.time()
+    dbutils.notebook.run(notebook_path, timeout_seconds)
+    return time.time() - start_time
+
+
+# cold start: remove the marker so the requirements are pip installed like before
+if os.path.exists(requirementsmarker): os.remove(requirementsmarker)
+cold_seconds = time_notebook_run(config_notebook_path)
+print(f"cold start (pip install): {cold_seconds:.1f} seconds")
+
+# warm starts: the marker exists so the pip install is skipped
+warm_seconds = [time_notebook_run(config_notebook_path) for run in range(warm_runs)]
+for run, seconds in enumerate(warm_seconds, 1):
+    print(f"warm start {run} (install skipped): {seconds:.1f} seconds")
+
+average_warm_seconds = sum(warm_seconds) / len(warm_seconds)
+print(f"\nnotebook startup time dropped from {cold_seconds:.1f} to {average_warm_seconds:.1f} seconds ({(1 - average_warm_seconds / cold_seconds) * 100:.0f}% faster)")
@@ -0,0 +1,64 @@
+# Databricks notebook source
+# DBTITLE 1,Library Imports
+import time
+import pyspark.sql.functions as F
+from pyspark.sql.types import *
+
+# COMMAND ----------
+
+# DBTITLE 1,Import Generic Functions
+# MAGIC %run "./general_functions"
+
+# COMMAND ----------
+
+# DBTITLE 1,Build Synthetic Nested Schemas
+def build_nested_schema(leaf_fields = 1000, fields_per_struct = 10, depth = 3):
+    """
+    build a nested struct schema with roughly leaf_fields leaf columns
+    every struct has fields_per_struct fields and structs are nested depth levels deep
+    """
+    def build_struct(level, counter):
+        fields = []
+        for i in range(fields_per_struct):
+            if counter[0] >= leaf_fields: break
+            if level < depth and i % 2 == 0:
+                counter[1] += 1
+                fields.append(StructField(f"s{counter[1]}", build_struct(level + 1, counter), True))
+            else:
+                fields.append(StructField(f"f{counter[0]}", StringType(), True))
+                counter[0] += 1
+        return StructType(fields)
+
+    counter = [0, 0] # leaf fields, struct fields (names are unique so the one level flatten_df does not collide)
+    top_fields = []
+    while counter[0] < leaf_fields:
+        top_fields.append(StructField(f"payload_{len(top_fields)}", build_struct(1, counter), True))
+    return StructType(top_fields)
+
+# COMMAND ----------
+
+# DBTITLE 1,Benchmark Plan Analysis Time (flatten_df vs flatten_df_recursive)
+def flatten_df_all_levels(nested_df, prefix):
+    """call the one level flatten_df until no struct columns are left (previous approach)"""
+    while any([c[1][:6] == 'struct' for c in nested_df.dtypes]):
+        nested_df = flatten_df(nested_df, prefix)
+    return nested_df
+
+
+def time_plan_analysis(flatten_function, nested_df):
+    """time flattening a dataframe including analysis of the resulting plan (no data is read)"""
+    start_time = time.time()
+    flat_df = flatten_function(nested_df)
+    column_count = len(flat_df.columns) # forces analysis of the flattened plan
+    return time.time() - start_time, column_count
+
+
+benchmark_results = []
+for leaf_fields in [100, 1000, 5000]:
+    nested_df = spark.createDataFrame([], build_nested_schema(leaf_fields))
+    legacy_seconds, legacy_columns = time_plan_analysis(lambda df: flatten_df_all_levels(df, "p_"), nested_df)
+    recursive_seconds, recursive_columns = time_plan_analysis(lambda df: flatten_df_recursive(df, "p_"), nested_df)
+    benchmark_results.append((leaf_fields, legacy_columns, round(legacy_seconds, 2), recursive_columns, round(recursive_seconds, 2)))
+    print(f"leaf fields: {leaf_fields}; flatten_df: {legacy_seconds:.2f}s ({legacy_columns} cols); flatten_df_recursive: {recursive_seconds:.2f}s ({recursive_columns} cols)")
+
+display(spark.createDataFrame(benchmark_results, ["leaf_fields", "flatten_df_columns", "flatten_df_seconds", "flatten_df_recursive_columns", "flatten_df_recursive_seconds"]))
@@ -39,6 +39,7 @@ class Config:
         self.AZURE_STORAGE_ACCOUNT_KEY = str(os.getenv('AZURE_STORAGE_ACCOUNT_KEY'))
         self.AZURE_STORAGE_ACCOUNT_CONN = f'DefaultEndpointsProtocol=https;AccountName={self.AZURE_STORAGE_ACCOUNT_NAME};AccountKey={self.AZURE_STORAGE_ACCOUNT_KEY};EndpointSuffix=core.windows.net'
         self.AZURE_STORAGE_ACCOUNT_SAS_TOKEN = str('')
+        self.AZURE_STORAGE_INVENTORY_PATH = str(os.getenv('AZURE_STORAGE_INVENTORY_PATH'))
         self.format_config_vars()
         
 
@@ -51,9 +52,8 @@ class Config:
 
 
     def get_config_vars(self):
-        # get class configuration variables
-        config = Config()
-        return vars(config)
+        # get class configuration variables (a copy so overrides do not change the memoized config)
+        return dict(vars(self))
 
 
     def print_config_vars(self):
@@ -69,14 +69,16 @@ class Config:
 
 # DBTITLE 1,Variables Initialization
 
-# configuration class object
-config = Config()
+# configuration class object (built once per notebook session and reused by later %run calls)
+try: config_obj
+except NameError: config_obj = None
+if config_obj == None: config_obj = Config()
 # print configuration variables
-config.print_config_vars()
+config_obj.print_config_vars()
 
 
 # get configuration variables
-config = config.get_config_vars()
+config = config_obj.get_config_vars()
 
 
 # databricks instance address
@@ -95,5 +97,26 @@ print(f"databricks_migration_pat: {databricks_migration_pat}")
 # COMMAND ----------
 
 # DBTITLE 1,Class Objects Initialization
-# az storage account class object
-storage_account_obj = azurestorageaccount(config)
+# az storage class objects are built on first use so notebooks that never touch azure storage do not pay for them
+storage_account_obj, storage_inventory_obj, storage_account_async_obj = None, None, None
+
+
+def get_storage_account_obj():
+    """get the az storage account class object (built on first use)"""
+    global storage_account_obj
+    if storage_account_obj == None: storage_account_obj = azurestorageaccount(config)
+    return storage_account_obj
+
+
+def get_storage_inventory_obj():
+    """get the az storage account blob inventory class object (listing for very large containers, built on first use)"""
+    global storage_inventory_obj
+    if storage_inventory_obj == None: storage_inventory_obj = azurestorageinventory(dict(config))
+    return storage_inventory_obj
+
+
+def get_storage_account_async_obj():
+    """get the az storage account async class object (high concurrency listing, properties and downloads, built on first use)"""
+    global storage_account_async_obj
+    if storage_account_async_obj == None: storage_account_async_obj = azurestorageaccountasync(dict(config))
+    return storage_account_async_obj
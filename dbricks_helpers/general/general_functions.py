@@ -7,12 +7,117 @@ def str_to_md5_hash(inputstr = None):
 # COMMAND ----------
 
 # DBTITLE 1,Flatten Complex Nested Json
-def format_json_col_as_struct(df = None, payload_col = None):
+# inferred json schemas keyed by (source table, payload column, fingerprint)
+json_schema_cache = {}
+
+
+def get_json_key_paths(value = None, prefix = ()):
+    """
+    get the key paths (tuples of field names) in a parsed json value at any depth
+    arrays add no path level so keys of an array of objects share the array key path (same as the spark schema)
+    """
+    paths = set()
+    if isinstance(value, dict):
+        for key, child in value.items():
+            paths.add(prefix + (key,))
+            paths.update(get_json_key_paths(child, prefix + (key,)))
+    elif isinstance(value, list):
+        for child in value: paths.update(get_json_key_paths(child, prefix))
+    return paths
+
+
+def get_schema_key_paths(schema = None, prefix = ()):
+    """get the field paths (tuples of field names) in a spark struct schema at any depth, through arrays of structs"""
+    paths = set()
+    for field in schema.fields:
+        paths.add(prefix + (field.name,))
+        datatype = field.dataType
+        while isinstance(datatype, ArrayType): datatype = datatype.elementType
+        if isinstance(datatype, StructType): paths.update(get_schema_key_paths(datatype, prefix + (field.name,)))
+    return paths
+
+
+def get_json_keys_fingerprint(json_strings = None):
+    """
+    get the key paths seen in a list of json strings (nested keys included) and an md5 fingerprint of the sorted paths
+    return type is a tuple of (fingerprint, set of key paths)
+    """
+    paths = set()
+    for json_string in json_strings:
+        try: payload = json.loads(json_string)
+        except: continue
+        if isinstance(payload, dict): paths.update(get_json_key_paths(payload))
+    return hashlib.md5(json.dumps(sorted(paths)).encode()).hexdigest(), paths
+
+
+def infer_json_schema(json_strings = None):
+    """infer a spark struct schema from a (small) list of json strings"""
+    return spark.read.json(spark.sparkContext.parallelize(json_strings)).schema
+
+
+def get_json_object_keys_col(payload_col = None):
+    """
+    get the top level keys of a json string column as an array column
+    json_object_keys needs spark 3.5 or later, older versions parse the json as a map and take its keys
+    """
+    if tuple(int(part) for part in re.findall(r"\d+", spark.version)[:2]) >= (3, 5):
+        return F.json_object_keys(F.col(payload_col))
+    return F.map_keys(F.from_json(F.col(payload_col), "map<string,string>"))
+
+
+def get_json_sample(df = None, payload_col = None, sample_limit = None, sample_fraction = None, seed = 42):
+    """
+    get at most sample_limit non null json strings drawn at random (seeded) from a json string column
+    rows are drawn with sample(fraction) then limit instead of a full sort on a random column,
+    without a sample_fraction the fraction is estimated from the row count (twice sample_limit rows on average)
+    return type is a list of json strings
+    """
+    payload_df = df.select(payload_col).where(F.col(payload_col).isNotNull())
+    if sample_fraction == None:
+        sample_fraction = min(1.0, 2.0 * sample_limit / max(payload_df.count(), 1))
+    if sample_fraction < 1.0: payload_df = payload_df.sample(fraction = sample_fraction, seed = seed)
+    return [row[0] for row in payload_df.limit(sample_limit).collect()]
+
+
+def format_json_col_as_struct(df = None, payload_col = None, sample_limit = None, sample_fraction = None, source_table = None, fingerprint = None, check_unknown_fields = False, seed = 42):
     """
     format spark json string column as a struct
+    by default the schema is inferred from the whole column (one extra pass over the data)
+    when sample_limit is set the schema is inferred from at most sample_limit rows drawn at random
+    (seeded, from a sample_fraction of the rows) and cached by (source_table, payload_col, fingerprint)
+    with a fingerprint the cache is checked before any rows are sampled, a cached schema is used as is
+    without one the fingerprint is a hash of the key paths (nested keys included) in the sample so a new key set is a cache miss,
+    and a cached schema missing any sampled key path is re-inferred instead of dropping the field
+    check_unknown_fields = True also scans the column for top level keys missing from the schema and re-infers
     return type is a spark dataframe with json string columns formatted as a struct
     """
-    json_schema = spark.read.json(df.rdd.map(lambda row: row[payload_col])).schema
+    if sample_limit == None:
+        json_schema = spark.read.json(df.rdd.map(lambda row: row[payload_col])).schema
+        return df.withColumn(payload_col, F.from_json(F.col(payload_col), json_schema))
+
+    cache_key = (source_table, payload_col, fingerprint) if fingerprint != None else None
+    json_schema = json_schema_cache.get(cache_key) if cache_key != None else None
+    sample = None
+    if json_schema == None:
+        # random rows instead of the first rows (limit alone reads the first files, which tend to share one shape)
+        sample = get_json_sample(df, payload_col, sample_limit, sample_fraction, seed)
+        sample_fingerprint, sample_paths = get_json_keys_fingerprint(sample)
+        if cache_key == None: cache_key = (source_table, payload_col, sample_fingerprint)
+        json_schema = json_schema_cache.get(cache_key)
+        if json_schema == None or not sample_paths.issubset(get_schema_key_paths(json_schema)):
+            json_schema = infer_json_schema(sample)
+
+    if check_unknown_fields:
+        known_keys = json_schema.fieldNames()
+        unknown_rows = [row[0] for row in (df
+            .where(F.exists(get_json_object_keys_col(payload_col), lambda key: ~key.isin(known_keys)))
+            .select(payload_col).limit(sample_limit).collect())]
+        if unknown_rows:
+            print(f"unknown json fields found in '{payload_col}', re-inferring the schema....")
+            if sample == None: sample = get_json_sample(df, payload_col, sample_limit, sample_fraction, seed)
+            json_schema = infer_json_schema(sample + unknown_rows)
+
+    json_schema_cache[cache_key] = json_schema
     df = df.withColumn(payload_col, F.from_json(F.col(payload_col), json_schema))
     return df
 
@@ -30,6 +135,57 @@ def flatten_df(nested_df, prefix):
                                 for c in nested_df.select(nc + '.*').columns])
     return flat_df
 
+
+def quote_col_path(path):
+    """quote a nested column path (list of field names) for use in F.col()"""
+    return ".".join(["`" + name.replace("`", "``") + "`" for name in path])
+
+
+def flatten_df_recursive(nested_df, prefix = "", separator = "_", explode_arrays = False):
+    """
+    flatten nested json struct columns at any depth using a single projection
+    the schema is walked once and every leaf field becomes one column aliased by its path
+    (e.g. customer.address.city -> prefix + customer_address_city), colliding aliases get a _2, _3 suffix
+    arrays of structs are exploded into rows (explode_outer) when explode_arrays is True, otherwise
+    each nested field is projected as an array of that field (e.g. items.price -> items_price)
+    note: exploding several sibling arrays multiplies rows, each explode adds one generator projection
+    return type is spark dataframe with json struct columns exploded into multiple spark columns
+    """
+    df = nested_df
+    leaves = [] # (column path, alias parts)
+    # fields still to walk: (column path, alias parts, data type, under an array that was not exploded)
+    stack = [([field.name], [field.name], field.dataType, False) for field in reversed(df.schema.fields)]
+    pending_explodes = []
+    explode_count = 0
+    while stack or pending_explodes:
+        if not stack:
+            # explode one array of structs into a top level column and walk its struct fields
+            path, alias_parts, element_type = pending_explodes.pop(0)
+            explode_col = f"__flatten_explode_{explode_count}"
+            explode_count += 1
+            df = df.withColumn(explode_col, F.explode_outer(F.col(quote_col_path(path))))
+            stack = [([explode_col, field.name], alias_parts + [field.name], field.dataType, False) for field in reversed(element_type.fields)]
+            continue
+        path, alias_parts, data_type, under_array = stack.pop()
+        if isinstance(data_type, StructType):
+            stack.extend([(path + [field.name], alias_parts + [field.name], field.dataType, under_array) for field in reversed(data_type.fields)])
+        elif isinstance(data_type, ArrayType) and isinstance(data_type.elementType, StructType) and not under_array:
+            if explode_arrays: pending_explodes.append((path, alias_parts, data_type.elementType))
+            else: stack.extend([(path + [field.name], alias_parts + [field.name], field.dataType, True) for field in reversed(data_type.elementType.fields)])
+        else: leaves.append((path, alias_parts))
+
+    # build collision-safe aliases (top level columns keep their original names)
+    used_aliases, select_cols = set(), []
+    for path, alias_parts in leaves:
+        alias = alias_parts[0] if len(alias_parts) == 1 else prefix + separator.join(alias_parts)
+        candidate, suffix = alias, 2
+        while candidate.lower() in used_aliases:
+            candidate = f"{alias}{separator}{suffix}"
+            suffix += 1
+        used_aliases.add(candidate.lower())
+        select_cols.append(F.col(quote_col_path(path)).alias(candidate))
+    return df.select(select_cols)
+
 # COMMAND ----------
 
 # DBTITLE 1,Create Databricks File System Folder
@@ -78,6 +234,15 @@ def get_dbfs_file_name(dbfsfilepath = None, file_ext = None):
 # COMMAND ----------
 
 # DBTITLE 1,Remove Invalid Characters From a String Input
+# precompiled translation tables and patterns used by remove_invalid_chars and its variants
+invalid_chars_punctuation = str(string.punctuation).replace("-", "")
+invalid_chars_numbers_table = str.maketrans("", "", "0123456789")
+invalid_chars_spaces_table = str.maketrans("", "", " ")
+invalid_chars_punctuation_table = str.maketrans("", "", invalid_chars_punctuation)
+invalid_chars_dashes_pattern = re.compile(r'(-)+')
+invalid_chars_punctuation_regex = "[" + re.escape(invalid_chars_punctuation) + "]"
+
+
 def remove_invalid_chars(
         inputstr = None, 
         lowercase = False,
@@ -90,17 +255,57 @@ def remove_invalid_chars(
     """remove all characters from python string besides letters dynamically"""
     if lowercase: inputstr = inputstr.lower()
     if uppercase: inputstr = inputstr.upper()
-    if removenumbers: inputstr = re.sub(r'[0-9]', '', inputstr)
-    if removespaces: inputstr = inputstr.replace(' ', '')
-    if removepunctuation:
-        punctuation = [punct for punct in str(string.punctuation)]
-        punctuation.remove("-")
-        for punct in punctuation:
-            inputstr = inputstr.replace(punct, '')
-    if singledashes: inputstr = re.sub(r'(-)+', r'-', inputstr)
+    if removenumbers: inputstr = inputstr.translate(invalid_chars_numbers_table)
+    if removespaces: inputstr = inputstr.translate(invalid_chars_spaces_table)
+    if removepunctuation: inputstr = inputstr.translate(invalid_chars_punctuation_table)
+    if singledashes: inputstr = invalid_chars_dashes_pattern.sub('-', inputstr)
     return inputstr
 
 
+def remove_invalid_chars_col(
+        inputcol = None, 
+        lowercase = False,
+        uppercase = False,
+        removenumbers = False,
+        removespaces = False,
+        removepunctuation = False,
+        singledashes = False
+    ):
+    """
+    spark column expression version of remove_invalid_chars (runs distributed, no python udf)
+    return type is a spark column
+    """
+    if isinstance(inputcol, str): inputcol = F.col(inputcol)
+    if lowercase: inputcol = F.lower(inputcol)
+    if uppercase: inputcol = F.upper(inputcol)
+    if removenumbers: inputcol = F.regexp_replace(inputcol, "[0-9]", "")
+    if removespaces: inputcol = F.regexp_replace(inputcol, " ", "")
+    if removepunctuation: inputcol = F.regexp_replace(inputcol, invalid_chars_punctuation_regex, "")
+    if singledashes: inputcol = F.regexp_replace(inputcol, "-+", "-")
+    return inputcol
+
+
+def remove_invalid_chars_series(
+        inputseries = None, 
+        lowercase = False,
+        uppercase = False,
+        removenumbers = False,
+        removespaces = False,
+        removepunctuation = False,
+        singledashes = False
+    ):
+    """
+    pandas series version of remove_invalid_chars (vectorized .str methods)
+    return type is a pandas series
+    """
+    if lowercase: inputseries = inputseries.str.lower()
+    if uppercase: inputseries = inputseries.str.upper()
+    if removenumbers: inputseries = inputseries.str.translate(invalid_chars_numbers_table)
+    if removespaces: inputseries = inputseries.str.translate(invalid_chars_spaces_table)
+    if removepunctuation: inputseries = inputseries.str.translate(invalid_chars_punctuation_table)
+    if singledashes: inputseries = inputseries.str.replace(invalid_chars_dashes_pattern, '-', regex = True)
+    return inputseries
+
 # COMMAND ----------
 
 # DBTITLE 1,Remove a Substring From a String Input
@@ -122,26 +327,67 @@ def url_encode_str(inputstr = None):
 # DBTITLE 1,Remove Null and Blank Attributes from Complex Nested Json Dictionary
 def remove_blank_attributes(json_dict):
   """
-  recursive function to remove all null, none, [], and other blank
-  attributes from a complex nested json dictionary
+  remove all null, none, [], and other blank attributes from a complex nested json dictionary
+  uses an explicit stack instead of recursion so any nesting depth is safe
   """
   cleaned_dict = {}
-  for key, value in json_dict.items():
-    if value:
-      if isinstance(value, dict):
-        cleaned_value = remove_blank_attributes(value)
-        if cleaned_value: cleaned_dict[key] = cleaned_value
-      elif isinstance(value, list):
-        cleaned_list = []
-        for item in value:
-          if isinstance(item, dict):
-            cleaned_item = remove_blank_attributes(item)
-            if cleaned_item: cleaned_list.append(cleaned_item)
-          elif item: cleaned_list.append(item)
-        if cleaned_list: cleaned_dict[key] = cleaned_list
-      else: cleaned_dict[key] = value
+  # stack frames: (iterator over (key, value) pairs, cleaned container, parent cleaned container, key in parent)
+  stack = [(iter(json_dict.items()), cleaned_dict, None, None)]
+  while stack:
+    items, cleaned, parent, parent_key = stack[-1]
+    descended = False
+    for key, value in items:
+      if isinstance(cleaned, dict):
+        if not value: continue
+        if isinstance(value, dict):
+          stack.append((iter(value.items()), {}, cleaned, key))
+          descended = True
+          break
+        elif isinstance(value, list):
+          stack.append((((None, item) for item in value), [], cleaned, key))
+          descended = True
+          break
+        else: cleaned[key] = value
+      else: # list items, only dictionaries inside lists are cleaned
+        if isinstance(value, dict):
+          stack.append((iter(value.items()), {}, cleaned, None))
+          descended = True
+          break
+        elif value: cleaned.append(value)
+    if descended: continue
+    stack.pop()
+    # attach a finished container to its parent only when it is not empty
+    if parent is not None and cleaned:
+      if isinstance(parent, list): parent.append(cleaned)
+      else: parent[parent_key] = cleaned
   return cleaned_dict
 
+
+def remove_blank_attributes_series(json_series):
+  """
+  pandas series version of remove_blank_attributes
+  series values can be dictionaries or json strings (json strings are returned as json strings)
+  values that are not json objects (null, arrays, scalars, malformed json) are returned unchanged
+  """
+  def clean(value):
+    if isinstance(value, dict): return remove_blank_attributes(value)
+    if not isinstance(value, str): return value
+    try: parsed = json.loads(value)
+    except ValueError: return value
+    if not isinstance(parsed, dict): return value
+    return json.dumps(remove_blank_attributes(parsed))
+  return json_series.map(clean)
+
+
+def remove_blank_attributes_col(inputcol = None):
+  """
+  spark column version of remove_blank_attributes for a json string column (vectorized pandas udf)
+  return type is a spark column with the cleaned json string
+  """
+  if isinstance(inputcol, str): inputcol = F.col(inputcol)
+  clean_udf = F.pandas_udf(remove_blank_attributes_series, StringType())
+  return clean_udf(inputcol)
+
 # COMMAND ----------
 
 # DBTITLE 1,Upload Databricks API Results to Azure Storage and DBFS
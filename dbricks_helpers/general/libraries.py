@@ -1,4 +1,9 @@
 # Databricks notebook source
+# DBTITLE 1,Get Requirements Install Marker Function
+# MAGIC %run "./requirements_marker"
+
+# COMMAND ----------
+
 # DBTITLE 1,Get Requirements File Path
 import os
 requirementspath = os.getcwd() + "/requirements.txt"
@@ -7,6 +12,14 @@ requirementspath = requirementspath.rsplit("/", 2)[0] + "/general/requirements.t
 os.environ["requirementspath"] = requirementspath
 print(requirementspath)
 
+# requirements are installed once per cluster: a marker named after the requirements file hash and the
+# python version is written on the driver local disk after a successful install and later runs skip pip entirely
+os.environ["requirementsmarker"] = get_requirements_marker(requirementspath)
+print(os.environ["requirementsmarker"])
+
+# optional local wheelhouse folder (e.g. a unity catalog volume) to install the wheels from without pypi
+os.environ["wheelhousepath"] = str(os.getenv("DBRICKS_HELPERS_WHEELHOUSE", ""))
+
 # COMMAND ----------
 
 # DBTITLE 1,Install Library Requirements
@@ -19,7 +32,14 @@ print(requirementspath)
 # MAGIC   done
 # MAGIC echo $requirementspath
 # MAGIC
-# MAGIC pip install -r $requirementspath
+# MAGIC # install once per cluster for this requirements hash into the cluster python environment (from the local wheelhouse when configured)
+# MAGIC if [ -f "$requirementsmarker" ]; then
+# MAGIC   echo "requirements already installed on this cluster: $requirementsmarker"
+# MAGIC elif [ -n "$wheelhousepath" ] && [ -d "$wheelhousepath" ]; then
+# MAGIC   pip install --no-index --find-links "$wheelhousepath" -r $requirementspath && mkdir -p "$(dirname "$requirementsmarker")" && touch "$requirementsmarker"
+# MAGIC else
+# MAGIC   pip install -r $requirementspath && mkdir -p "$(dirname "$requirementsmarker")" && touch "$requirementsmarker"
+# MAGIC fi
 
 # COMMAND ----------
 
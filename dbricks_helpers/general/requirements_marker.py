@@ -0,0 +1,15 @@
+# Databricks notebook source
+# DBTITLE 1,Requirements Install Marker
+import os, sys, hashlib, tempfile
+
+
+def get_requirements_marker(requirementspath = None):
+    """
+    get the path of the marker written after the requirements are installed on this cluster
+    the marker is named after the requirements file hash and the python version, which are the same
+    for every notebook session on the cluster (notebook scoped environments share the cluster install)
+    """
+    with open(requirementspath, "rb") as requirementsfile:
+        requirementshash = hashlib.md5(requirementsfile.read() + f"python{sys.version_info[0]}.{sys.version_info[1]}".encode()).hexdigest()
+    markerfolder = "/local_disk0/tmp" if os.path.exists("/local_disk0") else tempfile.gettempdir()
+    return f"{markerfolder}/dbricks_helpers_requirements_{requirementshash}.installed"